@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ActivitySummaryCache:
+    """(거주자, 날짜)별 PIR/레이더 일별 합계 캐시
+
+    지난 날짜의 합계는 더 바뀌지 않으므로 한 번 조회하면 캐시에서 바로 반환하고,
+    아직 끝나지 않은 오늘(UTC, grace_minutes만큼 늦춤)만 매번 다시 조회한다.
+    최근 사용한 capacity개 (거주자, 날짜)만 메모리에 둔다 (LRU).
+    늦게 도착한 데이터가 있으면 invalidate()로 해당 날짜를 지운다.
+    지난 날짜를 새로 조회하면 callbacks를 (user_name, ActivityAnalyzer 형식 요약 표)로 호출한다.
+    """
+
+    def __init__(self, reader, capacity=100_000, grace_minutes=0, callbacks=None):
+        self.reader = reader
+        self.capacity = capacity
+        self.grace_minutes = grace_minutes
+        self.callbacks = list(callbacks or [])
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def today(self):
+        """아직 닫히지 않은 날짜 (이 날짜 이후는 캐시하지 않음)"""
+        return (datetime.now(timezone.utc) - timedelta(minutes=self.grace_minutes)).date()
+
+    def _remember(self, key, value):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def summary(self, user_name, start_day, end_day):
+        """start_day ~ end_day(포함) 날짜별 {"date", "pirTotal", "radarTotal"} 목록 (데이터가 있는 날만)"""
+        today, days, totals, fetch = self._cached(user_name, start_day, end_day)
+        if fetch:
+            df = self.reader.daily_totals([user_name], *self._fetch_range(fetch))[user_name]
+            self._store(user_name, today, fetch, df, totals)
+        return self._records(days, totals)
+
+    async def summary_async(self, user_name, start_day, end_day):
+        """summary()와 같지만 InfluxDBClientAsync로 조회 (이벤트 루프에서 호출)"""
+        today, days, totals, fetch = self._cached(user_name, start_day, end_day)
+        if fetch:
+            df = (await self.reader.daily_totals_async([user_name], *self._fetch_range(fetch)))[user_name]
+            self._store(user_name, today, fetch, df, totals)
+        return self._records(days, totals)
+
+    def _cached(self, user_name, start_day, end_day):
+        """(오늘, 요청 날짜 목록, 캐시에 있는 {날짜: 합계}, 조회할 날짜 목록)"""
+        today = self.today()
+        days = [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+
+        totals = {}
+        with self._lock:
+            for day in days:
+                if day < today and (user_name, day) in self._cache:
+                    self._cache.move_to_end((user_name, day))
+                    totals[day] = self._cache[(user_name, day)]
+        return today, days, totals, [day for day in days if day not in totals]
+
+    @staticmethod
+    def _fetch_range(fetch):
+        start = datetime.combine(fetch[0], datetime.min.time())
+        stop = datetime.combine(fetch[-1] + timedelta(days=1), datetime.min.time())
+        return start, stop
+
+    def _store(self, user_name, today, fetch, df, totals):
+        fetched = {
+            row["날짜"]: (float(row["PIR 총합"]), float(row["레이더 총합"]))
+            for row in df.to_dict("records")
+        }
+        with self._lock:
+            for day in fetch:
+                # 데이터가 없는 날은 None으로 저장해 다시 조회하지 않음
+                totals[day] = fetched.get(day.isoformat())
+                if day < today:
+                    self._remember((user_name, day), totals[day])
+
+        closed = df[df["날짜"] < today.isoformat()]
+        if not closed.empty:
+            for callback in list(self.callbacks):
+                try:
+                    callback(user_name, closed)
+                except Exception:
+                    logger.exception("활동량 요약 콜백 실패 (user=%s)", user_name)
+
+    @staticmethod
+    def _records(days, totals):
+        return [
+            {"date": day.isoformat(), "pirTotal": totals[day][0], "radarTotal": totals[day][1]}
+            for day in days
+            if totals[day] is not None
+        ]
+
+    def invalidate(self, user_name=None, start_day=None, end_day=None):
+        """조건에 맞는 캐시 항목 삭제 (None이면 제한 없음), 삭제한 개수 반환"""
+        with self._lock:
+            keys = [
+                key for key in self._cache
+                if (user_name is None or key[0] == user_name)
+                and (start_day is None or key[1] >= start_day)
+                and (end_day is None or key[1] <= end_day)
+            ]
+            for key in keys:
+                del self._cache[key]
+            return len(keys)
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """실행 중 + 대기 중 작업 수가 한도를 넘어 새 작업을 받을 수 없음"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"analysis executor saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AnalysisExecutor:
+    """CPU 작업을 이벤트 루프 밖(스레드/프로세스 풀)에서 실행하는 제한된 실행기
+
+    동시에 max_workers개를 실행하고 max_queue개까지 대기시키며, 그 이상은
+    ExecutorSaturated로 거절한다 (max_queue=None이면 대기 수 제한 없음).
+    """
+
+    def __init__(self, kind="thread", max_workers=None, max_queue=None, retry_after=1):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, prefix="ANALYSIS", kind=None, default_max_queue=None):
+        """{prefix}_EXECUTOR, _MAX_WORKERS, _MAX_QUEUE, _RETRY_AFTER 환경 변수로 생성
+
+        _MAX_QUEUE가 없으면 default_max_queue, 0 이상의 정수면 그 값, 빈 문자열이면 제한 없음.
+        """
+        max_queue = os.environ.get(f"{prefix}_MAX_QUEUE", "" if default_max_queue is None else str(default_max_queue))
+        return cls(
+            kind=kind or os.environ.get(f"{prefix}_EXECUTOR", "thread"),
+            max_workers=int(os.environ.get(f"{prefix}_MAX_WORKERS", "0")) or None,
+            max_queue=int(max_queue) if max_queue != "" else None,
+            retry_after=int(os.environ.get(f"{prefix}_RETRY_AFTER", "1")),
+        )
+
+    @property
+    def pending(self):
+        """실행 중이거나 대기 중인 작업 수"""
+        return self._pending
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis")
+        return self._executor
+
+    def _acquire(self, count):
+        with self._lock:
+            if self.max_queue is not None and self._pending + count > self.max_workers + self.max_queue:
+                raise ExecutorSaturated(self.retry_after)
+            self._pending += count
+
+    def _release(self, count):
+        with self._lock:
+            self._pending -= count
+
+    async def run(self, fn, *args):
+        """fn(*args)를 풀에서 실행하고 결과를 기다림"""
+        self._acquire(1)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._release(1)
+
+    async def map(self, fn, args_list, return_exceptions=True):
+        """여러 작업을 한 번에 받아들이거나(전체 승인) 한 번에 거절"""
+        self._acquire(len(args_list))
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            futures = [loop.run_in_executor(executor, fn, *args) for args in args_list]
+            return await asyncio.gather(*futures, return_exceptions=return_exceptions)
+        finally:
+            self._release(len(args_list))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
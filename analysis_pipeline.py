@@ -0,0 +1,133 @@
+import inspect
+import os
+
+import numpy as np
+
+from feature_store import daily_features
+from log_utils import get_logger, stage_timer
+from outing_analyzer import OutingAnalyzer
+from sensor_ingest import ensure_sensor_frame
+from sleep_analyzer import SleepAnalyzer
+
+logger = get_logger(__name__)
+
+# OutingAnalyzer 기본 파라미터 (임계값, alpha)
+OUTING_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(OutingAnalyzer).parameters.items()
+    if parameter.default is not inspect.Parameter.empty
+}
+
+# 분석 결과가 달라지는 변경마다 올림 (result_cache 키에 포함되어 이전 결과를 쓰지 않음)
+ANALYSIS_VERSION = 1
+
+# 센서 값을 이어 쓰는 최대 분 (0이면 제한 없음), 이보다 긴 오프라인 구간은 수면 분석에서 제외
+MAX_GAP_MINUTES = int(os.environ.get("SENSOR_MAX_GAP_MINUTES", "0")) or None
+
+
+def outing_parameters(thresholds=None):
+    """analyze_resident(thresholds)가 실제로 사용하는 OutingAnalyzer 파라미터 전체"""
+    return {**OUTING_DEFAULTS, **(thresholds or {})}
+
+
+def isoformat(times):
+    """datetime 배열을 datetime.isoformat()과 같은 문자열 목록으로 변환 (마이크로초가 0이면 생략)"""
+    text = np.datetime_as_string(np.asarray(times, dtype="datetime64[us]"), unit="us").tolist()
+    return [t[:-7] if t.endswith(".000000") else t for t in text]
+
+
+def event_records(prefix, starts, ends):
+    """(시작, 종료) 배열을 {prefix}StartTime / EndTime / DurationMinutes 딕셔너리 목록으로 변환
+
+    SleepEventDTO(prefix="sleep"), OutingEventDTO(prefix="outing")와 같은 형식이다.
+    """
+    starts = np.asarray(starts, dtype="datetime64[us]")
+    ends = np.asarray(ends, dtype="datetime64[us]")
+    minutes = ((ends - starts) // np.timedelta64(1, "m")).tolist()
+    return [
+        {f"{prefix}StartTime": start, f"{prefix}EndTime": end, f"{prefix}DurationMinutes": duration}
+        for start, end, duration in zip(isoformat(starts), isoformat(ends), minutes)
+    ]
+
+
+def analyze_resident(user_name, sensor_json_data, thresholds=None, max_gap=MAX_GAP_MINUTES):
+    """거주자 한 명의 수면/외출 분석
+
+    sensor_json_data는 센서 JSON 목록 또는 이미 변환된 SensorFrame이다.
+    프로세스 풀에서도 실행할 수 있도록 결과는 모두 기본 자료형이다.
+    반환: {"sleepEvents": [...], "outingEvents": [...], "thresholds": {...},
+          "dailyFeatures": {날짜: {...}}, "metrics": {...}}
+    """
+    timings = {}
+
+    # 센서 데이터는 한 번만 변환해서 두 분석기가 같이 사용
+    with stage_timer(logger, "parse", timings, user=user_name):
+        sensor_frame = ensure_sensor_frame(sensor_json_data)
+    if sensor_frame.time_range is None:
+        # 데이터가 없거나 시각을 모두 해석할 수 없으면 이벤트 없음 (임계값은 그대로)
+        parameters = outing_parameters(thresholds)
+        return {
+            "sleepEvents": [],
+            "outingEvents": [],
+            "thresholds": {key: float(value) for key, value in parameters.items() if key.startswith("threshold_")},
+            "dailyFeatures": {},
+            "metrics": {"stages": timings, "sizes": {"entries": sensor_frame.entry_count}},
+        }
+    first_time, last_time = sensor_frame.time_range
+    start_date = first_time.date()
+    end_date = last_time.date()
+
+    with stage_timer(logger, "sleep.load_json_data", timings, user=user_name, readings=len(sensor_frame.readings)):
+        sleep_analyzer = SleepAnalyzer(
+            user_name=user_name,
+            sensor_json_data=sensor_frame,
+            start_date=start_date,
+            end_date=end_date,
+            max_gap=max_gap
+        )
+    with stage_timer(logger, "sleep.analyze", timings, user=user_name):
+        sleep_analyzer.analyze()
+    sleep_bytes = int(sleep_analyzer.grid.nbytes)
+    with stage_timer(logger, "sleep.get_results", timings, user=user_name):
+        _, df_sleep_periods, _ = sleep_analyzer.get_results()
+
+    sleep_events = event_records("sleep", df_sleep_periods["sleep_start"], df_sleep_periods["wake_time"])
+
+    outing_analyzer = OutingAnalyzer(
+        sensor_json_data=sensor_frame,
+        **(thresholds or {})
+    )
+    with stage_timer(logger, "outing.analyze", timings, user=user_name, door_events=len(sensor_frame.door_events)):
+        outing_analyzer.analyze()
+    with stage_timer(logger, "outing.get_results", timings, user=user_name):
+        df_outing_periods = outing_analyzer.get_results()
+
+    outing_events = []
+    if not df_outing_periods.empty:
+        outing_events = event_records("outing", df_outing_periods["outing_start"], df_outing_periods["outing_end"])
+
+    with stage_timer(logger, "features", timings, user=user_name):
+        # 수면은 end_date 0시까지만 분석하므로 마지막 날 수면 컬럼은 빠짐
+        features = daily_features(df_sleep_periods, df_outing_periods, sensor_frame, start_date, end_date,
+                                  sleep_until=sleep_analyzer.end_date)
+
+    return {
+        "sleepEvents": sleep_events,
+        "outingEvents": outing_events,
+        "thresholds": {key: float(value) for key, value in outing_analyzer.thresholds.items()},
+        "dailyFeatures": features,
+        "metrics": {
+            "stages": {**timings, **sleep_analyzer.timings, **outing_analyzer.timings},
+            "sizes": {
+                "entries": sensor_frame.entry_count,
+                "readings": len(sensor_frame.readings),
+                "minutes": len(sleep_analyzer.grid),
+                "offline_minutes": sleep_analyzer.grid.gap_minutes,
+                "door_events": len(sensor_frame.door_events),
+            },
+            "dataframe_bytes": {
+                "sleep": sleep_bytes,
+                "outing": int(outing_analyzer.activity_df.memory_usage(deep=True).sum()),
+            },
+        },
+    }
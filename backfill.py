@@ -0,0 +1,206 @@
+"""아카이브된 센서 기록으로 수면/외출 이벤트를 다시 계산하는 오프라인 백필
+
+    python backfill.py archive --archive archive/ --user 홍길동 data/*.json
+    python backfill.py run --archive archive/ --db backfill.db --start 2025-01-01 --end 2025-07-01 --workers 8
+
+archive는 센서 JSON(목록 또는 한 줄에 레코드 하나인 NDJSON)을 MinuteArchive에 합쳐 넣고,
+run은 거주자 × 날짜 구간(partition)별로 SleepAnalyzer/OutingAnalyzer를 프로세스 풀에서
+돌린 뒤 이벤트를 SQLite backfill_events 표에 한 번에 기록한다.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from analysis_pipeline import OUTING_DEFAULTS, isoformat, outing_parameters
+from log_utils import configure_logging
+from minute_archive import MinuteArchive
+from outing_analyzer import OutingAnalyzer
+from sensor_ingest import SensorFrameBuilder
+from sleep_analyzer import SleepAnalyzer
+from sleep_engine import MINUTES_PER_DAY
+
+
+def read_records(path):
+    """센서 JSON 목록 또는 NDJSON 파일의 레코드"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def archive_files(archive, user_name, paths):
+    builder = SensorFrameBuilder()
+    for path in paths:
+        builder.extend(read_records(path))
+    frame = builder.build()
+    archive.write(user_name, frame)
+    return frame
+
+
+def partitions(start_day, end_day, days):
+    """[start_day, end_day)를 days일 단위 (시작, 끝) 목록으로 분할"""
+    result = []
+    day = start_day
+    while day < end_day:
+        result.append((day, min(day + timedelta(days=days), end_day)))
+        day += timedelta(days=days)
+    return result
+
+
+def _epoch_minute(day):
+    return (day - date(1970, 1, 1)).days * MINUTES_PER_DAY
+
+
+def analyze_partition(archive_root, user_name, start_day, end_day, margin_days=1, thresholds=None, max_gap=None):
+    """거주자 한 명의 [start_day, end_day) 구간 분석 (프로세스 풀에서 실행)
+
+    앞뒤로 margin_days만큼 더 읽어 구간 경계에 걸친 수면/외출도 찾고,
+    시작 시각이 구간 안에 있는 이벤트만 (user_name, kind, start, end, minutes) 행으로 반환한다.
+    """
+    first = start_day - timedelta(days=margin_days)
+    last = end_day + timedelta(days=margin_days)
+    frame = MinuteArchive(archive_root).frame(user_name, _epoch_minute(first), _epoch_minute(last))
+    if frame.time_range is None:
+        return []
+
+    sleep_analyzer = SleepAnalyzer(
+        user_name=user_name,
+        sensor_json_data=frame,
+        start_date=frame.time_range[0].floor("D"),
+        end_date=frame.time_range[1],
+        max_gap=max_gap
+    )
+    sleep_analyzer.analyze()
+    _, df_sleep_periods, _ = sleep_analyzer.get_results()
+
+    outing_analyzer = OutingAnalyzer(sensor_json_data=frame, **(thresholds or {}))
+    outing_analyzer.analyze()
+    df_outing_periods = outing_analyzer.get_results()
+
+    rows = []
+    for kind, df, start_column, end_column in (
+        ("sleep", df_sleep_periods, "sleep_start", "wake_time"),
+        ("outing", df_outing_periods, "outing_start", "outing_end"),
+    ):
+        if df.empty:
+            continue
+        starts = df[start_column].to_numpy(dtype="datetime64[m]")
+        ends = df[end_column].to_numpy(dtype="datetime64[m]")
+        inside = (starts >= np.datetime64(start_day)) & (starts < np.datetime64(end_day))
+        starts, ends = starts[inside], ends[inside]
+        minutes = (ends - starts).astype(int).tolist()
+        rows.extend(
+            (user_name, kind, start, end, duration)
+            for start, end, duration in zip(isoformat(starts), isoformat(ends), minutes)
+        )
+    return rows
+
+
+class EventTable:
+    """백필 결과 저장소 (SQLite backfill_events)"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS backfill_events ("
+            "user_name TEXT, kind TEXT, start_time TEXT, end_time TEXT, duration_minutes INTEGER, "
+            "PRIMARY KEY (user_name, kind, start_time))"
+        )
+        self._conn.commit()
+
+    def replace(self, user_names, start_day, end_day, rows):
+        """구간 [start_day, end_day)의 기존 이벤트를 지우고 rows를 한 번에 기록"""
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM backfill_events WHERE user_name = ? AND start_time >= ? AND start_time < ?",
+                [(user_name, start_day.isoformat(), end_day.isoformat()) for user_name in user_names]
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO backfill_events VALUES (?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        self._conn.close()
+
+
+def run(archive_root, db_path, start_day=None, end_day=None, user_names=None, partition_days=7,
+        margin_days=1, workers=None, thresholds=None, max_gap=None):
+    """아카이브의 거주자별 이벤트를 다시 계산해 db_path에 기록, 요약 dict 반환"""
+    archive = MinuteArchive(archive_root)
+    user_names = user_names or archive.residents()
+    tasks = []
+    for user_name in user_names:
+        bounds = archive.minute_range(user_name)
+        if bounds is None:
+            continue
+        first = start_day or date(1970, 1, 1) + timedelta(days=bounds[0] // MINUTES_PER_DAY)
+        last = end_day or date(1970, 1, 1) + timedelta(days=bounds[1] // MINUTES_PER_DAY + 1)
+        tasks.extend((user_name, *partition) for partition in partitions(first, last, partition_days))
+
+    started = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(analyze_partition, archive_root, user_name, first, last, margin_days, thresholds,
+                            max_gap)
+            for user_name, first, last in tasks
+        ]
+        for future in futures:
+            rows.extend(future.result())
+
+    if tasks:
+        table = EventTable(db_path)
+        try:
+            table.replace(user_names, min(task[1] for task in tasks), max(task[2] for task in tasks), rows)
+        finally:
+            table.close()
+    return {
+        "residents": len({task[0] for task in tasks}),
+        "partitions": len(tasks),
+        "events": len(rows),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수면/외출 이벤트 오프라인 백필")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive_parser = commands.add_parser("archive", help="센서 JSON을 아카이브에 추가")
+    archive_parser.add_argument("--archive", required=True)
+    archive_parser.add_argument("--user", required=True)
+    archive_parser.add_argument("files", nargs="+")
+
+    run_parser = commands.add_parser("run", help="아카이브 전체 재분석")
+    run_parser.add_argument("--archive", required=True)
+    run_parser.add_argument("--db", default="backfill.db")
+    run_parser.add_argument("--user", action="append", help="대상 거주자 (여러 번 지정 가능, 기본: 전체)")
+    run_parser.add_argument("--start", type=date.fromisoformat, help="시작 날짜 (포함)")
+    run_parser.add_argument("--end", type=date.fromisoformat, help="끝 날짜 (제외)")
+    run_parser.add_argument("--partition-days", type=int, default=7)
+    run_parser.add_argument("--margin-days", type=int, default=1)
+    run_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    run_parser.add_argument("--max-gap-minutes", type=int, help="센서 값을 이어 쓰는 최대 분 (기본: 제한 없음)")
+    for name, default in OUTING_DEFAULTS.items():
+        run_parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=float, default=default)
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.command == "archive":
+        frame = archive_files(MinuteArchive(args.archive), args.user, args.files)
+        print(f"{args.user}: 센서 값 {len(frame.readings)}개, 문 이벤트 {len(frame.door_events)}개 추가")
+        return
+
+    thresholds = outing_parameters({name: getattr(args, name) for name in OUTING_DEFAULTS})
+    summary = run(args.archive, args.db, args.start, args.end, args.user, args.partition_days,
+                  args.margin_days, args.workers, thresholds, args.max_gap_minutes)
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
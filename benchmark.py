@@ -0,0 +1,211 @@
+"""분석 파이프라인 벤치마크
+
+합성 거주자 데이터(synthetic_data)로 SleepAnalyzer / OutingAnalyzer 단계별 시간과
+/analyze-sensor 엔드투엔드(TestClient) 시간, 처리량, 최대 메모리를 측정한다.
+엔드투엔드 측정 시 FAST_RESPONSE 응답이 response_model 검증 경로와 같은지도 확인한다.
+
+    python benchmark.py --days 7 --residents 3 --repeat 3
+    python benchmark.py --days 30 --json > bench.json
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+import uuid
+
+from outing_analyzer import OutingAnalyzer
+from sensor_ingest import ensure_sensor_frame, parse_sensor_data
+from sleep_analyzer import SleepAnalyzer
+from synthetic_data import generate_facility_payloads, to_sensor_json_data
+
+
+def _timed(fn, repeat):
+    """(결과, 초 목록), 매 반복마다 fn()을 새로 실행"""
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    return result, seconds
+
+
+def _peak_bytes(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _sleep_analyzer(sensor_json_data):
+    frame = ensure_sensor_frame(sensor_json_data)
+    first_time, last_time = frame.time_range
+    return SleepAnalyzer("bench", frame, first_time.date(), last_time.date())
+
+
+def _run_sleep(sensor_json_data):
+    analyzer = _sleep_analyzer(sensor_json_data)
+    analyzer.analyze()
+    return analyzer.get_results()
+
+
+def _run_outing(sensor_json_data):
+    analyzer = OutingAnalyzer(sensor_json_data)
+    analyzer.analyze()
+    return analyzer.get_results()
+
+
+def bench_resident(payload, repeat, measure_memory=True, client=None):
+    sensor_json_data = to_sensor_json_data(payload)
+    entries = len(payload)
+    frame = parse_sensor_data(sensor_json_data)
+    minutes = len(_sleep_analyzer(frame).grid)
+
+    cases = {}
+
+    def add(name, fn, units=None):
+        _, seconds = _timed(fn, repeat)
+        best = min(seconds)
+        case = {"best_s": best, "median_s": statistics.median(seconds)}
+        if units:
+            case.update({f"{unit}_per_s": count / best for unit, count in units.items() if best > 0})
+        if measure_memory:
+            case["peak_bytes"] = _peak_bytes(fn)
+        cases[name] = case
+
+    add("parse_sensor_data", lambda: parse_sensor_data(sensor_json_data), {"entries": entries})
+
+    sleep = _sleep_analyzer(frame)
+    add("SleepAnalyzer.__init__", lambda: _sleep_analyzer(frame), {"minutes": minutes})
+    # analyze()는 같은 인스턴스에서 반복 실행해도 결과가 같음
+    add("SleepAnalyzer.analyze", sleep.analyze, {"minutes": minutes})
+    add("SleepAnalyzer.get_results", sleep.get_results, {"minutes": minutes})
+    add("SleepAnalyzer (end to end)", lambda: _run_sleep(sensor_json_data), {"entries": entries})
+
+    add("OutingAnalyzer.analyze", lambda: OutingAnalyzer(frame).analyze(), {"door_events": len(frame.door_events)})
+    outing = OutingAnalyzer(frame)
+    outing.analyze()
+    add("OutingAnalyzer.get_results", outing.get_results)
+    add("OutingAnalyzer (end to end)", lambda: _run_outing(sensor_json_data), {"entries": entries})
+
+    if client is not None:
+        def post():
+            response = client.post("/analyze-sensor", params={"user_name": "bench"}, json=payload)
+            response.raise_for_status()
+            return response
+        add("POST /analyze-sensor", post, {"entries": entries})
+
+    result = {"entries": entries, "minutes": minutes, "door_events": len(frame.door_events), "cases": cases}
+    if client is not None:
+        result["response_conformant"] = check_response_conformance(client, payload)
+    return result
+
+
+def check_response_conformance(client, payload):
+    """FAST_RESPONSE 응답 본문이 response_model 검증/직렬화 경로와 바이트 단위로 같은지 확인
+
+    분석할 때마다 임계값이 학습되므로 두 방식은 처음 보는 서로 다른 거주자 이름으로 요청하고,
+    응답에 포함된 거주자 이름은 "bench"로 바꿔 비교한다.
+    """
+    import main
+
+    def requests(user_name):
+        return [
+            ("/analyze-sensor", {"user_name": user_name}, payload),
+            ("/analyze-sensor/batch", None, [{"user_name": f"{user_name}-batch", "data": payload},
+                                             {"user_name": f"{user_name}-empty", "data": []}]),
+        ]
+
+    run_id = uuid.uuid4().hex
+    fast_response = main.FAST_RESPONSE
+    bodies = {}
+    try:
+        for fast in (True, False):
+            main.FAST_RESPONSE = fast
+            user_name = f"bench-{run_id}-{'fast' if fast else 'model'}"
+            bodies[fast] = [client.post(path, params=params, json=body).content.replace(user_name.encode(), b"bench")
+                            for path, params, body in requests(user_name)]
+    finally:
+        main.FAST_RESPONSE = fast_response
+    return bodies[True] == bodies[False]
+
+
+def make_client():
+    """main.app용 TestClient (fastapi/httpx가 없으면 None)"""
+    os.environ.setdefault("THRESHOLD_STORE_PATH", "")
+    # 반복 측정이 결과 캐시에 걸리지 않도록 끔
+    os.environ.setdefault("RESULT_CACHE_MAX_BYTES", "0")
+    try:
+        from fastapi.testclient import TestClient
+        import main
+    except ImportError:
+        return None
+    return TestClient(main.app)
+
+
+def run(days=7, residents=1, noise=0.05, seed=0, repeat=3, measure_memory=True, end_to_end=True):
+    payloads = generate_facility_payloads(residents=residents, days=days, seed=seed, noise=noise)
+    client = make_client() if end_to_end else None
+    try:
+        if client is not None:
+            client.__enter__()
+        results = {
+            user_name: bench_resident(payload, repeat, measure_memory, client)
+            for user_name, payload in payloads.items()
+        }
+    finally:
+        if client is not None:
+            client.__exit__(None, None, None)
+    return {
+        "config": {"days": days, "residents": residents, "noise": noise, "seed": seed, "repeat": repeat},
+        "residents": results,
+    }
+
+
+def print_report(report):
+    config = report["config"]
+    print(f"days={config['days']} residents={config['residents']} noise={config['noise']} repeat={config['repeat']}")
+    for user_name, result in report["residents"].items():
+        print(f"\n[{user_name}] entries={result['entries']} minutes={result['minutes']} door_events={result['door_events']}")
+        print(f"{'case':<30} {'best(ms)':>10} {'median(ms)':>11} {'throughput':>22} {'peak(MiB)':>10}")
+        for name, case in result["cases"].items():
+            throughput = next(((k, v) for k, v in case.items() if k.endswith("_per_s")), None)
+            throughput = f"{throughput[1]:,.0f} {throughput[0]}" if throughput else ""
+            peak = f"{case['peak_bytes'] / 2**20:.1f}" if "peak_bytes" in case else ""
+            print(f"{name:<30} {case['best_s'] * 1000:>10.1f} {case['median_s'] * 1000:>11.1f} "
+                  f"{throughput:>22} {peak:>10}")
+        if "response_conformant" in result:
+            print(f"FAST_RESPONSE 응답 일치: {result['response_conformant']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수면/외출 분석 벤치마크")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--residents", type=int, default=1)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 최대 메모리 측정 생략")
+    parser.add_argument("--no-end-to-end", action="store_true", help="TestClient /analyze-sensor 측정 생략")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    report = run(days=args.days, residents=args.residents, noise=args.noise, seed=args.seed,
+                 repeat=args.repeat, measure_memory=not args.no_memory, end_to_end=not args.no_end_to_end)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    if not all(result.get("response_conformant", True) for result in report["residents"].values()):
+        raise SystemExit("FAST_RESPONSE 응답이 response_model 경로와 다릅니다")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import calendar
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+
+from log_utils import get_logger
+from metrics import EVENT_SINK
+
+logger = get_logger(__name__)
+
+# 분석 결과를 기록할 버킷 (센서 원본 버킷과 분리)
+EVENT_SINK_BUCKET = os.environ.get("EVENT_SINK_BUCKET", "analysis_events")
+
+
+def _escape_key(value):
+    return str(value).replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _field(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return f"{value}i"
+    if isinstance(value, float):
+        return repr(value)
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _timestamp_ns(value):
+    """ISO 문자열/datetime/date(UTC, tz 없으면 UTC로 봄)을 epoch 나노초로 변환"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return calendar.timegm(value.timetuple()) * 10**9 + value.microsecond * 1000
+
+
+def line(measurement, tags, fields, timestamp):
+    """InfluxDB line protocol 한 줄"""
+    tag_text = "".join(f",{_escape_key(key)}={_escape_key(value)}" for key, value in sorted(tags.items()))
+    field_text = ",".join(f"{_escape_key(key)}={_field(value)}" for key, value in fields.items())
+    return f"{_escape_key(measurement)}{tag_text} {field_text} {_timestamp_ns(timestamp)}"
+
+
+def event_lines(user_name, sleep_events=(), outing_events=()):
+    """SleepEventDTO/OutingEventDTO 형식 dict 목록 → sleep_event/outing_event (시작 시각 기준)"""
+    lines = []
+    for measurement, prefix, events in (("sleep_event", "sleep", sleep_events),
+                                        ("outing_event", "outing", outing_events)):
+        for event in events:
+            lines.append(line(measurement, {"user_name": user_name}, {
+                "end_time": event[f"{prefix}EndTime"],
+                "duration_minutes": int(event[f"{prefix}DurationMinutes"]),
+            }, event[f"{prefix}StartTime"]))
+    return lines
+
+
+# dailyFeatures 컬럼 → (measurement, field), 날짜별 수면/활동량/외출 합계 시계열
+DAILY_SERIES = {
+    "sleep_minutes": ("sleep_daily", "total_sleep_minutes"),
+    "nights": ("sleep_daily", "nights"),
+    "awakenings": ("sleep_daily", "awakenings"),
+    "pir_total": ("activity_daily", "pir_total"),
+    "radar_total": ("activity_daily", "radar_total"),
+    "outings": ("outing_daily", "outings"),
+    "outing_minutes": ("outing_daily", "outing_minutes"),
+}
+
+
+def daily_lines(user_name, daily):
+    """analyze_resident의 dailyFeatures {날짜: {컬럼: 값}} → sleep_daily/activity_daily/outing_daily (날짜 0시 UTC)
+
+    dailyFeatures에는 요청이 온전히 덮은 날짜(수면은 전날 정오부터 덮은 날짜)의 값만 있으므로,
+    일부만 덮인 요청이 앞서 기록한 그 날짜의 값을 덮어쓰지 않는다.
+    """
+    lines = []
+    for day, values in daily.items():
+        series = {}
+        for column, value in values.items():
+            if column in DAILY_SERIES and value is not None:
+                measurement, field = DAILY_SERIES[column]
+                series.setdefault(measurement, {})[field] = float(value)
+        lines.extend(line(measurement, {"user_name": user_name}, fields, day) for measurement, fields in series.items())
+    return lines
+
+
+def activity_lines(user_name, summary):
+    """ActivityAnalyzer.get_results() 표 (날짜, PIR 총합, 레이더 총합) → activity_daily(pir_total, radar_total)"""
+    return [
+        line("activity_daily", {"user_name": user_name},
+             {"pir_total": float(row["PIR 총합"]), "radar_total": float(row["레이더 총합"])}, row["날짜"])
+        for row in summary.to_dict("records")
+    ]
+
+
+def influx_writer(influx_url, token, org, bucket=EVENT_SINK_BUCKET):
+    """line protocol 목록을 bucket에 동기 기록하는 write 함수 (ActivityAnalyzer와 같은 접속 정보, 클라이언트 공유)"""
+    write_api = None
+
+    def write(lines):
+        nonlocal write_api
+        if write_api is None:
+            # influx_reader(pandas)와 influxdb_client는 처음 기록할 때 불러옴
+            from influxdb_client.client.write_api import SYNCHRONOUS
+            from influx_reader import shared_client
+            write_api = shared_client(influx_url, token, org).write_api(write_options=SYNCHRONOUS)
+        write_api.write(bucket=bucket, org=org, record=lines)
+
+    return write
+
+
+class EventSink:
+    """분석 결과를 백그라운드 스레드에서 묶어 기록하는 버퍼
+
+    submit()은 line protocol 목록을 대기열에 넣고 바로 반환한다. 대기열은 최대 max_queue줄이며,
+    가득 차면 block=False일 때 버리고 False를 반환한다 (호출한 쪽이 재시도/로그 판단).
+    백그라운드 스레드는 batch_size줄이 모이거나 flush_interval초가 지나면 write(lines)를 호출하고,
+    실패하면 retry_delay초부터 두 배씩 늘려 max_retries번 다시 시도한 뒤 버린다.
+    write는 주입 가능하며 (기본: influx_writer), 테스트에서는 목록에 모으는 함수 등으로 대체한다.
+    """
+
+    def __init__(self, write, batch_size=500, flush_interval=1.0, max_queue=10000,
+                 max_retries=3, retry_delay=0.5):
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._pending = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    @property
+    def pending(self):
+        """기록을 기다리거나 기록 중인 줄 수"""
+        with self._condition:
+            return len(self._pending) + self._in_flight
+
+    def start(self):
+        with self._condition:
+            if self._thread is None:
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, lines, block=False, timeout=None):
+        """lines를 대기열에 추가, 대기열이 차서 넣지 못하면 False (부분 추가 없음)"""
+        lines = list(lines)
+        if not lines:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self._closed and len(self._pending) + len(lines) > self.max_queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0) or len(lines) > self.max_queue:
+                    EVENT_SINK.inc(len(lines), outcome="dropped")
+                    return False
+                self._condition.wait(remaining)
+            if self._closed:
+                EVENT_SINK.inc(len(lines), outcome="dropped")
+                return False
+            self._pending.extend(lines)
+            EVENT_SINK.inc(len(lines), outcome="queued")
+            self._condition.notify_all()
+        return True
+
+    def flush(self, timeout=None):
+        """대기열이 빌 때까지 기다림, 시간 안에 비면 True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """남은 줄을 기록하고 스레드 종료"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._condition:
+            self._thread = None
+
+    def _next_batch(self):
+        with self._condition:
+            first_seen = None
+            while True:
+                if self._pending and (len(self._pending) >= self.batch_size or self._closed):
+                    break
+                if not self._pending and self._closed:
+                    return None
+                if self._pending:
+                    first_seen = first_seen or time.monotonic()
+                    remaining = first_seen + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                else:
+                    first_seen = None
+                    self._condition.wait()
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            self._in_flight = len(batch)
+            # 대기열에 자리가 생겼음을 submit(block=True)에 알림
+            self._condition.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+    def _write(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.write(batch)
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("분석 결과 %d줄 기록 실패, 버림", len(batch))
+                    EVENT_SINK.inc(len(batch), outcome="failed")
+                    return
+                EVENT_SINK.inc(len(batch), outcome="retried")
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                EVENT_SINK.inc(len(batch), outcome="written")
+                return
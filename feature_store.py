@@ -0,0 +1,194 @@
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from sensor_ingest import NS_PER_MINUTE
+from sleep_engine import MINUTES_PER_DAY
+
+# risk_analyzer.features와 같은 순서
+WEEKLY_FEATURES = [
+    "total_outings",
+    "avg_outing_time",
+    "avg_sleep_time",
+    "avg_intermediate_awakenings",
+    "avg_pir",
+    "avg_radar"
+]
+DAILY_COLUMNS = ["outings", "outing_minutes", "sleep_minutes", "nights", "awakenings", "pir_total", "radar_total"]
+SLEEP_COLUMNS = ["sleep_minutes", "nights", "awakenings"]
+
+# 하루를 온전히 덮었다고 보는 여유 (심박/호흡은 10분 단위 배열로 들어옴)
+COVERAGE_SLACK_MINUTES = 10
+# 수면은 기상 날짜 기준이라 전날 정오부터의 데이터가 있어야 그날 수면이 온전함
+SLEEP_LOOKBACK_MINUTES = 12 * 60
+# 정오 이전 기상만 그날 수면이므로 수면 분석 구간이 그날 정오를 지나야 함
+WAKE_CUTOFF_MINUTES = 12 * 60
+
+
+def week_start(day):
+    """day가 속한 주의 월요일"""
+    return day - timedelta(days=day.weekday())
+
+
+def daily_features(df_sleep_periods, df_outing_periods, sensor_frame, start_day, end_day, sleep_until=None):
+    """분석 결과를 날짜별 부분 집계 {"YYYY-MM-DD": {컬럼: 값}}로 변환
+
+    센서 값이 하루 전체를 덮는 날짜만 반환하며 (이벤트가 없으면 0), 수면 컬럼은 전날
+    정오부터 덮여 있고 수면 분석 구간(sleep_until까지, None이면 제한 없음)이 그날 정오를
+    지날 때만 넣는다. 일부만 덮인 날짜의 컬럼은 빠지므로 FeatureStore.update에서
+    기존 값이 유지된다.
+    수면은 기상 날짜(정오 이후 기상은 다음 날), 외출은 시작 날짜 기준이며
+    PIR/레이더 합계는 ActivityAnalyzer와 같이 UTC 날짜별 원시 값 합이다.
+    """
+    days = pd.date_range(start_day, end_day, freq="D").date
+    daily = pd.DataFrame(0.0, index=pd.Index(days, name="date"), columns=DAILY_COLUMNS)
+
+    if not df_sleep_periods.empty:
+        # 오프라인 구간에서 나뉜 수면은 같은 밤으로 셈
+        nights = df_sleep_periods.assign(night=~df_sleep_periods["after_gap"]).groupby("adjusted_wake_date").agg(
+            sleep_minutes=("sleep_duration_minutes", "sum"),
+            nights=("night", "sum"),
+            awakenings=("intermediate_awakenings", "sum"),
+        )
+        daily = daily.reindex(daily.index.union(nights.index), fill_value=0.0)
+        daily.loc[nights.index, SLEEP_COLUMNS] = nights.to_numpy(dtype=float)
+
+    if not df_outing_periods.empty:
+        outings = df_outing_periods.groupby("date")["outing_duration_minutes"].agg(["size", "sum"])
+        daily = daily.reindex(daily.index.union(outings.index), fill_value=0.0)
+        daily.loc[outings.index, ["outings", "outing_minutes"]] = outings.to_numpy(dtype=float)
+
+    readings = sensor_frame.readings
+    for sensor, column in (("PIR활동", "pir_total"), ("레이더활동", "radar_total")):
+        selected = readings[readings["sensor"] == sensor]
+        day = (selected["minute"].to_numpy() // MINUTES_PER_DAY).astype("datetime64[D]").astype(object)
+        totals = pd.Series(selected["value"].to_numpy(), index=day).groupby(level=0).sum()
+        totals = totals[totals.index.isin(daily.index)]
+        daily.loc[totals.index, column] = totals.to_numpy()
+
+    minute_range = sensor_frame.minute_range
+    if minute_range is None:
+        return {}
+    first, last = minute_range
+    day_start = np.array([(day - date(1970, 1, 1)).days for day in daily.index], dtype=np.int64) * MINUTES_PER_DAY
+    day_end = day_start + MINUTES_PER_DAY - 1
+    covered = (first <= day_start + COVERAGE_SLACK_MINUTES) & (last >= day_end - COVERAGE_SLACK_MINUTES)
+    sleep_covered = covered & (first <= day_start - SLEEP_LOOKBACK_MINUTES + COVERAGE_SLACK_MINUTES)
+    if sleep_until is not None:
+        sleep_until = pd.Timestamp(sleep_until).value // NS_PER_MINUTE
+        sleep_covered &= sleep_until >= day_start + WAKE_CUTOFF_MINUTES + COVERAGE_SLACK_MINUTES
+
+    features = {}
+    for (day, row), day_covered, day_sleep_covered in zip(daily.to_dict("index").items(), covered, sleep_covered):
+        if day_covered:
+            features[day.isoformat()] = {
+                column: float(value) for column, value in row.items()
+                if day_sleep_covered or column not in SLEEP_COLUMNS
+            }
+    return features
+
+
+def activity_features(summary):
+    """ActivityAnalyzer.get_results() 표를 날짜별 부분 집계로 변환"""
+    return {
+        row["날짜"]: {"pir_total": float(row["PIR 총합"]), "radar_total": float(row["레이더 총합"])}
+        for row in summary.to_dict("records")
+    }
+
+
+class FeatureStore:
+    """거주자별 주간 위험군 특성 저장소 (SQLite)
+
+    날짜별 부분 집계(daily_features)를 저장하고, 바뀐 날짜가 속한 주만 다시 계산해
+    weekly_features(user_name, week_start, 특성...) 표를 갱신한다.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily_features ("
+            "user_name TEXT, date TEXT, "
+            + ", ".join(f"{column} REAL" for column in DAILY_COLUMNS)
+            + ", PRIMARY KEY (user_name, date))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS weekly_features ("
+            "user_name TEXT, week_start TEXT, "
+            + ", ".join(f"{feature} REAL" for feature in WEEKLY_FEATURES)
+            + ", days INTEGER, updated_at REAL, PRIMARY KEY (user_name, week_start))"
+        )
+        self._conn.commit()
+
+    def update(self, user_name, daily):
+        """날짜별 부분 집계를 반영하고 갱신한 주(월요일 날짜 문자열) 목록 반환
+
+        daily에 없는 컬럼(또는 None)은 기존 값을 유지한다 (수면/외출과 활동량을 따로 반영 가능).
+        """
+        if not daily:
+            return []
+        placeholders = ", ".join("?" for _ in DAILY_COLUMNS)
+        updates = ", ".join(f"{column} = COALESCE(excluded.{column}, {column})" for column in DAILY_COLUMNS)
+        rows = [
+            (user_name, day, *(values.get(column) for column in DAILY_COLUMNS))
+            for day, values in daily.items()
+        ]
+        weeks = sorted({week_start(date.fromisoformat(day)) for day in daily})
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO daily_features VALUES (?, ?, {placeholders}) "
+                f"ON CONFLICT(user_name, date) DO UPDATE SET {updates}",
+                rows
+            )
+            for week in weeks:
+                self._refresh_week(user_name, week)
+            self._conn.commit()
+        return [week.isoformat() for week in weeks]
+
+    def _refresh_week(self, user_name, week):
+        outings, outing_minutes, sleep_minutes, nights, awakenings, pir, radar, days = self._conn.execute(
+            "SELECT SUM(outings), SUM(outing_minutes), SUM(sleep_minutes), SUM(nights), SUM(awakenings), "
+            "AVG(pir_total), AVG(radar_total), COUNT(*) "
+            "FROM daily_features WHERE user_name = ? AND date BETWEEN ? AND ?",
+            (user_name, week.isoformat(), (week + timedelta(days=6)).isoformat())
+        ).fetchone()
+        features = [
+            outings or 0.0,
+            outing_minutes / outings if outings else 0.0,
+            sleep_minutes / nights if nights else 0.0,
+            awakenings / nights if nights else 0.0,
+            pir or 0.0,
+            radar or 0.0,
+        ]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO weekly_features VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (user_name, week.isoformat(), *features, days, time.time())
+        )
+
+    def weekly(self, week=None, user_name=None):
+        """주간 특성 표 (user_name, week_start, 특성..., days), risk_analyzer.prepare_week에 바로 사용 가능"""
+        conditions, params = [], []
+        if week is not None:
+            conditions.append("week_start = ?")
+            params.append(week_start(week).isoformat())
+        if user_name is not None:
+            conditions.append("user_name = ?")
+            params.append(user_name)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = ["user_name", "week_start", *WEEKLY_FEATURES, "days"]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM weekly_features{where} ORDER BY week_start, user_name", params
+            ).fetchall()
+        return pd.DataFrame(rows, columns=columns).astype({feature: np.float64 for feature in WEEKLY_FEATURES})
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,263 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from outing_analyzer import OutingAnalyzer
+from minute_grid import WindowAggregate
+from sensor_ingest import NS_PER_MINUTE, SENSOR_CODES, SensorFrame, ensure_sensor_frame
+from sleep_analyzer import SleepAnalyzer
+from sleep_engine import MINUTES_PER_DAY
+
+
+def _minute_to_timestamp(minute):
+    return pd.Timestamp(int(minute) * NS_PER_MINUTE)
+
+
+class ResidentState:
+    """거주자 한 명의 증분 분석 상태
+
+    최근 retention_days 동안의 센서 값/문 이벤트, 외출 상태 머신과 적응형 임계값,
+    지금까지 내보낸 수면/외출 이벤트를 보관한다.
+    """
+
+    def __init__(self, user_name, retention_days=2,
+                 threshold_heart_breath=10, threshold_radar_pir=15,
+                 threshold_home_activity=50, alpha=0.005):
+        self.user_name = user_name
+        self.retention_days = retention_days
+        self.lock = threading.Lock()
+
+        self.readings = pd.DataFrame({
+            "sensor": pd.Categorical([], categories=SENSOR_CODES),
+            "minute": np.empty(0, dtype=np.int64),
+            "value": np.empty(0, dtype=np.float64),
+        })
+        self.door_events = pd.DataFrame({"time": pd.to_datetime([]), "event_code": []})
+        # 보관 구간 이전의 마지막 센서 값 (ffill 시작값)
+        self.last_values = {}
+
+        # 외출 상태 머신
+        self.threshold_heart_breath = threshold_heart_breath
+        self.threshold_radar_pir = threshold_radar_pir
+        self.threshold_home_activity = threshold_home_activity
+        self.alpha = alpha
+        self.is_outside = False
+        self.last_door_close_time = None
+        self.outing_start = None
+        self.door_cursor = None
+
+        # 12시간 구간별 조도 최솟값과 취침 장소 후보 수 (바뀐 구간만 다시 계산)
+        self.windows = WindowAggregate()
+
+        # 내보낸 이벤트 {시작 시각: 종료 시각}
+        self.sleep_events = {}
+        self.outing_events = {}
+
+    @property
+    def thresholds(self):
+        return {
+            "threshold_heart_breath": self.threshold_heart_breath,
+            "threshold_radar_pir": self.threshold_radar_pir,
+            "threshold_home_activity": self.threshold_home_activity,
+        }
+
+    def merge(self, frame):
+        """새 데이터를 합치고 값이 새로 생기거나 바뀐 가장 이른 epoch 분을 반환"""
+        new = frame.readings
+        changed_minute = None
+        if not new.empty:
+            new = new.drop_duplicates(["sensor", "minute"], keep="last")
+            known = new.merge(self.readings, on=["sensor", "minute"], how="left", suffixes=("", "_old"))
+            changed = known["value_old"].isna() | (known["value"] != known["value_old"])
+            if changed.any():
+                changed_minute = int(known.loc[changed, "minute"].min())
+                self.readings = (
+                    pd.concat([self.readings, new], ignore_index=True)
+                    .drop_duplicates(["sensor", "minute"], keep="last")
+                    .sort_values("minute", kind="stable")
+                    .reset_index(drop=True)
+                )
+
+        doors = frame.door_events
+        if self.door_cursor is not None:
+            doors = doors[doors["time"] > self.door_cursor]
+        if not doors.empty:
+            self.door_events = (
+                pd.concat([self.door_events, doors], ignore_index=True)
+                .drop_duplicates(["time", "event_code"])
+                .sort_values("time", kind="stable")
+                .reset_index(drop=True)
+            )
+        return changed_minute
+
+    def seeded_frame(self, start_minute):
+        """start_minute 이후 데이터에 직전 센서 값을 start_minute 시점 값으로 추가한 SensorFrame"""
+        before = self.readings[self.readings["minute"] < start_minute]
+        last = before.groupby("sensor", observed=True)["value"].last().to_dict()
+        seeds = {**self.last_values, **last}
+
+        window = self.readings[self.readings["minute"] >= start_minute]
+        present = set(window.loc[window["minute"] == start_minute, "sensor"].astype(str))
+        seed_rows = [(sensor, value) for sensor, value in seeds.items() if sensor not in present]
+        if seed_rows:
+            seed_df = pd.DataFrame({
+                "sensor": pd.Categorical([s for s, _ in seed_rows], categories=SENSOR_CODES),
+                "minute": np.full(len(seed_rows), start_minute, dtype=np.int64),
+                "value": np.array([v for _, v in seed_rows], dtype=np.float64),
+            })
+            window = pd.concat([seed_df, window], ignore_index=True)
+        return SensorFrame(window, self.door_events)
+
+    def trim(self, latest_minute):
+        """보관 기간이 지난 센서 값과 이벤트를 정리"""
+        cutoff = (latest_minute // MINUTES_PER_DAY - self.retention_days) * MINUTES_PER_DAY
+        if self.last_door_close_time is not None and self.is_outside:
+            # 귀가 판단에 외출 시작 이후 활동량이 필요
+            close_minute = self.last_door_close_time.value // NS_PER_MINUTE
+            cutoff = min(cutoff, close_minute)
+
+        old = self.readings[self.readings["minute"] < cutoff]
+        if not old.empty:
+            self.last_values.update(old.groupby("sensor", observed=True)["value"].last().to_dict())
+            self.readings = self.readings[self.readings["minute"] >= cutoff].reset_index(drop=True)
+
+        if self.door_cursor is not None:
+            self.door_events = self.door_events[self.door_events["time"] > self.door_cursor].reset_index(drop=True)
+
+        cutoff_time = _minute_to_timestamp(cutoff - MINUTES_PER_DAY)
+        self.sleep_events = {k: v for k, v in self.sleep_events.items() if k >= cutoff_time}
+        self.outing_events = {k: v for k, v in self.outing_events.items() if k >= cutoff_time}
+        self.windows.trim((cutoff // MINUTES_PER_DAY - 1) * MINUTES_PER_DAY)
+
+
+class IncrementalAnalyzer:
+    """거주자별 상태를 유지하며 새로 들어온 구간만 다시 분석
+
+    수면은 값이 바뀐 가장 이른 시각의 전날 0시부터(전날 밤 수면 구간까지) 다시 계산하고,
+    외출은 60분 뒤 데이터까지 들어온 문 이벤트만 이어서 처리한다.
+    새로 생기거나 바뀐 이벤트만 반환한다.
+    최근 갱신한 max_residents명의 상태만 메모리에 둔다 (LRU). 밀려난 거주자는 다음 요청에서
+    threshold_store의 임계값으로 다시 시작한다.
+    """
+
+    def __init__(self, retention_days=2, threshold_store=None, max_residents=10_000, **outing_params):
+        self.retention_days = retention_days
+        self.threshold_store = threshold_store
+        self.max_residents = max_residents
+        self.outing_params = outing_params
+        self.states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_state(self, user_name):
+        with self._lock:
+            state = self.states.get(user_name)
+            if state is None:
+                params = dict(self.outing_params)
+                if self.threshold_store is not None:
+                    params.update(self.threshold_store.load(user_name) or {})
+                state = ResidentState(user_name, retention_days=self.retention_days, **params)
+                self.states[user_name] = state
+            self.states.move_to_end(user_name)
+            while len(self.states) > self.max_residents:
+                self.states.popitem(last=False)
+            return state
+
+    def update(self, user_name, sensor_data):
+        """새 센서 데이터를 반영하고 (수면 이벤트, 외출 이벤트) 변경분을 반환
+
+        각 이벤트는 (시작 Timestamp, 종료 Timestamp) 튜플이다.
+        """
+        frame = ensure_sensor_frame(sensor_data)
+        state = self.get_state(user_name)
+        with state.lock:
+            changed_minute = state.merge(frame)
+            if state.readings.empty:
+                return [], []
+            latest_minute = int(state.readings["minute"].max())
+
+            sleep_events = []
+            if changed_minute is not None:
+                sleep_events = self._update_sleep(state, changed_minute, latest_minute)
+            outing_events = self._update_outing(state, latest_minute)
+            state.trim(latest_minute)
+            if self.threshold_store is not None:
+                self.threshold_store.save(user_name, state.thresholds)
+            return sleep_events, outing_events
+
+    def _update_sleep(self, state, changed_minute, latest_minute):
+        first_minute = int(state.readings["minute"].min())
+        start_minute = (changed_minute // MINUTES_PER_DAY - 1) * MINUTES_PER_DAY
+        start_minute = max(start_minute, first_minute // MINUTES_PER_DAY * MINUTES_PER_DAY)
+
+        analyzer = SleepAnalyzer(
+            user_name=state.user_name,
+            sensor_json_data=state.seeded_frame(start_minute),
+            start_date=_minute_to_timestamp(start_minute),
+            end_date=_minute_to_timestamp(latest_minute),
+            windows=state.windows,
+            changed_minute=changed_minute,
+        )
+
+        # 취침 장소는 보관 중인 구간 전체의 후보 수로 판단
+        analyzer.determine_room_type()
+        analyzer.detect_sleep_start_times()
+        analyzer.detect_wake_start_times()
+        analyzer.apply_sleep_state()
+        analyzer.exception_handling()
+        _, df_sleep_periods, _ = analyzer.get_results()
+
+        start_time = _minute_to_timestamp(start_minute)
+        previous = {k: v for k, v in state.sleep_events.items() if k >= start_time}
+        current = {}
+        if not df_sleep_periods.empty:
+            current = dict(zip(df_sleep_periods["sleep_start"], df_sleep_periods["wake_time"]))
+
+        for key in previous:
+            if key not in current:
+                del state.sleep_events[key]
+        updated = []
+        for key, value in current.items():
+            if state.sleep_events.get(key) != value:
+                state.sleep_events[key] = value
+                updated.append((key, value))
+        return updated
+
+    def _update_outing(self, state, latest_minute):
+        pending = state.door_events
+        if state.door_cursor is not None:
+            pending = pending[pending["time"] > state.door_cursor]
+        if pending.empty:
+            return []
+
+        analyzer = OutingAnalyzer(sensor_json_data=SensorFrame(state.readings, pending), alpha=state.alpha,
+                                  **state.thresholds)
+        analyzer.parse_data()
+        analyzer.is_outside = state.is_outside
+        analyzer.last_door_close_time = state.last_door_close_time
+
+        door_times = list(pending["time"])
+        processed = analyzer.process_door_events(
+            door_times, pending["event_code"].tolist(),
+            ready_until=_minute_to_timestamp(latest_minute)
+        )
+        if processed == 0:
+            return []
+
+        state.door_cursor = door_times[processed - 1]
+        state.is_outside = analyzer.is_outside
+        state.last_door_close_time = analyzer.last_door_close_time
+        for key, value in analyzer.thresholds.items():
+            setattr(state, key, value)
+
+        updated = []
+        for status in analyzer.external_status:
+            time = pd.Timestamp(status["time"])
+            if status["status"] == 1:
+                state.outing_start = time
+            elif state.outing_start is not None:
+                state.outing_events[state.outing_start] = time
+                updated.append((state.outing_start, time))
+                state.outing_start = None
+        return updated
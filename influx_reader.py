@@ -0,0 +1,151 @@
+import asyncio
+import os
+import threading
+
+import pandas as pd
+
+ACTIVITY_MEASUREMENTS = ("PIR활동", "레이더활동")
+SUMMARY_COLUMNS = {"PIR활동": "PIR 총합", "레이더활동": "레이더 총합"}
+
+INFLUX_POOL_SIZE = int(os.environ.get("INFLUX_POOL_SIZE", "10"))
+
+# (url, token, org)별로 하나씩 만들어 공유하는 클라이언트 (내부에 연결 풀이 있음)
+_clients = {}
+_async_clients = {}
+_lock = threading.Lock()
+
+
+def shared_client(url, token, org):
+    """공유 InfluxDBClient (연결 풀 크기 INFLUX_POOL_SIZE)"""
+    # influxdb_client는 import가 느리므로 처음 연결할 때 불러옴
+    import influxdb_client
+
+    key = (url, token, org)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = influxdb_client.InfluxDBClient(
+                url=url, token=token, org=org, connection_pool_maxsize=INFLUX_POOL_SIZE
+            )
+        return client
+
+
+def shared_async_client(url, token, org):
+    """현재 이벤트 루프에서 공유하는 InfluxDBClientAsync (aiohttp 필요)"""
+    from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
+
+    key = (url, token, org, asyncio.get_running_loop())
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None:
+            client = _async_clients[key] = InfluxDBClientAsync(
+                url=url, token=token, org=org, connection_pool_maxsize=INFLUX_POOL_SIZE
+            )
+        return client
+
+
+def close_clients():
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def close_async_clients():
+    """현재 이벤트 루프의 InfluxDBClientAsync를 모두 닫음"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        keys = [key for key in _async_clients if key[3] is loop]
+        clients = [_async_clients.pop(key) for key in keys]
+    for client in clients:
+        await client.close()
+
+
+def _flux_time(value):
+    timestamp = pd.Timestamp(value)
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.isoformat() + "Z"
+
+
+def _flux_string(value):
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("${", "\\${")
+    return f'"{escaped}"'
+
+
+def daily_activity_query(user_names, start, end, bucket="sensor_data"):
+    """거주자·센서별 일(UTC) 단위 활동량 합계를 InfluxDB에서 계산하는 Flux 쿼리"""
+    measurements = " or ".join(f'r["_measurement"] == {_flux_string(m)}' for m in ACTIVITY_MEASUREMENTS)
+    users = " or ".join(f'r["user_name"] == {_flux_string(name)}' for name in user_names)
+    return f"""from(bucket: {_flux_string(bucket)})
+  |> range(start: {_flux_time(start)}, stop: {_flux_time(end)})
+  |> filter(fn: (r) => {measurements})
+  |> filter(fn: (r) => r["_field"] == "measurement_value")
+  |> filter(fn: (r) => {users})
+  |> fill(column: "_value", value: 0.0)
+  |> group(columns: ["user_name", "_measurement"])
+  |> aggregateWindow(every: 1d, fn: sum, createEmpty: false, timeSrc: "_start")
+  |> keep(columns: ["_time", "_value", "_measurement", "user_name"])
+"""
+
+
+def daily_summary(df):
+    """(time, measurement, value) 일별 합계를 날짜, PIR 총합, 레이더 총합 표로 변환"""
+    if df.empty:
+        return pd.DataFrame(columns=["날짜", "PIR 총합", "레이더 총합"])
+
+    df = df.assign(date=pd.to_datetime(df["time"]).dt.strftime("%Y-%m-%d"))
+    grouped = df.groupby(["date", "measurement"])["value"].sum().unstack(fill_value=0).reset_index()
+    grouped.columns.name = None
+    for measurement, column in SUMMARY_COLUMNS.items():
+        if measurement in grouped.columns:
+            grouped = grouped.rename(columns={measurement: column})
+        else:
+            grouped[column] = 0
+    return grouped[["date", "PIR 총합", "레이더 총합"]].rename(columns={"date": "날짜"})
+
+
+def summarize_tables(tables, user_names):
+    """쿼리 결과(FluxTable 목록)를 {user_name: 일별 요약}으로 변환"""
+    rows = [
+        (record["user_name"], record.get_time(), record.get_measurement(), record.get_value())
+        for table in tables
+        for record in table.records
+    ]
+    df = pd.DataFrame(rows, columns=["user_name", "time", "measurement", "value"])
+    return {
+        user_name: daily_summary(df[df["user_name"] == user_name][["time", "measurement", "value"]])
+        for user_name in user_names
+    }
+
+
+class InfluxActivityReader:
+    """PIR/레이더 일별 활동량 조회 (집계는 InfluxDB에서, 여러 거주자를 쿼리 한 번으로)"""
+
+    def __init__(self, influx_url, token, org, bucket="sensor_data"):
+        self.influx_url = influx_url
+        self.token = token
+        self.org = org
+        self.bucket = bucket
+
+    @property
+    def client(self):
+        return shared_client(self.influx_url, self.token, self.org)
+
+    def daily_totals(self, user_names, start, end):
+        user_names = list(dict.fromkeys(user_names))
+        if not user_names:
+            return {}
+        query = daily_activity_query(user_names, start, end, self.bucket)
+        tables = self.client.query_api().query(query, org=self.org)
+        return summarize_tables(tables, user_names)
+
+    async def daily_totals_async(self, user_names, start, end):
+        user_names = list(dict.fromkeys(user_names))
+        if not user_names:
+            return {}
+        query = daily_activity_query(user_names, start, end, self.bucket)
+        client = shared_async_client(self.influx_url, self.token, self.org)
+        tables = await client.query_api().query(query, org=self.org)
+        return summarize_tables(tables, user_names)
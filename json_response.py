@@ -0,0 +1,28 @@
+import json
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용 (출력은 같음)
+    orjson = None
+
+
+def dumps(content):
+    """JSONResponse(ensure_ascii=False, 구분자 공백 없음)와 같은 바이트로 직렬화"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """이미 응답 스키마 형식인 dict/list를 검증 없이 바로 직렬화하는 응답
+
+    response_model 검증과 jsonable_encoder를 거치지 않으므로 content는 기본 자료형
+    (str, int, float, bool, None, list, dict)만 담고 있어야 한다.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
@@ -0,0 +1,71 @@
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+
+def configure_logging(level=None, sample_rate=None):
+    """LOG_LEVEL(기본 INFO), LOG_SAMPLE_RATE(기본 1.0) 환경 변수로 로깅 설정
+
+    LOG_SAMPLE_RATE는 이벤트 단위 로그(*.events 로거)에만 적용된다.
+    import 시점이 아니라 서비스 시작(main.lifespan)이나 CLI의 main()에서 호출한다.
+    """
+    level = level or os.environ.get("LOG_LEVEL", "INFO")
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))
+
+    root = logging.getLogger()
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(level)
+    SamplingFilter.rate = sample_rate
+
+
+def get_logger(name):
+    return logging.getLogger(name)
+
+
+def get_event_logger(name):
+    """이벤트마다 남기는 로그용 로거 (LOG_SAMPLE_RATE 비율만 기록)"""
+    logger = get_logger(f"{name}.events")
+    if not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        logger.addFilter(SamplingFilter())
+    return logger
+
+
+class SamplingFilter(logging.Filter):
+    """rate 비율의 레코드만 통과 (경고 이상은 항상 통과)"""
+
+    rate = 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+@contextmanager
+def stage_timer(logger, stage, timings=None, **fields):
+    """블록 실행 시간을 debug 레벨로 기록
+
+    timings(dict)가 주어지면 {stage: 초}도 함께 기록한다 (메트릭 집계용).
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if not debug and timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+        if debug:
+            extra = "".join(f" {key}={value}" for key, value in fields.items())
+            logger.debug("stage=%s elapsed_ms=%.2f%s", stage, elapsed * 1000, extra)
@@ -1,13 +1,126 @@
-from fastapi import FastAPI
+import asyncio
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+
+from activity_cache import ActivitySummaryCache
+from analysis_executor import AnalysisExecutor, ExecutorSaturated
+from event_sink import EventSink, activity_lines, daily_lines, event_lines, influx_writer
+from json_response import FastJSONResponse, dumps
+from log_utils import configure_logging, get_event_logger, get_logger
+from metrics import REGISTRY, REQUESTS, STAGE_SECONDS, profiled, record_analysis_metrics
+from result_cache import ResultCache, cache_key, payload_digest
+from threshold_store import ThresholdStore
+
+@asynccontextmanager
+async def lifespan(app):
+    configure_logging()
+    start_warm_up()
+    try:
+        yield
+    finally:
+        if activity_cache is not None:
+            # /activity-summary가 이 이벤트 루프에서 만든 비동기 클라이언트
+            from influx_reader import close_async_clients
+            await close_async_clients()
+        shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+logger = get_logger(__name__)
+event_logger = get_event_logger(__name__)
+
+# 거주자별 외출 임계값 (메모리 LRU + SQLite, 처음 필요할 때 파일을 열도록 get_threshold_store로 사용)
+THRESHOLD_STORE_PATH = os.environ.get("THRESHOLD_STORE_PATH", "outing_thresholds.db")
+threshold_store = None
+
+# pandas/numpy를 쓰는 분석 모듈과 객체는 처음 필요할 때 불러오고 (get_*),
+# WARM_UP=1이면 시작할 때 백그라운드 스레드에서 미리 불러옴 (warm_up)
+WARM_UP = os.environ.get("WARM_UP", "1") == "1"
+WARM_UP_MODULES = ["analysis_pipeline", "incremental_analyzer", "stream_processor", "feature_store"]
+warm_up_done = threading.Event()
+components_lock = threading.RLock()
+
+# 거주자별 주간 위험군 특성 (FEATURE_STORE_PATH가 없으면 저장 안 함)
+FEATURE_STORE_PATH = os.environ.get("FEATURE_STORE_PATH")
+feature_store = None
+
+# 같은 요청 본문의 분석 결과 캐시 (RESULT_CACHE_MAX_BYTES=0이면 사용 안 함, RESULT_CACHE_DIR: 디스크 계층)
+result_cache = None
+if int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(64 * 2**20))) > 0:
+    result_cache = ResultCache(
+        max_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(64 * 2**20))),
+        ttl=float(os.environ.get("RESULT_CACHE_TTL", "300")),
+        directory=os.environ.get("RESULT_CACHE_DIR") or None
+    )
+
+# 분석은 이벤트 루프 밖에서 실행 (ANALYSIS_EXECUTOR=thread|process, _MAX_WORKERS, _MAX_QUEUE)
+analysis_executor = AnalysisExecutor.from_env("ANALYSIS", default_max_queue=32)
+# 증분 분석은 메모리 상태를 공유하므로 항상 스레드에서 실행
+incremental_executor = AnalysisExecutor.from_env("ANALYSIS", kind="thread", default_max_queue=32)
+# 배치 분석용 프로세스 풀 (BATCH_MAX_WORKERS, BATCH_MAX_QUEUE)
+batch_executor = AnalysisExecutor.from_env("BATCH", kind="process")
 
-from datetime import datetime
-from sleep_analyzer import SleepAnalyzer
-from outing_analyzer import OutingAnalyzer
+# 거주자별 증분 분석 상태 (/analyze-sensor/incremental, INCREMENTAL_MAX_RESIDENTS)
+incremental_analyzer = None
 
-app = FastAPI()
+# 실시간 외출/무활동 알림 (/alerts, ALERT_INACTIVITY_MINUTES, ALERT_BUFFER_MINUTES, ALERT_IDLE_MINUTES)
+stream_processor = None
+# /alerts/stream 구독자 {(이벤트 루프, 큐, user_name 또는 None)}
+alert_subscribers = set()
+ALERT_KEEPALIVE_SECONDS = 15
+
+# 활동량 일별 합계 (/activity-summary), INFLUX_URL이 없으면 사용 안 함
+activity_cache = None
+
+# 분석 결과(수면/외출 이벤트, 날짜별 수면/활동량/외출 합계)와 /activity-summary로 새로 조회한 지난 날짜
+# 활동량 합계를 InfluxDB EVENT_SINK_BUCKET에 백그라운드로 기록
+# (EVENT_SINK=1이고 INFLUX_URL이 있을 때, 접속 정보는 /activity-summary와 같음)
+event_sink = None
+if os.environ.get("EVENT_SINK") == "1" and os.environ.get("INFLUX_URL"):
+    event_sink = EventSink(
+        influx_writer(
+            influx_url=os.environ["INFLUX_URL"],
+            token=os.environ.get("INFLUX_TOKEN", ""),
+            org=os.environ.get("INFLUX_ORG", "")
+        ),
+        batch_size=int(os.environ.get("EVENT_SINK_BATCH_SIZE", "500")),
+        flush_interval=float(os.environ.get("EVENT_SINK_FLUSH_SECONDS", "1")),
+        max_queue=int(os.environ.get("EVENT_SINK_MAX_QUEUE", "10000")),
+        max_retries=int(os.environ.get("EVENT_SINK_MAX_RETRIES", "3"))
+    )
+
+# risk_analyzer.py --model로 학습해 둔 위험군 모델 (/risk-score, 처음 요청할 때 로드)
+RISK_MODEL_PATH = os.environ.get("RISK_MODEL_PATH", "risk_model.joblib")
+risk_scorer = None
+risk_scorer_lock = threading.Lock()
+
+# 1이면 분석 결과를 response_model 검증 없이 바로 직렬화 (FastJSONResponse, 출력은 같음)
+FAST_RESPONSE = os.environ.get("FAST_RESPONSE", "1") == "1"
+
+# X-Profile: 1 헤더로 요청별 cProfile 결과를 저장할 디렉터리 (설정하지 않으면 사용 안 함)
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+
+REGISTRY.gauge("analysis_executor_pending", "실행 중이거나 대기 중인 분석 작업 수",
+               function=lambda: analysis_executor.pending + incremental_executor.pending)
+REGISTRY.gauge("analysis_result_cache_bytes", "분석 결과 캐시 메모리 사용량(바이트)",
+               function=lambda: result_cache.nbytes if result_cache is not None else 0)
+REGISTRY.gauge("batch_executor_pending", "실행 중이거나 대기 중인 배치 분석 작업 수",
+               function=lambda: batch_executor.pending)
+REGISTRY.gauge("event_sink_pending_lines", "InfluxDB 기록을 기다리는 분석 결과 줄 수",
+               function=lambda: event_sink.pending if event_sink is not None else 0)
 
 class SensorDataDTO(BaseModel):
     sensor_type_name: str
@@ -29,38 +142,220 @@ class AnalysisResult(BaseModel):
     sleepEvents: List[SleepEventDTO]
     outingEvents: List[OutingEventDTO]
 
-def convert_to_sleep_events(df_sleep_periods):
-    sleep_events = []
-    for _, row in df_sleep_periods.iterrows():
-        start_time = row['sleep_start'].to_pydatetime()
-        end_time = row['wake_time'].to_pydatetime()
-        duration_minutes = int((end_time - start_time).total_seconds() // 60)
-        sleep_events.append({
-            "sleepStartTime": start_time,
-            "sleepEndTime": end_time,
-            "sleepDurationMinutes": duration_minutes
-        })
-    return sleep_events
-
-
-def convert_to_outing_events(df_outing_periods):
-    outing_events = []
-    for _, row in df_outing_periods.iterrows():
-        start_time = row['outing_start'].to_pydatetime()
-        end_time = row['outing_end'].to_pydatetime()
-        duration_minutes = int((end_time - start_time).total_seconds() // 60)
-        outing_events.append({
-            "outingStartTime": start_time,
-            "outingEndTime": end_time,
-            "outingDurationMinutes": duration_minutes
-        })
-    return outing_events
+class ResidentSensorData(BaseModel):
+    user_name: str
+    data: List[SensorDataDTO]
 
-@app.post("/analyze-sensor", response_model=AnalysisResult)
-async def analyze_sensor(data: List[SensorDataDTO]):
-    print(f"수신된 센서: {len(data)}개")
+class ResidentAnalysisResult(BaseModel):
+    user_name: str
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+
+class ActivitySummaryDTO(BaseModel):
+    date: str
+    pirTotal: float
+    radarTotal: float
+
+class WeeklyStatsDTO(BaseModel):
+    user_name: str
+    total_outings: float
+    avg_outing_time: float
+    avg_sleep_time: float
+    avg_intermediate_awakenings: float
+    avg_pir: float
+    avg_radar: float
+
+class RiskScoreRequest(BaseModel):
+    week: List[WeeklyStatsDTO]
+    previous: Optional[List[WeeklyStatsDTO]] = None
+
+class RiskScoreDTO(BaseModel):
+    user_name: str
+    risk_score: float
+    anomaly_score: int
+    risk_label: str
+
+def analysis_response(sleep_events, outing_events):
+    """이벤트 dict 목록(analysis_pipeline.event_records 형식)으로 AnalysisResult 응답 생성"""
+    if FAST_RESPONSE:
+        return FastJSONResponse({"sleepEvents": sleep_events, "outingEvents": outing_events})
+    return AnalysisResult(sleepEvents=sleep_events, outingEvents=outing_events)
+
+def get_threshold_store():
+    global threshold_store
+    with components_lock:
+        if threshold_store is None:
+            threshold_store = ThresholdStore(
+                path=THRESHOLD_STORE_PATH,
+                capacity=int(os.environ.get("THRESHOLD_STORE_CAPACITY", "1024"))
+            )
+        return threshold_store
+
+def get_feature_store():
+    global feature_store
+    with components_lock:
+        if feature_store is None and FEATURE_STORE_PATH:
+            from feature_store import FeatureStore
+            feature_store = FeatureStore(FEATURE_STORE_PATH)
+        return feature_store
+
+def get_incremental_analyzer():
+    global incremental_analyzer
+    with components_lock:
+        if incremental_analyzer is None:
+            from incremental_analyzer import IncrementalAnalyzer
+            incremental_analyzer = IncrementalAnalyzer(
+                threshold_store=get_threshold_store(),
+                max_residents=int(os.environ.get("INCREMENTAL_MAX_RESIDENTS", "10000"))
+            )
+        return incremental_analyzer
+
+def get_stream_processor():
+    global stream_processor
+    with components_lock:
+        if stream_processor is None:
+            from stream_processor import StreamProcessor
+            stream_processor = StreamProcessor(
+                inactivity_minutes=int(os.environ.get("ALERT_INACTIVITY_MINUTES", "120")),
+                buffer_minutes=int(os.environ.get("ALERT_BUFFER_MINUTES", "240")),
+                idle_minutes=int(os.environ.get("ALERT_IDLE_MINUTES", str(24 * 60))),
+                threshold_store=get_threshold_store(),
+                callbacks=[publish_alert]
+            )
+        return stream_processor
+
+def warm_up():
+    """분석 모듈을 import하고 상태 객체를 만들어 첫 요청이 import 시간을 기다리지 않게 함"""
+    start = time.perf_counter()
+    try:
+        for name in WARM_UP_MODULES:
+            importlib.import_module(name)
+        get_threshold_store()
+        get_feature_store()
+        get_incremental_analyzer()
+        get_stream_processor()
+    except Exception:
+        logger.exception("warm-up 실패")
+        return
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="warm_up")
+    warm_up_done.set()
+    logger.info("warm-up 완료: %.3f초", time.perf_counter() - start)
+
+def start_warm_up():
+    if WARM_UP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    if event_sink is not None:
+        event_sink.start()
+
+def shutdown():
+    for executor in (analysis_executor, incremental_executor, batch_executor):
+        executor.shutdown()
+    if event_sink is not None:
+        event_sink.close()
+    if activity_cache is not None:
+        from influx_reader import close_clients
+        close_clients()
+    if feature_store is not None:
+        feature_store.close()
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    REQUESTS.inc(endpoint=request.url.path, outcome="rejected")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "분석 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "pendingAnalyses": analysis_executor.pending + incremental_executor.pending,
+        "pendingBatchAnalyses": batch_executor.pending,
+        "warmedUp": warm_up_done.is_set(),
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 형식 메트릭 (단계별 소요 시간, 입력 크기, DataFrame 메모리, 요청 수)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+async def run_analysis(request, response, user_name, sensor_data):
+    """analysis_executor에서 분석을 실행하고 임계값 저장, 메트릭 기록까지 처리
+
+    PROFILE_DIR이 설정되어 있고 X-Profile: 1 헤더가 있으면 cProfile 결과를 저장하고
+    경로를 X-Profile-Path 응답 헤더로 알려준다.
+    센서 레코드 목록으로 받은 요청은 같은 본문·파라미터의 결과를 result_cache에서 바로 반환한다.
+    """
+    from analysis_pipeline import ANALYSIS_VERSION, MAX_GAP_MINUTES, analyze_resident, outing_parameters
+
+    def result_key(thresholds):
+        return cache_key(digest, outing_parameters(thresholds), MAX_GAP_MINUTES, ANALYSIS_VERSION)
+
+    # 임계값/특성 저장소(SQLite) 읽기·쓰기는 이벤트 루프를 막지 않도록 스레드 풀에서 실행
+    thresholds = await run_in_threadpool(lambda: get_threshold_store().load(user_name))
+    args = (analyze_resident, user_name, sensor_data, thresholds)
+    digest = None
+    if PROFILE_DIR and request.headers.get("X-Profile") == "1":
+        profile_path = os.path.join(PROFILE_DIR, f"analyze-{uuid.uuid4().hex}.prof")
+        args = (profiled, profile_path) + args
+        response.headers["X-Profile-Path"] = profile_path
+    elif result_cache is not None and isinstance(sensor_data, list):
+        # 큰 본문의 직렬화/해시가 이벤트 루프를 막지 않도록 분석과 같은 실행기에서 계산
+        digest = await analysis_executor.run(payload_digest, user_name, sensor_data)
+        result = result_cache.get(result_key(thresholds))
+        if result is not None:
+            REQUESTS.inc(endpoint=request.url.path, outcome="cached")
+            return result
+
+    start = time.perf_counter()
+    result = await analysis_executor.run(*args)
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="total")
+    REQUESTS.inc(endpoint=request.url.path, outcome="ok")
+
+    await run_in_threadpool(save_analysis, user_name, result)
+    if digest is not None:
+        # 재시도된 요청이 임계값을 한 번 더 학습시키지 않도록, 이번 분석으로 갱신된
+        # 임계값 기준 키에도 같은 결과를 저장
+        keys = {result_key(thresholds), result_key(result["thresholds"])}
+        result_cache.put(keys, {key: result[key] for key in ("sleepEvents", "outingEvents", "thresholds")})
+    return result
 
-    sensor_json_data = [
+def save_analysis(user_name, result):
+    """분석 결과의 임계값, 날짜별 특성, 메트릭 반영"""
+    get_threshold_store().save(user_name, result["thresholds"])
+    store = get_feature_store()
+    if store is not None:
+        store.update(user_name, result["dailyFeatures"])
+    write_events(user_name, result["sleepEvents"], result["outingEvents"], result["dailyFeatures"])
+    record_analysis_metrics(result["metrics"])
+
+def save_analyses(analyzed):
+    """(거주자, 분석 결과) 목록을 차례로 save_analysis"""
+    for user_name, result in analyzed:
+        save_analysis(user_name, result)
+
+def write_events(user_name, sleep_events, outing_events, daily=None):
+    """event_sink가 설정되어 있으면 분석 결과를 기록 대기열에 추가 (가득 차면 버리고 경고)"""
+    if event_sink is None:
+        return
+    lines = event_lines(user_name, sleep_events, outing_events) + daily_lines(user_name, daily or {})
+    if not event_sink.submit(lines):
+        logger.warning("event_sink 대기열이 가득 차 분석 결과 %d줄을 기록하지 못했습니다 (user=%s)",
+                       len(lines), user_name)
+
+def write_activity(user_name, summary):
+    """/activity-summary에서 새로 조회한 지난 날짜의 활동량 합계를 event_sink에 추가"""
+    if event_sink is None:
+        return
+    lines = activity_lines(user_name, summary)
+    if not event_sink.submit(lines):
+        logger.warning("event_sink 대기열이 가득 차 활동량 합계 %d줄을 기록하지 못했습니다 (user=%s)",
+                       len(lines), user_name)
+
+def to_sensor_json_data(data):
+    return [
         {
             "sensor": d.sensor_type_name,
             "time": d.measurement_time,
@@ -68,54 +363,236 @@ async def analyze_sensor(data: List[SensorDataDTO]):
         }
         for d in data
     ]
-    print(sensor_json_data)
 
-    times = [datetime.fromisoformat(d.measurement_time.replace("Z", "")) for d in data]
-    start_date = min(times).date()
-    end_date = max(times).date()
+@app.post("/analyze-sensor", response_model=AnalysisResult)
+async def analyze_sensor(data: List[SensorDataDTO], request: Request, response: Response,
+                         user_name: str = "UserA"):
+    logger.info("수신된 센서: %d개 (user=%s)", len(data), user_name)
 
-    sleep_analyzer = SleepAnalyzer(
-        user_name="UserA",
-        sensor_json_data=sensor_json_data,
-        start_date=start_date,
-        end_date=end_date
-    )
-    sleep_analyzer.analyze()
-    _, df_sleep_periods, _ = sleep_analyzer.get_results()
-
-    sleep_events = []
-    for _, row in df_sleep_periods.iterrows():
-        sleep_events.append(SleepEventDTO(
-            sleepStartTime=row['sleep_start'].to_pydatetime().isoformat(),
-            sleepEndTime=row['wake_time'].to_pydatetime().isoformat(),
-            sleepDurationMinutes=int((row['wake_time'] - row['sleep_start']).total_seconds() // 60)
-        ))
-
-    outing_analyzer = OutingAnalyzer(
-        sensor_json_data=sensor_json_data,
+    sensor_json_data = to_sensor_json_data(data)
+    result = await run_analysis(request, response, user_name, sensor_json_data)
+
+    sleep_events = result["sleepEvents"]
+    outing_events = result["outingEvents"]
+
+    logger.info("분석 완료: 수면 %d건, 외출 %d건 (user=%s)", len(sleep_events), len(outing_events), user_name)
+    if event_logger.isEnabledFor(logging.DEBUG):
+        for event in sleep_events:
+            event_logger.debug("수면 시작=%s 종료=%s 총=%d분",
+                               event["sleepStartTime"], event["sleepEndTime"], event["sleepDurationMinutes"])
+        for event in outing_events:
+            event_logger.debug("외출 시작=%s 종료=%s 총=%d분",
+                               event["outingStartTime"], event["outingEndTime"], event["outingDurationMinutes"])
+
+    return analysis_response(sleep_events, outing_events)
+
+
+async def read_ndjson_records(request, builder):
+    """요청 본문을 스트림으로 읽어 NDJSON 한 줄씩 builder에 추가
+
+    한 줄은 레코드 객체 하나 또는 레코드 배열(청크) 하나다.
+    잘못된 줄이 있으면 줄 번호와 함께 400을 반환한다.
+    """
+    buffer = b""
+    number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            number += 1
+            add_ndjson_line(line, number, builder)
+    add_ndjson_line(buffer, number + 1, builder)
+
+def add_ndjson_line(line, number, builder):
+    line = line.strip()
+    if not line:
+        return
+    try:
+        item = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 NDJSON ({number}번째 줄): {e}")
+    records = item if isinstance(item, list) else [item]
+    if not all(isinstance(record, dict) for record in records):
+        raise HTTPException(status_code=400,
+                            detail=f"잘못된 NDJSON ({number}번째 줄): 레코드 객체 또는 레코드 배열이어야 합니다")
+    builder.extend(records)
+
+@app.post("/analyze-sensor/stream", response_model=AnalysisResult)
+async def analyze_sensor_stream(request: Request, response: Response, user_name: str = "UserA"):
+    """NDJSON 본문을 읽는 대로 컬럼형으로 변환해 분석 (업로드 크기와 무관하게 메모리 사용 제한)"""
+    from sensor_ingest import SensorFrameBuilder
+
+    builder = SensorFrameBuilder()
+    await read_ndjson_records(request, builder)
+    sensor_frame = builder.build()
+    if sensor_frame.time_range is None:
+        return analysis_response([], [])
+
+    result = await run_analysis(request, response, user_name, sensor_frame)
+    return analysis_response(result["sleepEvents"], result["outingEvents"])
+
+
+@app.post("/analyze-sensor/incremental", response_model=AnalysisResult)
+async def analyze_sensor_incremental(data: List[SensorDataDTO], user_name: str = "UserA"):
+    """거주자별 상태를 유지하며 새 데이터만 분석, 새로 생기거나 바뀐 이벤트만 반환"""
+    from analysis_pipeline import event_records
+
+    start = time.perf_counter()
+    sleep_periods, outing_periods = await incremental_executor.run(
+        get_incremental_analyzer().update, user_name, to_sensor_json_data(data)
     )
-    outing_analyzer.analyze()
-    df_outing_periods = outing_analyzer.get_results()
-
-    outing_events = []
-    for _, row in df_outing_periods.iterrows():
-        start_time = datetime.fromisoformat(row['outing_start'])
-        end_time = datetime.fromisoformat(row['outing_end'])
-
-        outing_events.append(OutingEventDTO(
-            outingStartTime=start_time.isoformat(),
-            outingEndTime=end_time.isoformat(),
-            outingDurationMinutes=int((end_time - start_time).total_seconds() // 60)
-        ))
-
-    # 수면 이벤트 출력
-    print("[수면 이벤트]")
-    for event in sleep_events:
-        print(f"- 시작: {event.sleepStartTime}, 종료: {event.sleepEndTime}, 총 {event.sleepDurationMinutes}분")
-
-    # 외출 이벤트 출력
-    print("[외출 이벤트]")
-    for event in outing_events:
-        print(f"- 시작: {event.outingStartTime}, 종료: {event.outingEndTime}, 총 {event.outingDurationMinutes}분")
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="incremental.update")
+    REQUESTS.inc(endpoint="/analyze-sensor/incremental", outcome="ok")
 
-    return AnalysisResult(sleepEvents=sleep_events, outingEvents=outing_events)
+    sleep_events = event_records("sleep", [start for start, _ in sleep_periods], [end for _, end in sleep_periods])
+    outing_events = event_records("outing", [start for start, _ in outing_periods],
+                                  [end for _, end in outing_periods])
+    write_events(user_name, sleep_events, outing_events)
+    return analysis_response(sleep_events, outing_events)
+
+
+@app.post("/analyze-sensor/batch", response_model=List[ResidentAnalysisResult])
+async def analyze_sensor_batch(residents: List[ResidentSensorData]):
+    """여러 거주자를 프로세스 풀에 나눠 분석"""
+    from analysis_pipeline import analyze_resident
+
+    thresholds = await run_in_threadpool(lambda: [get_threshold_store().load(resident.user_name) for resident in residents])
+    outcomes = await batch_executor.map(analyze_resident, [
+        (resident.user_name, to_sensor_json_data(resident.data), resident_thresholds)
+        for resident, resident_thresholds in zip(residents, thresholds)
+    ])
+
+    results = []
+    analyzed = []
+    for resident, outcome in zip(residents, outcomes):
+        if isinstance(outcome, BaseException):
+            REQUESTS.inc(endpoint="/analyze-sensor/batch", outcome="error")
+            results.append({"user_name": resident.user_name, "result": None, "error": repr(outcome)})
+            continue
+        REQUESTS.inc(endpoint="/analyze-sensor/batch", outcome="ok")
+        analyzed.append((resident.user_name, outcome))
+        results.append({
+            "user_name": resident.user_name,
+            "result": {"sleepEvents": outcome["sleepEvents"], "outingEvents": outcome["outingEvents"]},
+            "error": None
+        })
+    await run_in_threadpool(save_analyses, analyzed)
+    if FAST_RESPONSE:
+        return FastJSONResponse(results)
+    return [ResidentAnalysisResult(**result) for result in results]
+
+
+def get_activity_cache():
+    global activity_cache
+    if not os.environ.get("INFLUX_URL"):
+        raise HTTPException(status_code=503, detail="InfluxDB 설정(INFLUX_URL)이 없습니다.")
+    with components_lock:
+        if activity_cache is None:
+            # influx_reader(pandas)는 /activity-summary를 처음 요청할 때만 import
+            from influx_reader import InfluxActivityReader
+            activity_cache = ActivitySummaryCache(
+                InfluxActivityReader(
+                    influx_url=os.environ["INFLUX_URL"],
+                    token=os.environ.get("INFLUX_TOKEN", ""),
+                    org=os.environ.get("INFLUX_ORG", ""),
+                    bucket=os.environ.get("INFLUX_BUCKET", "sensor_data")
+                ),
+                capacity=int(os.environ.get("ACTIVITY_CACHE_CAPACITY", "100000")),
+                grace_minutes=int(os.environ.get("ACTIVITY_CACHE_GRACE_MINUTES", "0")),
+                callbacks=[write_activity]
+            )
+        return activity_cache
+
+@app.get("/activity-summary", response_model=List[ActivitySummaryDTO])
+async def activity_summary(user_name: str = "UserA", start_date: Optional[date] = None,
+                           end_date: Optional[date] = None, days: int = 7):
+    """날짜별 PIR/레이더 총 활동량 (지난 날짜는 캐시, 오늘만 다시 조회)
+
+    기간을 지정하지 않으면 end_date(기본 오늘, UTC)까지 최근 days일이다.
+    """
+    cache = get_activity_cache()
+    end_date = end_date or cache.today()
+    start_date = start_date or end_date - timedelta(days=days - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date가 end_date보다 늦습니다.")
+    return await cache.summary_async(user_name, start_date, end_date)
+
+@app.delete("/activity-summary/cache")
+async def invalidate_activity_summary(user_name: Optional[str] = None, start_date: Optional[date] = None,
+                                      end_date: Optional[date] = None):
+    """늦게 도착한 데이터가 있을 때 해당 거주자/기간의 캐시 삭제 (지정하지 않은 조건은 전체)"""
+    return {"invalidated": get_activity_cache().invalidate(user_name, start_date, end_date)}
+
+
+def get_risk_scorer():
+    global risk_scorer
+    with risk_scorer_lock:
+        if risk_scorer is None:
+            if not os.path.exists(RISK_MODEL_PATH):
+                raise HTTPException(status_code=503, detail="위험군 모델이 없습니다. risk_analyzer.py --model로 학습하세요.")
+            # sklearn은 위험군 판별을 처음 요청할 때만 import
+            from risk_analyzer import RiskScorer
+            risk_scorer = RiskScorer.load(RISK_MODEL_PATH)
+        return risk_scorer
+
+@app.post("/risk-score", response_model=List[RiskScoreDTO])
+async def risk_score(request: RiskScoreRequest):
+    """주간 통계로 거주자별 위험도 판별 (학습된 모델 사용, 재학습 없음)
+
+    previous(직전 주 통계)가 없으면 모델 학습 기준 주와 비교한 변화량을 사용한다.
+    """
+    if not request.week:
+        return []
+    scorer = await run_in_threadpool(get_risk_scorer)
+    week = [dict(stats) for stats in request.week]
+    previous = [dict(stats) for stats in request.previous] if request.previous else None
+    return await run_in_threadpool(scorer.score_records, week, previous)
+
+
+def publish_alert(alert):
+    """stream_processor 알림을 구독 중인 /alerts/stream 연결에 전달 (분석 스레드에서 호출)"""
+    for loop, queue, user_name in list(alert_subscribers):
+        if user_name is None or user_name == alert["user_name"]:
+            loop.call_soon_threadsafe(offer_alert, queue, alert)
+
+def offer_alert(queue, alert):
+    # 읽지 않는 구독자 때문에 메모리가 늘지 않도록 큐가 차면 버림
+    if not queue.full():
+        queue.put_nowait(alert)
+
+@app.post("/alerts/ingest")
+async def ingest_alerts(data: List[SensorDataDTO], user_name: str = "UserA"):
+    """실시간 센서 값을 반영하고 이번에 발생한 알림 목록 반환 (구독자에게도 전달)"""
+    alerts = await run_in_threadpool(get_stream_processor().ingest, user_name, to_sensor_json_data(data))
+    REQUESTS.inc(endpoint="/alerts/ingest", outcome="ok")
+    return alerts
+
+@app.get("/alerts/stream")
+async def stream_alerts(request: Request, user_name: Optional[str] = None):
+    """알림을 Server-Sent Events로 전달 (user_name이 없으면 전체 거주자)"""
+    subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=1000), user_name)
+    alert_subscribers.add(subscriber)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    alert = await asyncio.wait_for(subscriber[1].get(), timeout=ALERT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {alert['type']}\ndata: {dumps(alert).decode()}\n\n"
+        finally:
+            alert_subscribers.discard(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/weekly-features")
+async def weekly_features(week_start: Optional[date] = None, user_name: Optional[str] = None):
+    """주간 위험군 특성 (week_start가 속한 주, /risk-score의 week로 사용 가능)"""
+    store = get_feature_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="특성 저장소(FEATURE_STORE_PATH)가 설정되지 않았습니다.")
+    return store.weekly(week_start, user_name).to_dict("records")
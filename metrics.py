@@ -0,0 +1,179 @@
+import cProfile
+import threading
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DEFAULT_SIZE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+DEFAULT_BYTES_BUCKETS = (2**16, 2**20, 2**22, 2**24, 2**26, 2**28, 2**30)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + inner + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple((name, str(labels.get(name, ""))) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._render_samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, label_names=()):
+        super().__init__(name, documentation, label_names)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, label_names=(), function=None):
+        super().__init__(name, documentation, label_names)
+        self._values = {}
+        self._function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _render_samples(self):
+        if self._function is not None:
+            return [f"{self.name} {self._function()}"]
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _render_samples(self):
+        lines = []
+        for key, (counts, total, count) in self._series.items():
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', bound),))} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=(), function=None):
+        return self.register(Gauge(name, documentation, label_names, function))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self):
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "analysis_stage_seconds", "분석 단계별 소요 시간(초)", ["stage"]
+)
+INPUT_SIZE = REGISTRY.histogram(
+    "analysis_input_size", "분석 입력 크기 (entries, readings, minutes, door_events)", ["kind"],
+    buckets=DEFAULT_SIZE_BUCKETS
+)
+DATAFRAME_BYTES = REGISTRY.histogram(
+    "analysis_dataframe_peak_bytes", "분석 중 가장 큰 DataFrame 메모리(바이트)", ["analyzer"],
+    buckets=DEFAULT_BYTES_BUCKETS
+)
+REQUESTS = REGISTRY.counter(
+    "analysis_requests_total", "엔드포인트별 분석 요청 수", ["endpoint", "outcome"]
+)
+RESULT_CACHE = REGISTRY.counter(
+    "analysis_result_cache_total", "분석 결과 캐시 조회 수 (계층별 hit/miss)", ["tier", "outcome"]
+)
+ALERTS = REGISTRY.counter(
+    "stream_alerts_total", "실시간 스트림 처리기가 보낸 알림 수", ["type"]
+)
+EVENT_SINK = REGISTRY.counter(
+    "event_sink_lines_total", "분석 결과 기록 줄 수 (queued, written, retried, failed, dropped)", ["outcome"]
+)
+
+
+def record_analysis_metrics(metrics):
+    """analyze_resident 결과의 "metrics"(stages, sizes, dataframe_bytes)를 히스토그램에 반영
+
+    프로세스 풀에서 실행한 분석도 부모 프로세스에서 집계되도록 결과와 함께 전달받는다.
+    """
+    for stage, seconds in metrics.get("stages", {}).items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    for kind, size in metrics.get("sizes", {}).items():
+        INPUT_SIZE.observe(size, kind=kind)
+    for analyzer, size in metrics.get("dataframe_bytes", {}).items():
+        DATAFRAME_BYTES.observe(size, analyzer=analyzer)
+
+
+def profiled(path, fn, *args):
+    """fn(*args)를 cProfile로 실행하고 통계를 path에 저장 (프로세스 풀에서도 사용 가능)"""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args)
+    finally:
+        profiler.dump_stats(path)
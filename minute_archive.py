@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from sensor_ingest import DOOR_CLOSE, DOOR_OPEN, NS_PER_MINUTE, SENSOR_CODES, SensorFrame
+
+DOOR_CODES = [DOOR_OPEN, DOOR_CLOSE]
+
+
+class MinuteArchive:
+    """거주자별 센서 값/문 이벤트를 .npy 컬럼 파일로 보관하는 아카이브
+
+    root/<user_name>/ 아래에 센서마다 channel<i>_minute.npy(int64 epoch 분, 오름차순)와
+    channel<i>_value.npy(float64), 문 이벤트는 door_time.npy(int64 ns)와
+    door_code.npy(int8, DOOR_CODES 위치)를 둔다. 읽을 때는 memory-map으로 열어
+    필요한 구간만 잘라 SensorFrame을 만든다.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _dir(self, user_name):
+        return os.path.join(self.root, user_name)
+
+    def _path(self, user_name, name):
+        return os.path.join(self._dir(user_name), f"{name}.npy")
+
+    def _load(self, user_name, name, dtype):
+        path = self._path(user_name, name)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=dtype)
+        return np.load(path, mmap_mode="r")
+
+    def _save(self, user_name, name, values):
+        # 다른 프로세스가 읽는 중일 수 있으므로 임시 파일에 쓴 뒤 교체
+        path = self._path(user_name, name)
+        temporary = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(temporary, values)
+        os.replace(temporary, path)
+
+    def residents(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(self._dir(name)))
+
+    def write(self, user_name, frame):
+        """SensorFrame을 기존 데이터와 합쳐 저장 (같은 센서·분은 새 값, 같은 문 이벤트는 하나만)"""
+        os.makedirs(self._dir(user_name), exist_ok=True)
+        readings = frame.readings
+        for i, sensor in enumerate(SENSOR_CODES):
+            new = readings[readings["sensor"] == sensor]
+            minute = np.r_[self._load(user_name, f"channel{i}_minute", np.int64), new["minute"].to_numpy()]
+            value = np.r_[self._load(user_name, f"channel{i}_value", np.float64), new["value"].to_numpy()]
+            merged = (
+                pd.DataFrame({"minute": minute, "value": value})
+                .drop_duplicates("minute", keep="last")
+                .sort_values("minute", kind="stable")
+            )
+            self._save(user_name, f"channel{i}_minute", merged["minute"].to_numpy(dtype=np.int64))
+            self._save(user_name, f"channel{i}_value", merged["value"].to_numpy(dtype=np.float64))
+
+        doors = frame.door_events
+        time = np.r_[self._load(user_name, "door_time", np.int64),
+                     doors["time"].to_numpy(dtype="datetime64[ns]").view(np.int64)]
+        code = np.r_[self._load(user_name, "door_code", np.int8),
+                     np.searchsorted(DOOR_CODES, doors["event_code"].to_numpy(dtype=str)).astype(np.int8)]
+        merged = pd.DataFrame({"time": time, "code": code}).drop_duplicates().sort_values("time", kind="stable")
+        self._save(user_name, "door_time", merged["time"].to_numpy(dtype=np.int64))
+        self._save(user_name, "door_code", merged["code"].to_numpy(dtype=np.int8))
+
+    def minute_range(self, user_name):
+        """저장된 센서 값의 (최소, 최대) epoch 분, 없으면 None"""
+        bounds = [
+            (int(minute[0]), int(minute[-1]))
+            for minute in (self._load(user_name, f"channel{i}_minute", np.int64) for i in range(len(SENSOR_CODES)))
+            if len(minute)
+        ]
+        if not bounds:
+            return None
+        return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
+    def frame(self, user_name, start_minute, end_minute):
+        """[start_minute, end_minute) 구간의 SensorFrame
+
+        각 센서의 직전 값은 start_minute 시점 값으로 넣어 구간 앞부분도 이어서 ffill되게 한다.
+        """
+        sensors, minutes, values = [], [], []
+        for i, sensor in enumerate(SENSOR_CODES):
+            minute = self._load(user_name, f"channel{i}_minute", np.int64)
+            value = self._load(user_name, f"channel{i}_value", np.float64)
+            lo, hi = np.searchsorted(minute, [start_minute, end_minute])
+            selected_minute = np.asarray(minute[lo:hi])
+            selected_value = np.asarray(value[lo:hi])
+            if lo > 0 and (hi == lo or selected_minute[0] != start_minute):
+                selected_minute = np.r_[start_minute, selected_minute]
+                selected_value = np.r_[value[lo - 1], selected_value]
+            sensors.append(np.full(len(selected_minute), i, dtype=np.int8))
+            minutes.append(selected_minute)
+            values.append(selected_value)
+
+        code = np.concatenate(sensors)
+        readings = pd.DataFrame({
+            "sensor": pd.Categorical.from_codes(code, categories=SENSOR_CODES),
+            "minute": np.concatenate(minutes).astype(np.int64),
+            "value": np.concatenate(values).astype(np.float64),
+        })
+
+        door_time = self._load(user_name, "door_time", np.int64)
+        door_code = self._load(user_name, "door_code", np.int8)
+        lo, hi = np.searchsorted(door_time, [start_minute * NS_PER_MINUTE, end_minute * NS_PER_MINUTE])
+        door_events = pd.DataFrame({
+            "time": np.asarray(door_time[lo:hi]).astype("datetime64[ns]"),
+            "event_code": np.asarray(DOOR_CODES, dtype=object)[np.asarray(door_code[lo:hi], dtype=np.int64)],
+        })
+
+        time_range = None
+        if len(readings):
+            time_range = (pd.Timestamp(int(readings["minute"].min()) * NS_PER_MINUTE),
+                          pd.Timestamp(int(readings["minute"].max()) * NS_PER_MINUTE))
+        return SensorFrame(readings, door_events, time_range)
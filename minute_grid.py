@@ -0,0 +1,182 @@
+import numpy as np
+
+ILLUMINANCE_WINDOW_MINUTES = 12 * 60
+
+
+class MinuteGrid:
+    """분 단위 센서 격자의 압축 표현
+
+    minutes: int32 epoch 분 (오름차순)
+    channels: 센서별 float32 배열 (ffill 적용, 값이 없으면 NaN)
+    masks: 비트 단위로 압축(np.packbits)한 bool 배열, mask(name)으로 풀어서 사용
+    """
+
+    def __init__(self, minutes, channels):
+        self.minutes = np.asarray(minutes, dtype=np.int32)
+        self.channels = {name: np.asarray(values, dtype=np.float32) for name, values in channels.items()}
+        self._masks = {}
+        # 오프라인 구간 [시작, 끝) epoch 분 (from_readings(max_gap=...)에서 채움)
+        self.gaps = np.empty((0, 2), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.minutes)
+
+    @property
+    def times(self):
+        return self.minutes.astype("datetime64[m]").astype("datetime64[ns]")
+
+    def channel(self, name):
+        return self.channels[name]
+
+    def set_mask(self, name, values):
+        self._masks[name] = np.packbits(np.asarray(values, dtype=bool))
+
+    def mask(self, name):
+        return np.unpackbits(self._masks[name], count=len(self.minutes)).view(bool)
+
+    @property
+    def nbytes(self):
+        return (
+            self.minutes.nbytes
+            + sum(values.nbytes for values in self.channels.values())
+            + sum(packed.nbytes for packed in self._masks.values())
+        )
+
+    @classmethod
+    def from_readings(cls, readings, start_minute, end_minute, sensors, max_gap=None):
+        """readings(sensor, minute, value)를 [start_minute, end_minute] 격자에 놓고 ffill
+
+        max_gap(분)이 주어지면 값은 측정 후 max_gap분까지만 이어 쓰고, 어떤 센서 값도
+        max_gap분 넘게 없는 구간은 행을 만들지 않고 gaps에 [시작, 끝) 분으로 기록한다.
+        """
+        readings = readings[(readings["minute"] >= start_minute) & (readings["minute"] <= end_minute)]
+        if max_gap is None:
+            minutes = np.arange(start_minute, end_minute + 1, dtype=np.int64)
+            gaps = np.empty((0, 2), dtype=np.int64)
+        else:
+            minutes, gaps = online_minutes(readings["minute"].to_numpy(), start_minute, end_minute, max_gap)
+        channels = {}
+        for sensor in sensors:
+            selected = readings[readings["sensor"] == sensor]
+            order = np.argsort(selected["minute"].to_numpy(), kind="stable")
+            position = np.searchsorted(minutes, selected["minute"].to_numpy()[order])
+            column = np.full(len(minutes), np.nan, dtype=np.float32)
+            column[position] = selected["value"].to_numpy()[order]
+            channels[sensor] = ffill(column, minutes, max_gap)
+        grid = cls(minutes, channels)
+        grid.gaps = gaps
+        return grid
+
+    @property
+    def gap_minutes(self):
+        """격자에서 뺀 오프라인 구간의 총 분"""
+        return int((self.gaps[:, 1] - self.gaps[:, 0]).sum())
+
+
+def online_minutes(reading_minutes, start_minute, end_minute, max_gap):
+    """측정 시각마다 [측정, 측정 + max_gap] 분을 온라인으로 보고 (온라인 분 배열, 오프라인 [시작, 끝) 구간) 반환"""
+    measured = np.unique(reading_minutes.astype(np.int64))
+    if len(measured) == 0:
+        return np.empty(0, dtype=np.int64), np.array([[start_minute, end_minute + 1]], dtype=np.int64)
+
+    new_segment = np.r_[True, measured[1:] > measured[:-1] + max_gap + 1]
+    segment_starts = measured[new_segment]
+    segment_ends = np.minimum(np.r_[measured[np.flatnonzero(new_segment)[1:] - 1], measured[-1]] + max_gap, end_minute)
+
+    lengths = segment_ends - segment_starts + 1
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    minutes = np.arange(lengths.sum(), dtype=np.int64) - offsets + np.repeat(segment_starts, lengths)
+
+    gap_starts = np.r_[start_minute, segment_ends + 1]
+    gap_ends = np.r_[segment_starts, end_minute + 1]
+    gaps = np.column_stack([gap_starts, gap_ends])
+    return minutes, gaps[gap_ends > gap_starts]
+
+
+def ffill(values, minutes=None, limit=None):
+    """NaN을 직전 값으로 채움 (맨 앞의 NaN은 유지)
+
+    limit(분)이 주어지면 minutes 기준으로 limit분보다 오래된 값은 NaN으로 둔다.
+    """
+    valid = ~np.isnan(values)
+    last = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(last, out=last)
+    # 첫 유효 값 이전 행은 0번 행(NaN)을 가리키므로 그대로 NaN
+    filled = values[last]
+    if limit is not None:
+        filled[minutes - minutes[last] > limit] = np.nan
+    return filled
+
+
+class WindowAggregate:
+    """window분(기본 12시간) 구간별 조도 최솟값과 취침 장소 후보 수
+
+    구간 번호(epoch 분 // window) 순으로 정렬된 배열로 보관하며, update()/count()는
+    from_minute 이후 구간과 아직 없는 구간만 다시 계산한다.
+    """
+
+    def __init__(self, window=ILLUMINANCE_WINDOW_MINUTES):
+        self.window = window
+        self.ids = np.empty(0, dtype=np.int64)
+        self.minimum = np.empty(0, dtype=np.float32)
+        self.bedroom = np.empty(0, dtype=np.int64)
+        self.living = np.empty(0, dtype=np.int64)
+        # 지금까지 반영한 마지막 분 (이 분이 속한 구간은 뒤에 행이 더 붙을 수 있음)
+        self.last_minute = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def update(self, minutes, illuminance, from_minute=None):
+        """조도 최솟값 갱신, 다시 계산한 행(bool 배열)을 반환해 count()에 넘김
+
+        from_minute이 None이면 minutes의 모든 구간을 다시 계산한다.
+        """
+        window_id = minutes.astype(np.int64) // self.window
+        stale = np.ones(len(minutes), dtype=bool)
+        if from_minute is not None and self.last_minute is not None:
+            from_minute = min(from_minute, self.last_minute)
+        if len(minutes):
+            last = int(minutes[-1])
+            self.last_minute = last if self.last_minute is None else max(self.last_minute, last)
+        if from_minute is not None:
+            stale = (window_id >= from_minute // self.window) | ~np.isin(window_id, self.ids)
+        if not stale.any():
+            return stale
+
+        ids = window_id[stale]
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        values = illuminance[stale]
+        minimum = np.minimum.reduceat(np.where(np.isnan(values), np.inf, values), starts)
+        minimum[np.isinf(minimum)] = np.nan
+
+        ids = ids[starts]
+        keep = ~np.isin(self.ids, ids)
+        order = np.argsort(np.r_[self.ids[keep], ids], kind="stable")
+        self.ids = np.r_[self.ids[keep], ids][order]
+        self.minimum = np.r_[self.minimum[keep], minimum.astype(np.float32)][order]
+        # 다시 계산한 구간의 후보 수는 count()에서 채움
+        self.bedroom = np.r_[self.bedroom[keep], np.zeros(len(ids), dtype=np.int64)][order]
+        self.living = np.r_[self.living[keep], np.zeros(len(ids), dtype=np.int64)][order]
+        return stale
+
+    def thresholds(self, minutes):
+        """행마다 해당 구간의 조도 최솟값 + 1"""
+        position = np.searchsorted(self.ids, minutes.astype(np.int64) // self.window)
+        return self.minimum[position] + np.float32(1)
+
+    def count(self, minutes, stale, bedroom, living):
+        """update()가 다시 계산한 행(stale)의 구간별 취침 장소 후보 수 기록"""
+        position = np.searchsorted(self.ids, minutes[stale].astype(np.int64) // self.window)
+        self.bedroom += np.bincount(position, weights=bedroom[stale], minlength=len(self.ids)).astype(np.int64)
+        self.living += np.bincount(position, weights=living[stale], minlength=len(self.ids)).astype(np.int64)
+
+    def room_counts(self):
+        """전체 구간의 (bedroom 후보 수, living 후보 수)"""
+        return int(self.bedroom.sum()), int(self.living.sum())
+
+    def trim(self, before_minute):
+        """before_minute 이전에 끝나는 구간 삭제"""
+        keep = self.ids >= before_minute // self.window
+        self.ids, self.minimum = self.ids[keep], self.minimum[keep]
+        self.bedroom, self.living = self.bedroom[keep], self.living[keep]
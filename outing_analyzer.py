@@ -1,8 +1,31 @@
-from flask import Flask, request, jsonify
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-app = Flask(__name__)
+import sleep_engine
+from log_utils import get_event_logger, get_logger, stage_timer
+from sensor_ingest import MOTION_SENSORS, VITAL_SENSORS, ensure_sensor_frame
+
+logger = get_logger(__name__)
+event_logger = get_event_logger(__name__)
+
+
+class WindowSum:
+    """측정값의 시간순 누적합 인덱스
+
+    [start, end) 구간 합을 이진 탐색 두 번으로 계산한다.
+    """
+
+    def __init__(self, activity_df, measurements):
+        selected = activity_df[activity_df["measurement"].isin(measurements)]
+        times = selected["time"].to_numpy(dtype="datetime64[ns]")
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.cumsum = np.concatenate(([0.0], np.cumsum(selected["value"].to_numpy(dtype=np.float64)[order])))
+
+    def between(self, start, end):
+        lo, hi = np.searchsorted(self.times, np.array([start, end], dtype="datetime64[ns]"), side="left")
+        return self.cumsum[hi] - self.cumsum[lo]
 
 class OutingAnalyzer:
     def __init__(self, sensor_json_data,
@@ -13,130 +36,100 @@ class OutingAnalyzer:
         self.threshold_radar_pir = threshold_radar_pir
         self.threshold_home_activity = threshold_home_activity
         self.alpha = alpha
+        self.is_outside = False
+        self.last_door_close_time = None
         self.external_status = []
+        # 단계별 소요 시간(초), analyze()에서 채움
+        self.timings = {}
         self.activity_df = pd.DataFrame()
         self.door_df = pd.DataFrame()
 
-    def parse_data(self):
-        activity_data = []
-        door_events = []
-
-        for entry in self.raw_data:
-            sensor = entry.get("sensor")
-            timestamp = entry.get("time")
-            try:
-                time = pd.to_datetime(timestamp.replace("Z", ""))
-            except:
-                continue
-
-            if sensor in ["심박", "호흡"]:
-                values = entry.get("values", [])
-                n = len(values)
-                for i, val in enumerate(values):
-                    try:
-                        activity_data.append({
-                            "time": time - timedelta(minutes=(n - 1 - i)),
-                            "measurement": sensor,
-                            "value": float(val)
-                        })
-                    except:
-                        continue
+    @property
+    def thresholds(self):
+        """현재 적응형 임계값 (ThresholdStore 저장용)"""
+        return {
+            "threshold_heart_breath": self.threshold_heart_breath,
+            "threshold_radar_pir": self.threshold_radar_pir,
+            "threshold_home_activity": self.threshold_home_activity,
+        }
 
-            elif sensor in ["PIR활동", "레이더활동"]:
-                try:
-                    activity_data.append({
-                        "time": time,
-                        "measurement": sensor,
-                        "value": float(entry["value"])
-                    })
-                except:
-                    continue
-
-            elif sensor == "문열림":
-                door_events.append({"time": time, "event_code": "E0100"})
-            elif sensor == "문닫힘":
-                door_events.append({"time": time, "event_code": "E0101"})
+    def parse_data(self):
+        frame = ensure_sensor_frame(self.raw_data)
+        readings = frame.readings[frame.readings["sensor"].isin(VITAL_SENSORS + MOTION_SENSORS)]
 
         # activity_df는 이벤트가 있든 없든 만들어 줌
-        self.activity_df = pd.DataFrame(activity_data).sort_values("time")
-
-        # door_events가 비어 있으면 빈 DataFrame만 만들어두고 리턴
-        if not door_events:
-            self.door_df = pd.DataFrame(columns=["time", "event_code"])
-            return
-
-        self.activity_df = pd.DataFrame(activity_data).sort_values("time")
-        self.door_df = pd.DataFrame(door_events).sort_values("time")
+        self.activity_df = pd.DataFrame({
+            "time": readings["minute"].to_numpy().astype("datetime64[m]").astype("datetime64[ns]"),
+            "measurement": readings["sensor"].astype(str).to_numpy(),
+            "value": readings["value"].to_numpy(),
+        }).sort_values("time", kind="stable")
+        self.door_df = frame.door_events
 
     def analyze(self):
-        self.parse_data()
+        with stage_timer(logger, "outing.parse_data", self.timings):
+            self.parse_data()
 
         if self.door_df.empty:
-            print('door 이벤트 없음')
+            logger.debug("door 이벤트 없음")
             return
 
-        is_outside = False
-        last_door_close_time = None
+        with stage_timer(logger, "outing.process_door_events", self.timings, door_events=len(self.door_df)):
+            self.process_door_events(list(self.door_df["time"]), self.door_df["event_code"].tolist())
+
+    def process_door_events(self, door_times, door_codes, ready_until=None):
+        """문 이벤트를 순서대로 처리해 외출 상태(is_outside)와 임계값을 갱신
+
+        ready_until이 주어지면 판단에 필요한 60분 뒤 데이터까지 들어온 이벤트만 처리한다.
+        처리한 이벤트 수를 반환한다.
+        """
+        vital_sum = WindowSum(self.activity_df, VITAL_SENSORS)
+        motion_sum = WindowSum(self.activity_df, MOTION_SENSORS)
 
         i = 0
-        while i < len(self.door_df):
-            current_event = self.door_df.iloc[i]
-            event_time = current_event["time"]
+        while i < len(door_times):
+            event_time = door_times[i]
+            event_code = door_codes[i]
+
+            if ready_until is not None and event_time + timedelta(minutes=60) > ready_until:
+                break
 
-            if current_event["event_code"] == "E0101":
-                last_door_close_time = event_time
+            if event_code == "E0101":
+                self.last_door_close_time = event_time
 
-                if i + 1 < len(self.door_df):
-                    next_event = self.door_df.iloc[i + 1]
-                    if next_event["event_code"] == "E0100" and (next_event["time"] - event_time) <= timedelta(minutes=3):
+                if i + 1 < len(door_times):
+                    if door_codes[i + 1] == "E0100" and (door_times[i + 1] - event_time) <= timedelta(minutes=3):
                         i += 1
                         continue
 
-                mask_vital = self.activity_df["measurement"].isin(["심박", "호흡"])
-                sum_1min = self.activity_df[
-                    mask_vital &
-                    (self.activity_df["time"] >= event_time + timedelta(minutes=5)) &
-                    (self.activity_df["time"] < event_time + timedelta(minutes=30))
-                ]["value"].sum()
+                sum_1min = vital_sum.between(event_time + timedelta(minutes=5), event_time + timedelta(minutes=30))
 
                 is_exit = sum_1min <= self.threshold_heart_breath
-                print(f"sum_1min: {sum_1min}, threshold_heart_breath: {self.threshold_heart_breath}")
+                event_logger.debug("door_close=%s sum_1min=%s threshold_heart_breath=%s",
+                                   event_time, sum_1min, self.threshold_heart_breath)
 
                 if is_exit:
-                    mask_motion = self.activity_df["measurement"].isin(["레이더활동", "PIR활동"])
-                    sum_30min = self.activity_df[
-                        mask_motion &
-                        (self.activity_df["time"] >= event_time + timedelta(minutes=30)) &
-                        (self.activity_df["time"] < event_time + timedelta(minutes=60))
-                    ]["value"].sum()
-                    before_30min = self.activity_df[
-                        mask_motion &
-                        (self.activity_df["time"] >= event_time - timedelta(minutes=30)) &
-                        (self.activity_df["time"] < event_time + timedelta(minutes=30))
-                    ]["value"].sum()
-
-                    print(f"sum_30min: {sum_30min}, threshold_radar_pir: {self.threshold_radar_pir}")
+                    sum_30min = motion_sum.between(event_time + timedelta(minutes=30), event_time + timedelta(minutes=60))
+                    before_30min = motion_sum.between(event_time - timedelta(minutes=30), event_time + timedelta(minutes=30))
+
+                    event_logger.debug("door_close=%s sum_30min=%s threshold_radar_pir=%s",
+                                       event_time, sum_30min, self.threshold_radar_pir)
                     if sum_30min >= self.threshold_radar_pir or before_30min * 0.5 < sum_30min:
                         is_exit = False
 
-                if is_exit and not is_outside:
-                    is_outside = True
+                if is_exit and not self.is_outside:
+                    self.is_outside = True
                     self.external_status.append({"time": event_time, "status": 1})
 
                     self.threshold_heart_breath = self.alpha * (sum_1min * 1.5) + (1 - self.alpha) * self.threshold_heart_breath
                     self.threshold_radar_pir = self.alpha * (sum_30min * 1.5) + (1 - self.alpha) * self.threshold_radar_pir
 
-            elif current_event["event_code"] == "E0100" and is_outside:
+            elif event_code == "E0100" and self.is_outside:
                 exit_time = event_time
-                mask_motion = self.activity_df["measurement"].isin(["레이더활동", "PIR활동"])
-                activity_motion = self.activity_df[mask_motion]
 
-                start_time = last_door_close_time + timedelta(minutes=30)
+                start_time = self.last_door_close_time + timedelta(minutes=30)
                 while start_time < event_time:
                     end_interval = start_time + timedelta(minutes=30)
-                    interval_sum = activity_motion[
-                        (activity_motion["time"] >= start_time) & (activity_motion["time"] < end_interval)
-                    ]["value"].sum()
+                    interval_sum = motion_sum.between(start_time, end_interval)
 
                     if interval_sum >= self.threshold_home_activity:
                         exit_time = end_interval
@@ -149,31 +142,27 @@ class OutingAnalyzer:
                     exit_time = event_time
 
                 self.external_status.append({"time": exit_time, "status": 0})
-                is_outside = False
+                self.is_outside = False
 
             i += 1
 
+        return i
+
     def get_results(self):
         if not self.external_status:
             return pd.DataFrame()
 
-        df_status = pd.DataFrame(self.external_status)
-        df_status["time"] = pd.to_datetime(df_status["time"])
-        df_status["date"] = df_status["time"].dt.date
-
-        outing_periods = []
-        current_start = None
-
-        for _, row in df_status.iterrows():
-            if row["status"] == 1:
-                current_start = row["time"]
-            elif row["status"] == 0 and current_start is not None:
-                outing_periods.append({
-                    "date": current_start.date(),
-                    "outing_start": current_start.isoformat(),
-                    "outing_end": row["time"].isoformat(),
-                    "outing_duration_minutes": (row["time"] - current_start).total_seconds() / 60
-                })
-                current_start = None
-
-        return pd.DataFrame(outing_periods)
+        times = pd.to_datetime(pd.Series([status["time"] for status in self.external_status]))
+        statuses = np.array([status["status"] for status in self.external_status])
+
+        # 외출(1) 뒤 처음 나오는 귀가(0)와 짝을 지음, 외출이 연속이면 마지막 외출 기준
+        starts, ends = sleep_engine.pair_transitions(np.where(statuses == 1, 1, -1))
+        outing_start = times.iloc[starts].reset_index(drop=True)
+        outing_end = times.iloc[ends].reset_index(drop=True)
+
+        return pd.DataFrame({
+            "date": outing_start.dt.date,
+            "outing_start": outing_start,
+            "outing_end": outing_end,
+            "outing_duration_minutes": (outing_end - outing_start) // pd.Timedelta(minutes=1)
+        })
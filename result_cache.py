@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from json_response import dumps
+from metrics import RESULT_CACHE
+
+
+def payload_digest(user_name, sensor_json_data):
+    """정규화한 요청 본문(거주자, 센서 레코드)의 SHA-256"""
+    digest = hashlib.sha256(dumps(user_name))
+    digest.update(dumps(sensor_json_data))
+    return digest.hexdigest()
+
+
+def cache_key(digest, params, max_gap=None, version=0):
+    """요청 본문 digest와 분석 파라미터(임계값, alpha, 최대 공백 분), 분석 코드 버전을 합친 캐시 키
+
+    디스크 계층은 재시작 후에도 남으므로 결과가 달라지는 설정/코드 변경은 모두 키에 넣는다.
+    """
+    params = {name: float(value) for name, value in sorted(params.items())}
+    return hashlib.sha256(digest.encode() + dumps([params, max_gap, version])).hexdigest()
+
+
+class ResultCache:
+    """같은 요청 본문의 분석 결과 캐시
+
+    메모리에는 직렬화한 결과를 최대 max_bytes까지 LRU로 두고, directory가 주어지면
+    로컬 디스크에도 저장한다. 두 계층 모두 ttl초가 지나면 사용하지 않는다.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, ttl=300, directory=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = directory
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key, body, expires_at):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= len(previous[0])
+            if len(body) > self.max_bytes:
+                return
+            self._entries[key] = (body, expires_at)
+            self.nbytes += len(body)
+            while self.nbytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def get(self, key):
+        """캐시된 결과 dict, 없거나 만료되었으면 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                self.nbytes -= len(entry[0])
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            RESULT_CACHE.inc(tier="memory", outcome="hit")
+            return json.loads(entry[0])
+        RESULT_CACHE.inc(tier="memory", outcome="miss")
+
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            expires_at = os.path.getmtime(path) + self.ttl
+            if expires_at <= now:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, "rb") as f:
+                body = f.read()
+        except OSError:
+            RESULT_CACHE.inc(tier="disk", outcome="miss")
+            return None
+        RESULT_CACHE.inc(tier="disk", outcome="hit")
+        self._remember(key, body, expires_at)
+        return json.loads(body)
+
+    def put(self, keys, value):
+        """value(기본 자료형 dict)를 keys 각각에 저장"""
+        body = dumps(value)
+        expires_at = time.time() + self.ttl
+        for key in keys:
+            self._remember(key, body, expires_at)
+            if self.directory:
+                # 쓰는 도중에 읽히지 않도록 임시 파일에 쓴 뒤 교체
+                path = self._path(key)
+                temporary = f"{path}.{threading.get_ident()}.tmp"
+                with open(temporary, "wb") as f:
+                    f.write(body)
+                os.replace(temporary, path)
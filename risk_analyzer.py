@@ -1,11 +1,10 @@
-import pandas as pd
+import argparse
+
+import joblib
 import numpy as np
+import pandas as pd
 from sklearn.ensemble import IsolationForest
 
-# 파일 불러오기
-df_w1 = pd.read_csv("user_stats_week1.csv")
-df_w2 = pd.read_csv("user_stats_week2.csv")
-
 # 사용할 특성
 features = [
     "total_outings",
@@ -16,40 +15,118 @@ features = [
     "avg_radar"
 ]
 
-# 사용자 기준 정렬 및 인덱싱
-week1 = df_w1.set_index("user_name")[features].sort_index()
-week2 = df_w2.set_index("user_name")[features].sort_index()
-
-# feature별 평균과 표준편차 계산
-mu = week1.mean(axis=0)     # 각 feature의 평균
-sigma = week1.std(axis=0)   # 각 feature의 표준편차
-
-# Z-score 계산
-Z1 = (week1 - mu) / sigma
-Z2 = (week2 - mu) / sigma
-
-# 변화량 계산
-D = Z2 - Z1
-D.columns = [f"{col}_delta" for col in D.columns]
-
-# Isolation Forest 입력 구성
-X_input = pd.concat([Z2, D], axis=1)
-
-# Isolation Forest 모델 학습 및 예측
-model = IsolationForest(n_estimators=300, contamination="auto", random_state=42)
-model.fit(X_input)
-risk_score = model.decision_function(X_input)
-anomaly_score = model.predict(X_input)
-risk_label = np.where(anomaly_score == -1, "HighRisk", "Normal")
-
-# 결과 정리
-X_result = X_input.copy()
-X_result["risk_score"] = risk_score
-X_result["anomaly_score"] = anomaly_score
-X_result["risk_label"] = risk_label
-X_result = X_result.reset_index().round(2)
-
-# 결과 저장 및 출력
-X_result.to_csv("zscore_feature_based_risk_analysis.csv", index=False)
-print("위험군 분석 완료: zscore_feature_based_risk_analysis.csv")
-print(X_result[["user_name", "risk_score", "anomaly_score", "risk_label"]].sort_values(by="risk_score"))
\ No newline at end of file
+
+def load_week(path):
+    """주간 통계 CSV를 user_name 기준으로 정렬·인덱싱한 특성 표로 읽음"""
+    return prepare_week(pd.read_csv(path))
+
+
+def prepare_week(df):
+    return df.set_index("user_name")[features].sort_index()
+
+
+class RiskScorer:
+    """주간 통계 Z-score와 변화량으로 위험군을 판별하는 Isolation Forest
+
+    fit()은 기준 주(week1)의 feature별 평균/표준편차(mu, sigma)와 거주자별 Z-score를
+    저장하고 모델을 한 번 학습한다. 이후 새 주간 통계는 score()로 재학습 없이 판별하며
+    save()/load()로 학습 결과를 파일에 보관한다.
+    """
+
+    def __init__(self, n_estimators=300, random_state=42, n_jobs=-1):
+        self.n_estimators = n_estimators
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.model = None
+        self.mu = None
+        self.sigma = None
+        self.baseline_z = None
+
+    def zscore(self, week):
+        return (week - self.mu) / self.sigma
+
+    def build_input(self, week, previous=None):
+        """Isolation Forest 입력 (Z-score + 직전 주 대비 변화량)
+
+        previous가 없으면 기준 주의 Z-score와 비교하며, 기준 주에 없는 거주자는
+        변화량을 0으로 둔다.
+        """
+        Z = self.zscore(week)
+        Z_previous = self.zscore(previous) if previous is not None else self.baseline_z
+        D = (Z - Z_previous.reindex(Z.index)).fillna(0)
+        D.columns = [f"{col}_delta" for col in D.columns]
+        return pd.concat([Z, D], axis=1)
+
+    def fit(self, week1, week2):
+        # feature별 평균과 표준편차 계산
+        self.mu = week1.mean(axis=0)
+        self.sigma = week1.std(axis=0)
+        self.baseline_z = self.zscore(week1)
+
+        X_input = self.build_input(week2)
+        self.model = IsolationForest(n_estimators=self.n_estimators, contamination="auto",
+                                     random_state=self.random_state, n_jobs=self.n_jobs)
+        self.model.fit(X_input)
+        return self
+
+    def score(self, week, previous=None):
+        """주간 통계의 위험도 (입력 특성, risk_score, anomaly_score, risk_label, 소수점 2자리)"""
+        X_input = self.build_input(week, previous)
+        risk_score = self.model.decision_function(X_input)
+        anomaly_score = self.model.predict(X_input)
+
+        X_result = X_input.copy()
+        X_result["risk_score"] = risk_score
+        X_result["anomaly_score"] = anomaly_score
+        X_result["risk_label"] = np.where(anomaly_score == -1, "HighRisk", "Normal")
+        return X_result.reset_index().round(2)
+
+    def score_records(self, week, previous=None):
+        """{user_name, 특성...} dict 목록을 판별해 {user_name, risk_score, anomaly_score, risk_label} 목록 반환"""
+        previous = prepare_week(pd.DataFrame(previous)) if previous else None
+        result = self.score(prepare_week(pd.DataFrame(week)), previous)
+        return result[["user_name", "risk_score", "anomaly_score", "risk_label"]].to_dict("records")
+
+    def save(self, path):
+        joblib.dump({
+            "model": self.model, "mu": self.mu, "sigma": self.sigma, "baseline_z": self.baseline_z,
+            "params": {"n_estimators": self.n_estimators, "random_state": self.random_state, "n_jobs": self.n_jobs},
+        }, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        scorer = cls(**state["params"])
+        scorer.model = state["model"]
+        scorer.mu = state["mu"]
+        scorer.sigma = state["sigma"]
+        scorer.baseline_z = state["baseline_z"]
+        return scorer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주간 통계 기반 위험군 분석")
+    parser.add_argument("--week1", default="user_stats_week1.csv")
+    parser.add_argument("--week2", default="user_stats_week2.csv")
+    parser.add_argument("--output", default="zscore_feature_based_risk_analysis.csv")
+    parser.add_argument("--model", help="학습한 모델을 저장할 경로 (/risk-score의 RISK_MODEL_PATH)")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    # 파일 불러오기
+    week1 = load_week(args.week1)
+    week2 = load_week(args.week2)
+
+    scorer = RiskScorer(n_jobs=args.n_jobs).fit(week1, week2)
+    if args.model:
+        scorer.save(args.model)
+    X_result = scorer.score(week2)
+
+    # 결과 저장 및 출력
+    X_result.to_csv(args.output, index=False)
+    print(f"위험군 분석 완료: {args.output}")
+    print(X_result[["user_name", "risk_score", "anomaly_score", "risk_label"]].sort_values(by="risk_score"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+# 센서 코드 (readings["sensor"] 카테고리 순서)
+SENSOR_CODES = ["심박", "호흡", "레이더활동", "PIR활동", "조도"]
+VITAL_SENSORS = ["심박", "호흡"]
+MOTION_SENSORS = ["레이더활동", "PIR활동"]
+
+DOOR_OPEN = "E0100"
+DOOR_CLOSE = "E0101"
+
+NS_PER_MINUTE = 60 * 10**9
+
+
+def classify_sensor(sensor):
+    """센서 이름을 SENSOR_CODES 중 하나(또는 문 이벤트 코드)로 변환"""
+    if not sensor:
+        return None
+    if sensor == "문열림":
+        return DOOR_OPEN
+    if sensor == "문닫힘":
+        return DOOR_CLOSE
+    if "심박" in sensor:
+        return "심박"
+    if "호흡" in sensor:
+        return "호흡"
+    if "레이더" in sensor:
+        return "레이더활동"
+    if "PIR" in sensor:
+        return "PIR활동"
+    if "조도" in sensor:
+        return "조도"
+    return None
+
+
+class SensorFrame:
+    """센서 JSON 목록을 한 번에 변환한 컬럼형 데이터
+
+    readings: sensor(category), minute(int64, epoch 분), value(float64)
+    door_events: time(datetime64), event_code(E0100 문열림 / E0101 문닫힘)
+    time_range: 원본 측정 시각의 (최소, 최대) Timestamp, 데이터가 없으면 None
+    entry_count: 변환에 사용한 JSON 항목 수
+    """
+
+    def __init__(self, readings, door_events, time_range=None, entry_count=None):
+        self.readings = readings
+        self.door_events = door_events
+        self.time_range = time_range
+        self.entry_count = entry_count if entry_count is not None else len(readings) + len(door_events)
+
+    def channel(self, sensors):
+        """지정한 센서들의 (minute, value) 배열을 시간순으로 반환"""
+        if isinstance(sensors, str):
+            sensors = [sensors]
+        df = self.readings[self.readings["sensor"].isin(sensors)]
+        order = np.argsort(df["minute"].to_numpy(), kind="stable")
+        return df["minute"].to_numpy()[order], df["value"].to_numpy()[order]
+
+    @property
+    def minute_range(self):
+        """(최소, 최대) epoch 분, 데이터가 없으면 None"""
+        minutes = self.readings["minute"]
+        if minutes.empty:
+            return None
+        return int(minutes.min()), int(minutes.max())
+
+
+def _first_value(entry):
+    values = entry.get("values")
+    if values:
+        return values[0]
+    return entry.get("value")
+
+
+def parse_sensor_data(sensor_json_data):
+    """{"sensor", "time", "values"} 목록을 SensorFrame으로 변환
+
+    시간 문자열은 한 번에 파싱하고, 심박/호흡 배열은 마지막 값이 측정 시각이
+    되도록 분 단위로 펼친다 (값 i의 시각 = time - (n - 1 - i)분).
+    """
+    codes = []
+    times = []
+    counts = []
+    values = []
+
+    for entry in sensor_json_data:
+        code = classify_sensor(entry.get("sensor", ""))
+        if code is None:
+            continue
+        if code in VITAL_SENSORS:
+            vals = entry.get("values") or []
+        elif code in (DOOR_OPEN, DOOR_CLOSE):
+            vals = [np.nan]
+        else:
+            vals = [_first_value(entry)]
+        if not vals:
+            continue
+        codes.append(code)
+        times.append(entry.get("time") or "")
+        counts.append(len(vals))
+        values.extend(vals)
+
+    codes = np.asarray(codes, dtype=object)
+    counts = np.asarray(counts, dtype=np.int64)
+    time_index = pd.to_datetime(
+        pd.Series(times, dtype=object).str.replace("Z", "", regex=False),
+        format="ISO8601", errors="coerce"
+    )
+    time_ns = time_index.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    valid_time = time_index.notna().to_numpy()
+
+    is_door = np.isin(codes, [DOOR_OPEN, DOOR_CLOSE])
+    door_sel = is_door & valid_time
+    door_events = pd.DataFrame({
+        "time": time_index[door_sel].to_numpy(),
+        "event_code": codes[door_sel].astype(str),
+    }).sort_values("time", kind="stable").reset_index(drop=True)
+
+    # 배열 값 펼치기: 항목별 시작 분을 반복한 뒤 배열 내 위치만큼 보정
+    entry_minute = np.floor_divide(time_ns, NS_PER_MINUTE)
+    entry_keep = ~is_door & valid_time
+    offsets = np.arange(len(values), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    minute = np.repeat(entry_minute, counts) - (np.repeat(counts, counts) - 1 - offsets)
+    value = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+    keep = np.repeat(entry_keep, counts) & ~np.isnan(value)
+
+    readings = pd.DataFrame({
+        "sensor": pd.Categorical(np.repeat(codes, counts)[keep], categories=SENSOR_CODES),
+        "minute": minute[keep],
+        "value": value[keep],
+    })
+    valid_times = time_index[valid_time & (counts > 0)]
+    time_range = (valid_times.min(), valid_times.max()) if len(valid_times) else None
+    return SensorFrame(readings, door_events, time_range, entry_count=len(codes))
+
+
+def normalize_record(record):
+    """SensorDataDTO 형식(sensor_type_name, ...)의 레코드를 내부 형식(sensor, time, values)으로 변환"""
+    if "sensor_type_name" in record:
+        return {
+            "sensor": record.get("sensor_type_name"),
+            "time": record.get("measurement_time"),
+            "values": record.get("measurement_values"),
+        }
+    return record
+
+
+class SensorFrameBuilder:
+    """레코드를 조각(chunk) 단위로 받아 SensorFrame을 점진적으로 만듦
+
+    조각마다 바로 컬럼형으로 변환하므로 원본 JSON은 한 조각 분량만 메모리에 남는다.
+    """
+
+    def __init__(self, chunk_size=5000):
+        self.chunk_size = chunk_size
+        self.record_count = 0
+        self._records = []
+        self._readings = []
+        self._door_events = []
+        self._time_range = None
+
+    def add(self, record):
+        self._records.append(normalize_record(record))
+        if len(self._records) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def flush(self):
+        if not self._records:
+            return
+        chunk = parse_sensor_data(self._records)
+        self.record_count += len(self._records)
+        self._records = []
+        self._readings.append(chunk.readings)
+        self._door_events.append(chunk.door_events)
+        if chunk.time_range is not None:
+            if self._time_range is None:
+                self._time_range = chunk.time_range
+            else:
+                self._time_range = (min(self._time_range[0], chunk.time_range[0]),
+                                    max(self._time_range[1], chunk.time_range[1]))
+
+    def build(self):
+        self.flush()
+        if not self._readings:
+            return parse_sensor_data([])
+        readings = pd.concat(self._readings, ignore_index=True)
+        door_events = (
+            pd.concat(self._door_events, ignore_index=True)
+            .sort_values("time", kind="stable")
+            .reset_index(drop=True)
+        )
+        return SensorFrame(readings, door_events, self._time_range, entry_count=self.record_count)
+
+
+def ensure_sensor_frame(sensor_data):
+    """SensorFrame이면 그대로, JSON 목록이면 변환해서 반환"""
+    if isinstance(sensor_data, SensorFrame):
+        return sensor_data
+    return parse_sensor_data(sensor_data)
@@ -1,211 +1,216 @@
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 
+import sleep_engine
+from log_utils import get_logger, stage_timer
+from minute_grid import MinuteGrid, WindowAggregate
+from sensor_ingest import NS_PER_MINUTE, SENSOR_CODES, ensure_sensor_frame
+
+logger = get_logger(__name__)
+
 
 class SleepAnalyzer:
-    def __init__(self, user_name, sensor_json_data, start_date, end_date):
+    def __init__(self, user_name, sensor_json_data, start_date, end_date, windows=None, changed_minute=None,
+                 max_gap=None):
+        """windows: 이전 분석의 12시간 구간 집계(WindowAggregate), changed_minute 이후 구간만 다시 계산
+        max_gap: 센서 값을 이어 쓰는 최대 분, 이보다 긴 오프라인 구간은 분석에서 제외 (None이면 제한 없음)
+        """
         self.user_name = user_name
         self.start_date = pd.to_datetime(start_date)
         self.end_date = pd.to_datetime(end_date)
         self.sensor_json_data = sensor_json_data
+        self.sensor_frame = ensure_sensor_frame(sensor_json_data)
+        self.windows = windows if windows is not None else WindowAggregate()
+        self.changed_minute = changed_minute
+        self.max_gap = max_gap
 
-        self.df_all = self.load_json_data()
-        self.df_all["date"] = self.df_all["_time"].dt.date
+        self.grid = self.load_json_data()
 
         self.sleep_start_times = {}
         self.wake_start_times = {}
         self.df_sleep_periods = None
         self.df_sleep_daily = None
         self.room_type = None
+        # 분별 수면 상태 (apply_sleep_state 이후 int8 배열)
+        self.sleep_state = None
+        # 단계별 소요 시간(초), analyze()에서 채움
+        self.timings = {}
 
     def load_json_data(self):
-        data = []
-
-        for entry in self.sensor_json_data:
-            sensor = entry.get("sensor", "")
-            time_str = entry.get("time", "")
-            try:
-                time = pd.to_datetime(time_str.replace("Z", ""))
-            except Exception:
-                continue
-
-            values = entry.get("values", [])
-
-            if "심박" in sensor or "호흡" in sensor:
-                n = len(values)
-                for i, val in enumerate(values):
-                    try:
-                        minute = time - timedelta(minutes=(n - 1 - i))
-                        data.append([
-                            "심박" if "심박" in sensor else "호흡",
-                            minute,
-                            float(val)
-                        ])
-                    except:
-                        continue
-            elif "레이더" in sensor or "PIR" in sensor or "조도" in sensor:
-                try:
-                    val = float(values[0])
-                    name = "레이더활동" if "레이더" in sensor else ("PIR활동" if "PIR" in sensor else "조도")
-                    data.append([name, time, val])
-                except:
-                    continue
-
-        df = pd.DataFrame(data, columns=["sensor", "_time", "value"])
-        df["_time"] = pd.to_datetime(df["_time"])
-        df["value"] = pd.to_numeric(df["value"], errors="coerce")
-        df = df.dropna()
-        df = df.pivot(index="_time", columns="sensor", values="value").reset_index()
-
-        full_index = pd.date_range(start=self.start_date, end=self.end_date, freq="min")
-        df_all = pd.DataFrame({"_time": full_index})
-        df_all = df_all.merge(df, on="_time", how="left").ffill()
-
-        df_all["조도_threshold"] = df_all.groupby(pd.Grouper(key="_time", freq="12h"))["조도"].transform("min") + 1
-        df_all["dark_mask"] = df_all["조도"] <= df_all["조도_threshold"]
-        df_all["light_mask"] = ~df_all["dark_mask"]
-
-        df_all["bedroom_candidate"] = (
-            df_all["dark_mask"] & (df_all["심박"] > 0) & (df_all["호흡"] > 0) & (df_all["레이더활동"] > 0)
-        )
-        df_all["living_candidate"] = (
-            df_all["dark_mask"] & (df_all["PIR활동"] > 3) &
-            (df_all["심박"] == 0) & (df_all["호흡"] == 0) & (df_all["레이더활동"] == 0)
-        )
-
-        df_all["date"] = df_all["_time"].dt.date
-        return df_all
+        start = self.start_date.value // NS_PER_MINUTE
+        end = self.end_date.value // NS_PER_MINUTE
+        grid = MinuteGrid.from_readings(self.sensor_frame.readings, start, end, SENSOR_CODES, self.max_gap)
+
+        heart, breath, radar = grid.channel("심박"), grid.channel("호흡"), grid.channel("레이더활동")
+        pir, illuminance = grid.channel("PIR활동"), grid.channel("조도")
+
+        # 12시간 구간별 최저 조도 + 1 이하면 어두운 상태 (바뀐 구간만 다시 계산)
+        stale = self.windows.update(grid.minutes, illuminance, self.changed_minute)
+        dark = illuminance <= self.windows.thresholds(grid.minutes)
+        bedroom = dark & (heart > 0) & (breath > 0) & (radar > 0)
+        living = dark & (pir > 3) & (heart == 0) & (breath == 0) & (radar == 0)
+        self.windows.count(grid.minutes, stale, bedroom, living)
+
+        grid.set_mask("dark_mask", dark)
+        grid.set_mask("bedroom_candidate", bedroom)
+        grid.set_mask("living_candidate", living)
+        return grid
+
+    @property
+    def df_all(self):
+        """분 단위 결과를 DataFrame으로 변환 (호환/디버깅용, 호출할 때마다 새로 만듦)"""
+        grid = self.grid
+        df = pd.DataFrame({"_time": grid.times})
+        for sensor in SENSOR_CODES:
+            df[sensor] = grid.channel(sensor)
+        df["조도_threshold"] = self.windows.thresholds(grid.minutes)
+        df["dark_mask"] = grid.mask("dark_mask")
+        df["light_mask"] = ~df["dark_mask"]
+        df["bedroom_candidate"] = grid.mask("bedroom_candidate")
+        df["living_candidate"] = grid.mask("living_candidate")
+        df["date"] = df["_time"].dt.date
+        if self.sleep_state is not None:
+            df["sleep_state"] = self.sleep_state
+            df["awake"] = grid.mask("awake")
+        return df
 
     def determine_room_type(self):
-        if self.df_all["bedroom_candidate"].sum() >= self.df_all["living_candidate"].sum():
+        # 구간 집계 전체 기준 (증분 분석에서는 보관 중인 모든 구간)
+        bedroom, living = self.windows.room_counts()
+        if bedroom >= living:
             self.room_type = "bedroom"
         else:
             self.room_type = "living_room"
 
+    def _sensor(self, name):
+        return self.grid.channel(name)
+
+    def _zero_sensor(self):
+        return (
+            (self._sensor("심박") == 0) & (self._sensor("호흡") == 0) &
+            (self._sensor("레이더활동") == 0) & (self._sensor("PIR활동") == 0)
+        )
+
+    def _timestamp(self, row):
+        return pd.Timestamp(int(self.grid.minutes[row]) * NS_PER_MINUTE)
+
+    @staticmethod
+    def _to_date(day):
+        return np.datetime64(int(day), "D").astype(object)
+
     def detect_sleep_start_times(self):
-        for date, group in self.df_all[self.df_all["dark_mask"]].groupby("date"):
-            group = group.sort_values("_time").copy()
-            group = group[group["_time"].dt.hour >= 20]
-
-            if self.room_type == "bedroom":
-                group = group[(group["심박"] > 0) & (group["호흡"] > 0) & (group["레이더활동"] > 0)]
-                group["sensor_sum"] = group["심박"] + group["호흡"] + group["레이더활동"]
-                group["sensor_drop"] = group["sensor_sum"].shift(1) - group["sensor_sum"]
-            else:
-                group = group[group["PIR활동"] > 0]
-                group["sensor_drop"] = group["PIR활동"].shift(1) - group["PIR활동"]
-
-            if not group.empty:
-                idx = group["sensor_drop"].idxmax()
-                self.sleep_start_times[date] = group.loc[idx, "_time"]
+        heart, breath, radar = self._sensor("심박"), self._sensor("호흡"), self._sensor("레이더활동")
 
-    def detect_wake_start_times(self):
-        for date, group in self.df_all[self.df_all["light_mask"]].groupby("date"):
-            group = group.sort_values("_time").copy()
-            if self.room_type == "bedroom":
-                group["wake_condition"] = (
-                    (group["심박"] == 0) & (group["호흡"] == 0) | (group["레이더활동"] == 0)
-                ).rolling(window=10, min_periods=1).sum() == 10
-            else:
-                group["wake_condition"] = (group["PIR활동"] == 0).rolling(window=10, min_periods=1).sum() == 10
-
-            if group["wake_condition"].any():
-                self.wake_start_times[date] = group.loc[group["wake_condition"]].iloc[0]["_time"]
+        if self.room_type == "bedroom":
+            candidate = (heart > 0) & (breath > 0) & (radar > 0)
+            signal = heart + breath + radar
+        else:
+            signal = self._sensor("PIR활동")
+            candidate = signal > 0
 
-    def apply_sleep_state(self):
-        df = self.df_all.set_index("_time").copy()
-        df["sleep_state"] = 0
+        days, rows = sleep_engine.detect_sleep_starts(
+            self.grid.minutes, self.grid.mask("dark_mask"), candidate, signal
+        )
+        self.sleep_start_times = {self._to_date(d): self._timestamp(r) for d, r in zip(days, rows)}
+
+    def detect_wake_start_times(self):
+        if self.room_type == "bedroom":
+            condition = (
+                (self._sensor("심박") == 0) & (self._sensor("호흡") == 0) | (self._sensor("레이더활동") == 0)
+            )
+        else:
+            condition = self._sensor("PIR활동") == 0
 
-        df["awake"] = (
-            (df["심박"] == 0) & (df["호흡"] == 0) & (df["레이더활동"] == 0)
-            if self.room_type == "bedroom"
-            else (df["PIR활동"] == 0)
+        days, rows = sleep_engine.detect_wake_starts(
+            self.grid.minutes, ~self.grid.mask("dark_mask"), condition
         )
+        self.wake_start_times = {self._to_date(d): self._timestamp(r) for d, r in zip(days, rows)}
+
+    def apply_sleep_state(self):
+        if self.room_type == "bedroom":
+            awake = (self._sensor("심박") == 0) & (self._sensor("호흡") == 0) & (self._sensor("레이더활동") == 0)
+        else:
+            awake = self._sensor("PIR활동") == 0
 
         awake_threshold = pd.Timedelta(minutes=60)
 
+        # 취침일 다음 날의 기상 시각이 있는 밤만 수면 구간 [취침, 기상)으로 사용
+        intervals = []
         for date, sleep_start in self.sleep_start_times.items():
-            next_day = date + timedelta(days=1)
-            wake_start = self.wake_start_times.get(next_day)
+            wake_start = self.wake_start_times.get(date + timedelta(days=1))
             if sleep_start and wake_start:
-                df.loc[(df.index >= sleep_start) & (df.index < wake_start), "sleep_state"] = 1
-
-                segment = df.loc[(df.index >= sleep_start) & (df.index < wake_start)].copy()
-                segment["awake_flag"] = segment["awake"]
-                segment["group"] = (segment["awake_flag"] != segment["awake_flag"].shift()).cumsum()
+                intervals.append((sleep_start.value // NS_PER_MINUTE, wake_start.value // NS_PER_MINUTE))
+        bounds = np.array(intervals, dtype=np.int64).reshape(-1, 2)
 
-                for _, grp_df in segment.groupby("group"):
-                    if grp_df["awake_flag"].iloc[0]:
-                        duration = grp_df.index[-1] - grp_df.index[0]
-                        if duration >= awake_threshold:
-                            df.loc[grp_df.index, "sleep_state"] = 0
-
-        self.df_all = df.reset_index()
+        self.sleep_state = sleep_engine.sleep_state(
+            self.grid.minutes, awake, bounds[:, 0], bounds[:, 1],
+            awake_threshold=awake_threshold // pd.Timedelta(minutes=1)
+        ).astype(np.int8)
+        self.grid.set_mask("awake", awake)
 
     def exception_handling(self):
-        dark_df = self.df_all[self.df_all["dark_mask"]].copy().sort_values("_time")
-        dark_df["time_diff"] = dark_df["_time"].diff()
-        dark_df["group"] = (dark_df["time_diff"] != pd.Timedelta(minutes=1)).cumsum()
-
-        for _, group_df in dark_df.groupby("group"):
-            total = len(group_df)
-            zero_count = ((group_df["심박"] == 0) & (group_df["호흡"] == 0) &
-                          (group_df["레이더활동"] == 0) & (group_df["PIR활동"] == 0)).sum()
-            if zero_count / total >= 0.9:
-                self.df_all.loc[group_df.index, "sleep_state"] = 0
-
-        valid_mask = (self.df_all["dark_mask"]) & (self.df_all["sleep_state"] != 0)
+        dark = self.grid.mask("dark_mask")
+        zero_sensor = self._zero_sensor()
+        state = sleep_engine.clear_zero_sensor_runs(self.grid.minutes, dark, zero_sensor, self.sleep_state)
+
+        valid_mask = dark & (state != 0)
         dark_mask_count = valid_mask.sum()
-        zero_sensor_count = (
-            ((self.df_all["심박"] == 0) & (self.df_all["호흡"] == 0) &
-             (self.df_all["레이더활동"] == 0) & (self.df_all["PIR활동"] == 0)) & valid_mask
-        ).sum()
+        zero_sensor_count = (zero_sensor & valid_mask).sum()
 
         if dark_mask_count > 0 and zero_sensor_count / dark_mask_count >= 0.6:
-            print(f"⚠️ {self.user_name}의 {self.start_date.date()} ~ {self.end_date.date()} 센서 값 60% 이상 0 → 수면 제거")
-            self.df_all.loc[valid_mask, "sleep_state"] = 0
+            logger.warning("%s의 %s ~ %s 센서 값 60%% 이상 0 → 수면 제거",
+                           self.user_name, self.start_date.date(), self.end_date.date())
+            state[valid_mask] = 0
+        self.sleep_state = state
 
     def analyze(self):
-        self.determine_room_type()
-        self.detect_sleep_start_times()
-        self.detect_wake_start_times()
-        self.apply_sleep_state()
-        self.exception_handling()
+        with stage_timer(logger, "sleep.determine_room_type", self.timings, minutes=len(self.grid)):
+            self.determine_room_type()
+        with stage_timer(logger, "sleep.detect_sleep_start_times", self.timings):
+            self.detect_sleep_start_times()
+        with stage_timer(logger, "sleep.detect_wake_start_times", self.timings):
+            self.detect_wake_start_times()
+        with stage_timer(logger, "sleep.apply_sleep_state", self.timings):
+            self.apply_sleep_state()
+        with stage_timer(logger, "sleep.exception_handling", self.timings):
+            self.exception_handling()
 
     def get_results(self):
-        print(f"예상 취침 장소: {self.room_type}")
-        df = self.df_all.copy().sort_values("_time")
-        df['state_change'] = df['sleep_state'].diff().fillna(0)
-
-        sleep_periods = []
-        current_sleep_start = None
-
-        for _, row in df.iterrows():
-            if row['state_change'] == 1:
-                current_sleep_start = row['_time']
-            elif row['state_change'] == -1 and current_sleep_start is not None:
-                wake_time = row['_time']
-                sleep_periods.append({
-                    'date': current_sleep_start.date(),
-                    'sleep_start': current_sleep_start,
-                    'wake_time': wake_time,
-                    'sleep_duration': wake_time - current_sleep_start
-                })
-                current_sleep_start = None
-
-        df_sleep_periods = pd.DataFrame(sleep_periods)
+        logger.debug("%s 예상 취침 장소: %s", self.user_name, self.room_type)
+        # 수면 상태가 0→1로 바뀌는 행이 취침, 1→0으로 바뀌는 행이 기상
+        state_change = np.zeros(len(self.sleep_state), dtype=np.int8)
+        state_change[1:] = np.diff(self.sleep_state)
+        starts, ends = sleep_engine.pair_transitions(state_change)
+        # 오프라인 구간(max_gap)에 걸친 수면은 나눠서 오프라인 시간을 수면으로 세지 않음
+        starts, ends, wake_minutes, after_gap = sleep_engine.split_at_gaps(self.grid.minutes, starts, ends)
+
+        # 중간 깸: 수면 상태로 유지된(깸 기준 시간보다 짧은) awake 연속 구간
+        awake_in_sleep = self.grid.mask("awake") & (self.sleep_state == 1)
+
+        sleep_start = pd.Series(self.grid.times[starts])
+        wake_time = pd.Series(wake_minutes.astype("datetime64[m]").astype("datetime64[ns]"))
+        df_sleep_periods = pd.DataFrame({
+            'date': sleep_start.dt.date,
+            'sleep_start': sleep_start,
+            'wake_time': wake_time,
+            'sleep_duration': wake_time - sleep_start,
+            'sleep_duration_minutes': wake_minutes.astype(np.int64) - self.grid.minutes[starts],
+            'intermediate_awakenings': sleep_engine.count_runs(awake_in_sleep, starts, ends),
+            # 오프라인 구간 뒤에 이어진 같은 밤의 수면 (밤 수 집계에서 제외)
+            'after_gap': after_gap
+        })
         self.df_sleep_periods = df_sleep_periods
 
         # 비어있을 경우
         if df_sleep_periods.empty:
-            print(f"⚠️ {self.user_name}의 수면 구간 데이터가 없습니다.")
+            logger.info("%s의 수면 구간 데이터가 없습니다.", self.user_name)
             self.df_sleep_daily = pd.DataFrame(columns=["date", "total_sleep_duration"])
             return self.room_type, self.df_sleep_periods, self.df_sleep_daily
 
-        # 비어있지 않은 경우에만 계산
-        df_sleep_periods['adjusted_wake_date'] = df_sleep_periods['wake_time'].apply(
-            lambda x: x.date() if x.hour < 12 else x.date() + timedelta(days=1)
-        )
+        # 비어있지 않은 경우에만 계산 (정오 이후 기상은 다음 날 수면으로 집계)
+        wake_day = wake_time.dt.normalize() + pd.to_timedelta(np.where(wake_time.dt.hour < 12, 0, 1), unit="D")
+        df_sleep_periods['adjusted_wake_date'] = wake_day.dt.date
         self.df_sleep_daily = (
             df_sleep_periods.groupby('adjusted_wake_date')['sleep_duration']
             .sum()
@@ -0,0 +1,168 @@
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def run_bounds(flags):
+    """연속 구간(run)별 시작/끝 인덱스를 행마다 반환
+
+    flags가 바뀌는 지점에서 구간이 나뉘며, (run_start, run_end)는 각 행이 속한
+    구간의 첫 행과 마지막 행 위치다.
+    """
+    n = len(flags)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    change = np.empty(n, dtype=bool)
+    change[0] = True
+    change[1:] = flags[1:] != flags[:-1]
+    run_id = np.cumsum(change) - 1
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:] - 1, n - 1)
+    return starts[run_id], ends[run_id]
+
+
+def first_per_day(days, positions):
+    """정렬된 (days, positions)에서 날짜별 첫 위치만 남김"""
+    if len(days) == 0:
+        return days, positions
+    _, first = np.unique(days, return_index=True)
+    return days[first], positions[first]
+
+
+def detect_sleep_starts(minutes, dark, candidate, signal):
+    """날짜별 취침 시각 위치
+
+    20시 이후 어두운 구간 중 candidate 조건을 만족하는 행들에서, 같은 날짜의 직전
+    행 대비 signal 감소량이 가장 큰 첫 행을 고른다.
+    반환: (day, row_position) 배열
+    """
+    hour = (minutes % MINUTES_PER_DAY) // 60
+    rows = np.flatnonzero(dark & (hour >= 20) & candidate)
+    days = minutes[rows] // MINUTES_PER_DAY
+    values = signal[rows]
+
+    drop = np.full(len(rows), np.nan)
+    drop[1:] = values[:-1] - values[1:]
+    drop[1:][days[1:] != days[:-1]] = np.nan
+
+    valid = ~np.isnan(drop)
+    rows, days, drop = rows[valid], days[valid], drop[valid]
+    order = np.lexsort((rows, -drop, days))
+    return first_per_day(days[order], rows[order])
+
+
+def detect_wake_starts(minutes, light, condition, window=10):
+    """날짜별 기상 시각 위치
+
+    밝은 구간의 행들에서 같은 날짜 안에 condition이 window개 행 연속으로 만족된
+    첫 행을 고른다.
+    반환: (day, row_position) 배열
+    """
+    rows = np.flatnonzero(light)
+    days = minutes[rows] // MINUTES_PER_DAY
+    cond = condition[rows]
+
+    position = np.arange(len(rows))
+    new_day = np.ones(len(rows), dtype=bool)
+    new_day[1:] = days[1:] != days[:-1]
+    # 연속 구간 시작: 조건 불만족 행의 다음 행, 또는 날짜가 바뀌는 행
+    run_start = np.where(~cond, position + 1, np.where(new_day, position, 0))
+    run_start = np.maximum.accumulate(run_start) if len(rows) else run_start
+    run_length = np.where(cond, position - run_start + 1, 0)
+
+    hit = run_length >= window
+    return first_per_day(days[hit], rows[hit])
+
+
+def sleep_state(minutes, awake, interval_starts, interval_ends, awake_threshold=60):
+    """수면 구간 [start, end) 안의 행을 1로 표시하고 긴 깸 구간은 0으로 되돌림
+
+    구간은 시작/끝이 모두 증가하는 순서여야 하며, 겹치는 부분은 나중 구간이 우선한다.
+    깸(run) 길이는 해당 수면 구간 안으로 잘라서 (마지막 시각 - 첫 시각)으로 계산하며,
+    minutes가 끊긴 곳(오프라인 구간)에서 run을 나눈다.
+    """
+    state = np.zeros(len(minutes), dtype=np.int64)
+    if len(interval_starts) == 0 or len(minutes) == 0:
+        return state
+
+    owner = np.searchsorted(interval_starts, minutes, side="right") - 1
+    covered = owner >= 0
+    covered[covered] = minutes[covered] < interval_ends[owner[covered]]
+
+    first_row = np.searchsorted(minutes, interval_starts, side="left")
+    last_row = np.searchsorted(minutes, interval_ends, side="left") - 1
+
+    segment = np.r_[0, np.cumsum(np.diff(minutes) != 1)]
+    run_start, run_end = run_bounds(awake + 2 * segment)
+    rows = np.flatnonzero(covered)
+    k = owner[rows]
+    clipped_start = np.maximum(run_start[rows], first_row[k])
+    clipped_end = np.minimum(run_end[rows], last_row[k])
+    long_awake = awake[rows] & (minutes[clipped_end] - minutes[clipped_start] >= awake_threshold)
+
+    state[rows] = np.where(long_awake, 0, 1)
+    return state
+
+
+def clear_zero_sensor_runs(minutes, dark, zero_sensor, state, ratio=0.9):
+    """연속된 어두운 구간 중 센서 값이 모두 0인 비율이 ratio 이상이면 수면 제거"""
+    rows = np.flatnonzero(dark)
+    if len(rows) == 0:
+        return state
+    breaks = np.ones(len(rows), dtype=bool)
+    breaks[1:] = np.diff(minutes[rows]) != 1
+    group = np.cumsum(breaks) - 1
+    total = np.bincount(group)
+    zeros = np.bincount(group, weights=zero_sensor[rows])
+    state = state.copy()
+    state[rows[(zeros / total >= ratio)[group]]] = 0
+    return state
+
+
+def pair_transitions(kinds):
+    """시작(1)/종료(-1) 표시 배열에서 (시작, 종료) 위치 쌍을 구함
+
+    종료 직전의 마지막 시작과 짝을 짓고, 이전 종료 이후 시작이 없는 종료와
+    짝이 없는 마지막 시작은 버린다 (순서대로 훑는 상태 기계와 같은 결과).
+    반환: (start_positions, end_positions) 배열
+    """
+    kinds = np.asarray(kinds)
+    position = np.arange(len(kinds))
+    last_start = np.maximum.accumulate(np.where(kinds == 1, position, -1)) if len(kinds) else position
+    ends = np.flatnonzero(kinds == -1)
+    previous_end = np.append(-1, ends[:-1])
+    ends = ends[last_start[ends] > previous_end]
+    return last_start[ends], ends
+
+
+def split_at_gaps(minutes, starts, ends):
+    """구간 [starts[i], ends[i]) 행을 minutes가 끊긴 곳(오프라인 구간)에서 나눔
+
+    끊긴 곳 앞에서 나뉜 구간은 마지막 행의 다음 분에 끝나고, 뒤 구간은 끊긴 곳 다음 행에서 시작한다.
+    반환: (시작 행, 끝 행(미포함), 끝 분, 끊긴 곳에서 이어진 구간 여부) 배열
+    """
+    breaks = np.flatnonzero(np.diff(minutes) != 1)
+    owner = np.searchsorted(starts, breaks, side="right") - 1
+    inside = owner >= 0
+    inside[inside] = breaks[inside] < ends[owner[inside]]
+    breaks = breaks[inside]
+
+    start_rows = np.r_[starts, breaks + 1]
+    continued = np.r_[np.zeros(len(starts), dtype=bool), np.ones(len(breaks), dtype=bool)]
+    order = np.argsort(start_rows, kind="stable")
+    start_rows, continued = start_rows[order], continued[order]
+    end_rows = np.r_[breaks + 1, ends]
+    end_minutes = np.r_[minutes[breaks] + 1, minutes[ends]]
+    order = np.argsort(end_rows, kind="stable")
+    end_rows, end_minutes = end_rows[order], end_minutes[order]
+    # 끊긴 곳이 구간 끝 바로 앞이면 뒤 구간은 비어 있음
+    keep = start_rows < end_rows
+    return start_rows[keep], end_rows[keep], end_minutes[keep], continued[keep]
+
+
+def count_runs(flags, starts, ends):
+    """구간 [starts[i], ends[i]) 안에서 시작하는 flags 연속 구간(run) 수"""
+    flags = np.asarray(flags, dtype=bool)
+    run_starts = np.flatnonzero(flags & ~np.r_[False, flags[:-1]])
+    return np.searchsorted(run_starts, ends) - np.searchsorted(run_starts, starts)
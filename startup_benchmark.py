@@ -0,0 +1,137 @@
+"""워커 시작 시간 벤치마크
+
+새 인터프리터에서 `python -X importtime -c "import main"`을 repeat번 실행해 main import 시간과
+오래 걸린 모듈, import 시점에 불러온 무거운 의존성(HEAVY_MODULES)을 보고하고,
+main.warm_up()(분석 모듈 미리 불러오기) 시간도 측정한다.
+환경 변수는 그대로(서비스 기본값) 사용하고, 임계값 DB 등 상대 경로 파일은 임시 디렉터리에 만든다.
+import 시간 중앙값이 budget을 넘거나 무거운 의존성이 import 시점에 불러와지면 실패한다.
+
+    python startup_benchmark.py --repeat 5 --budget-ms 600
+    python startup_benchmark.py --json > startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# main import 시점에는 불러오지 않아야 하는 모듈 (엔드포인트에서 처음 필요할 때 import)
+HEAVY_MODULES = ["pandas", "numpy", "sklearn", "influxdb_client", "flask"]
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _run_python(args, cwd):
+    # 작업 디렉터리만 바꾸고 저장소의 모듈을 import
+    environment = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=environment, capture_output=True, text=True,
+                          check=True)
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → [(모듈, self_us, cumulative_us, 깊이)] (출력 순서, 하위 모듈이 먼저 나옴)"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def direct_imports(modules, module):
+    """module이 직접 import한 모듈의 [(모듈, cumulative_us)]"""
+    children = []
+    for name, _, cumulative, depth in modules:
+        if depth == 0:
+            if name == module:
+                return children
+            children = []
+        elif depth == 1:
+            children.append((name, cumulative))
+    return []
+
+
+def measure_import(module="main", cwd=ROOT):
+    """(import 시간(초), 전체 프로세스 시간(초), importtime 모듈 표)"""
+    start = time.perf_counter()
+    completed = _run_python(["-X", "importtime", "-c", f"import {module}"], cwd)
+    wall = time.perf_counter() - start
+    modules = parse_importtime(completed.stderr)
+    cumulative = next(cumulative for name, _, cumulative, depth in modules if name == module and depth == 0)
+    return cumulative / 1e6, wall, modules
+
+
+def measure_warm_up(cwd=ROOT):
+    code = "import time, main; start = time.perf_counter(); main.warm_up(); print(time.perf_counter() - start)"
+    completed = _run_python(["-c", code], cwd)
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def run(module="main", repeat=5, top=10, warm_up=True):
+    import_seconds, wall_seconds = [], []
+    modules = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(repeat):
+            seconds, wall, modules = measure_import(module, workdir)
+            import_seconds.append(seconds)
+            wall_seconds.append(wall)
+        warm_up_seconds = measure_warm_up(workdir) if warm_up and module == "main" else None
+
+    # 마지막 실행 기준, module이 직접 import한 모듈 중 오래 걸린 순
+    direct = sorted(direct_imports(modules, module), key=lambda item: item[1], reverse=True)
+    heavy = sorted({name.split(".")[0] for name, *_ in modules} & set(HEAVY_MODULES))
+    report = {
+        "config": {"module": module, "repeat": repeat},
+        "import_s": {"best": min(import_seconds), "median": statistics.median(import_seconds)},
+        "process_s": {"best": min(wall_seconds), "median": statistics.median(wall_seconds)},
+        "slowest_imports": [{"module": name, "cumulative_s": cumulative / 1e6} for name, cumulative in direct[:top]],
+        "heavy_modules": heavy,
+    }
+    if warm_up_seconds is not None:
+        report["warm_up_s"] = warm_up_seconds
+    return report
+
+
+def print_report(report):
+    config = report["config"]
+    print(f"module={config['module']} repeat={config['repeat']}")
+    print(f"import:  best {report['import_s']['best'] * 1000:.1f}ms  median {report['import_s']['median'] * 1000:.1f}ms")
+    print(f"process: best {report['process_s']['best'] * 1000:.1f}ms  median {report['process_s']['median'] * 1000:.1f}ms")
+    if "warm_up_s" in report:
+        print(f"warm-up: {report['warm_up_s'] * 1000:.1f}ms")
+    print(f"\n{'module':<30} {'cumulative(ms)':>15}")
+    for item in report["slowest_imports"]:
+        print(f"{item['module']:<30} {item['cumulative_s'] * 1000:>15.1f}")
+    print(f"\nimport 시점에 불러온 무거운 의존성: {', '.join(report['heavy_modules']) or '없음'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="워커 시작(import) 시간 벤치마크")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=600, help="import 시간 중앙값 목표 (0이면 확인 안 함)")
+    parser.add_argument("--no-warm-up", action="store_true", help="main.warm_up() 측정 생략")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    report = run(module=args.module, repeat=args.repeat, top=args.top, warm_up=not args.no_warm_up)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    if report["heavy_modules"]:
+        raise SystemExit(f"import 시점에 무거운 의존성을 불러옵니다: {', '.join(report['heavy_modules'])}")
+    if args.budget_ms and report["import_s"]["median"] * 1000 > args.budget_ms:
+        raise SystemExit(f"import 시간 {report['import_s']['median'] * 1000:.1f}ms가 목표 {args.budget_ms:.0f}ms를 넘습니다")
+
+
+if __name__ == "__main__":
+    main()
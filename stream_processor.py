@@ -0,0 +1,273 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from analysis_pipeline import isoformat
+from log_utils import get_logger
+from metrics import ALERTS
+from sensor_ingest import DOOR_CLOSE, DOOR_OPEN, MOTION_SENSORS, NS_PER_MINUTE, VITAL_SENSORS, ensure_sensor_frame
+
+logger = get_logger(__name__)
+
+
+def _ceil_minute(ns):
+    return -(-ns // NS_PER_MINUTE)
+
+
+def _isoformat(ns):
+    return isoformat([np.datetime64(ns, "ns")])[0]
+
+
+class MinuteRing:
+    """최근 capacity분의 분별 합계를 보관하는 고정 크기 링 버퍼
+
+    add()는 O(1)이며, 버퍼보다 오래된 분의 값은 버린다.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.minutes = [-1] * capacity
+        self.values = [0.0] * capacity
+
+    def add(self, minute, value):
+        slot = minute % self.capacity
+        if self.minutes[slot] != minute:
+            if self.minutes[slot] > minute:
+                return False
+            self.minutes[slot] = minute
+            self.values[slot] = 0.0
+        self.values[slot] += value
+        return True
+
+    def sum(self, start, end):
+        """[start, end) 분의 합계 (버퍼에 남아 있는 분만)"""
+        total = 0.0
+        for minute in range(max(start, end - self.capacity), end):
+            slot = minute % self.capacity
+            if self.minutes[slot] == minute:
+                total += self.values[slot]
+        return total
+
+
+class DoorEvent:
+    def __init__(self, time, code):
+        self.time = time
+        self.code = code
+        # 닫힘 직후 3분 안에 열림이 오면 판단하지 않음 (None: 아직 모름)
+        self.skip = None if code == DOOR_CLOSE else False
+        self.warned = False
+
+
+class ResidentStream:
+    """거주자 한 명의 실시간 상태 (링 버퍼, 판단 대기 중인 문 이벤트, 외출 상태)"""
+
+    def __init__(self, user_name, buffer_minutes=240,
+                 threshold_heart_breath=10, threshold_radar_pir=15, threshold_home_activity=50):
+        self.user_name = user_name
+        self.lock = threading.Lock()
+        # 마지막으로 데이터를 받은 시각 (time.monotonic, 오래 조용한 거주자 정리용)
+        self.last_seen = time.monotonic()
+        self.vitals = MinuteRing(buffer_minutes)
+        self.motion = MinuteRing(buffer_minutes)
+        # 지금까지 받은 가장 늦은 센서 값의 분 (이전 분의 값은 모두 들어온 것으로 봄)
+        self.watermark = None
+        self.last_motion_minute = None
+        self.inactivity_alerted = False
+
+        self.threshold_heart_breath = threshold_heart_breath
+        self.threshold_radar_pir = threshold_radar_pir
+        self.threshold_home_activity = threshold_home_activity
+        self.pending = deque()
+        self.is_outside = False
+        self.outing_start = None
+        self.last_door_close_time = None
+
+
+class StreamProcessor:
+    """센서 값이 들어오는 대로 외출/무활동을 판단해 알림을 보내는 스트림 처리기
+
+    OutingAnalyzer와 같은 규칙을 사용한다. 문이 닫힌 뒤 5~30분 생체 신호 합이
+    threshold_heart_breath 이하면 바로 "door_closed_no_vitals" 알림을 보내고, 30~60분
+    움직임 합까지 확인되면 "outing", 외출 중 문이 열리면 "returned" 알림을 보낸다. 귀가 시각은
+    OutingAnalyzer처럼 문이 닫히고 30분 뒤부터 30분 구간 움직임 합이 threshold_home_activity
+    이상인 첫 구간의 끝(문이 열린 시각 이전)이며, 링 버퍼에 남은 구간만 본다.
+    외출 중이 아닐 때 움직임(레이더/PIR)이 inactivity_minutes분 동안 없으면 "inactivity" 알림을 보낸다.
+    센서 값 하나는 링 버퍼에 O(1)로 더하고, 구간 합은 문 이벤트마다 한 번씩만 계산한다.
+    임계값(threshold_*)은 threshold_store에서 읽기만 하고 학습(alpha)은 배치 분석에 맡긴다.
+    idle_minutes분 동안 데이터가 없던 거주자의 상태는 정리한다.
+    """
+
+    def __init__(self, inactivity_minutes=120, buffer_minutes=240, threshold_store=None, callbacks=None,
+                 idle_minutes=24 * 60, **thresholds):
+        self.inactivity_minutes = inactivity_minutes
+        self.buffer_minutes = buffer_minutes
+        self.threshold_store = threshold_store
+        self.idle_minutes = idle_minutes
+        self.thresholds = thresholds
+        self.callbacks = list(callbacks or [])
+        # 마지막으로 데이터를 받은 순서 (앞쪽이 가장 오래 조용한 거주자)
+        self.states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_state(self, user_name):
+        with self._lock:
+            now = time.monotonic()
+            while self.states:
+                oldest = next(iter(self.states.values()))
+                if now - oldest.last_seen < self.idle_minutes * 60 or oldest.user_name == user_name:
+                    break
+                self.states.popitem(last=False)
+
+            state = self.states.get(user_name)
+            if state is None:
+                params = dict(self.thresholds)
+                if self.threshold_store is not None:
+                    params.update(self.threshold_store.load(user_name) or {})
+                state = ResidentStream(user_name, buffer_minutes=self.buffer_minutes, **params)
+                self.states[user_name] = state
+            state.last_seen = now
+            self.states.move_to_end(user_name)
+            return state
+
+    def ingest(self, user_name, sensor_data):
+        """센서 JSON 목록(또는 SensorFrame)을 반영하고 새로 발생한 알림 목록을 반환"""
+        frame = ensure_sensor_frame(sensor_data)
+        readings = frame.readings
+        sensors = readings["sensor"].astype(str).tolist()
+        minutes = readings["minute"].tolist()
+        values = readings["value"].tolist()
+        door_times = frame.door_events["time"].to_numpy(dtype="datetime64[ns]").view("int64").tolist()
+        door_codes = frame.door_events["event_code"].tolist()
+
+        state = self.get_state(user_name)
+        alerts = []
+        with state.lock:
+            for time, code in zip(door_times, door_codes):
+                self.add_door_event(state, time, code)
+            for sensor, minute, value in sorted(zip(sensors, minutes, values), key=lambda reading: reading[1]):
+                self.add_reading(state, sensor, minute, value, alerts)
+            self._evaluate(state, alerts)
+
+        for alert in alerts:
+            ALERTS.inc(type=alert["type"])
+            for callback in list(self.callbacks):
+                try:
+                    callback(alert)
+                except Exception:
+                    logger.exception("알림 콜백 실패 (user=%s, type=%s)", user_name, alert["type"])
+        return alerts
+
+    def add_door_event(self, state, time, code):
+        if code not in (DOOR_OPEN, DOOR_CLOSE):
+            return
+        # 늦게 들어온 문 이벤트도 시각 순서대로 끼워 넣음
+        index = len(state.pending)
+        while index > 0 and state.pending[index - 1].time > time:
+            index -= 1
+        state.pending.insert(index, DoorEvent(time, code))
+        # 닫힘 바로 다음 문 이벤트가 3분 안의 열림이면 그 닫힘은 판단하지 않음
+        for position in (index - 1, index):
+            if 0 <= position < len(state.pending) - 1:
+                event, following = state.pending[position], state.pending[position + 1]
+                if event.code == DOOR_CLOSE and not event.warned:
+                    event.skip = following.code == DOOR_OPEN and following.time - event.time <= 3 * NS_PER_MINUTE
+        # 문 이벤트도 사람이 있다는 신호
+        state.last_motion_minute = max(state.last_motion_minute or 0, time // NS_PER_MINUTE)
+        state.inactivity_alerted = False
+
+    def add_reading(self, state, sensor, minute, value, alerts):
+        if sensor in VITAL_SENSORS:
+            state.vitals.add(minute, value)
+        elif sensor in MOTION_SENSORS:
+            state.motion.add(minute, value)
+            if value > 0 and (state.last_motion_minute is None or minute > state.last_motion_minute):
+                state.last_motion_minute = minute
+                state.inactivity_alerted = False
+
+        if state.watermark is None or minute > state.watermark:
+            state.watermark = minute
+            if state.last_motion_minute is None:
+                state.last_motion_minute = minute
+            self._evaluate(state, alerts)
+
+    def _alert(self, state, kind, time, alerts, **details):
+        alerts.append({
+            "user_name": state.user_name,
+            "type": kind,
+            "time": _isoformat(time),
+            "detected_at": _isoformat(state.watermark * NS_PER_MINUTE),
+            **details,
+        })
+
+    def _vitals_sum(self, state, event):
+        start = _ceil_minute(event.time + 5 * NS_PER_MINUTE)
+        return state.vitals.sum(start, _ceil_minute(event.time + 30 * NS_PER_MINUTE))
+
+    def _evaluate(self, state, alerts):
+        watermark = state.watermark
+        if watermark is None:
+            return
+
+        for event in state.pending:
+            if event.skip is None and watermark > _ceil_minute(event.time) + 3:
+                event.skip = False
+            # 5~30분 생체 신호 확인은 앞선 이벤트 판단을 기다리지 않고 바로 알림
+            if (event.code == DOOR_CLOSE and event.skip is False and not event.warned
+                    and watermark >= _ceil_minute(event.time + 30 * NS_PER_MINUTE)):
+                event.warned = True
+                vitals = self._vitals_sum(state, event)
+                if vitals <= state.threshold_heart_breath and not state.is_outside:
+                    self._alert(state, "door_closed_no_vitals", event.time, alerts, vitals_sum=vitals)
+
+        self._process_doors(state, alerts)
+
+        # 외출 여부를 판단 중인 문 이벤트가 있으면 무활동으로 보지 않음
+        if (not state.is_outside and not state.pending and not state.inactivity_alerted
+                and watermark - state.last_motion_minute >= self.inactivity_minutes):
+            state.inactivity_alerted = True
+            self._alert(state, "inactivity", state.last_motion_minute * NS_PER_MINUTE, alerts,
+                        inactive_minutes=watermark - state.last_motion_minute)
+
+    def _process_doors(self, state, alerts):
+        """판단에 필요한 데이터가 들어온 문 이벤트를 순서대로 처리해 외출 상태 갱신"""
+        watermark = state.watermark
+        while state.pending:
+            event = state.pending[0]
+            if event.code == DOOR_OPEN:
+                if state.is_outside:
+                    # 귀가 시각 판단에 문이 열리기 전까지의 움직임이 필요
+                    if watermark < _ceil_minute(event.time):
+                        return
+                    state.is_outside = False
+                    self._alert(state, "returned", self._return_time(state, event.time), alerts,
+                                outing_start=_isoformat(state.outing_start), door_open=_isoformat(event.time))
+                state.pending.popleft()
+                continue
+
+            if event.skip is None or (not event.skip and not event.warned):
+                return
+            state.last_door_close_time = event.time
+            if not event.skip and self._vitals_sum(state, event) <= state.threshold_heart_breath:
+                if watermark < _ceil_minute(event.time + 60 * NS_PER_MINUTE):
+                    return
+                around = _ceil_minute(event.time + 30 * NS_PER_MINUTE)
+                sum_30min = state.motion.sum(around, _ceil_minute(event.time + 60 * NS_PER_MINUTE))
+                before_30min = state.motion.sum(_ceil_minute(event.time - 30 * NS_PER_MINUTE), around)
+                is_exit = not (sum_30min >= state.threshold_radar_pir or before_30min * 0.5 < sum_30min)
+                if is_exit and not state.is_outside:
+                    state.is_outside = True
+                    state.outing_start = event.time
+                    self._alert(state, "outing", event.time, alerts, motion_sum=sum_30min)
+            state.pending.popleft()
+
+    def _return_time(self, state, open_time):
+        """문이 열린 시각 이전에 집 안 활동이 처음 확인된 30분 구간의 끝 (없으면 문이 열린 시각)"""
+        start = state.last_door_close_time + 30 * NS_PER_MINUTE
+        while start < open_time:
+            end = start + 30 * NS_PER_MINUTE
+            if state.motion.sum(_ceil_minute(start), _ceil_minute(end)) >= state.threshold_home_activity:
+                return min(end, open_time)
+            start = end
+        return open_time
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _timestamp(start, minute):
+    return (start + timedelta(minutes=int(minute))).strftime(TIME_FORMAT)
+
+
+def generate_resident_payload(days=7, start=datetime(2025, 5, 1), seed=0, noise=0.05,
+                              vital_batch=10, illuminance_every=5, outings_per_day=1,
+                              spurious_doors_per_day=1):
+    """거주자 한 명의 /analyze-sensor 요청 본문(SensorDataDTO 목록)을 생성
+
+    - 22~06시 취침(심박/호흡/레이더 > 0, 조도 낮음), 낮에는 PIR/레이더 활동
+    - 심박/호흡은 vital_batch분 단위 배열, 레이더/PIR은 1분마다, 조도는 illuminance_every분마다
+    - 하루 outings_per_day번 외출(문닫힘 → 활동 없음 → 문열림)과 짧은 문 여닫힘
+    - noise 비율만큼 수면 중 센서 0(뒤척임)과 낮 시간 무작위 활동을 섞음
+    """
+    rng = np.random.default_rng(seed)
+    minutes = days * 24 * 60
+    minute_index = np.arange(minutes)
+    hour = (minute_index % 1440) / 60
+
+    bedtime = 22 + rng.normal(0, 0.5, days)
+    waketime = 6.5 + rng.normal(0, 0.5, days)
+    day = minute_index // 1440
+    asleep = (hour >= bedtime[day]) | (hour < waketime[day])
+
+    outside = np.zeros(minutes, dtype=bool)
+    door_events = []
+    for d in range(days):
+        for _ in range(outings_per_day):
+            leave = d * 1440 + int(rng.integers(9 * 60, 16 * 60))
+            back = leave + int(rng.integers(60, 240))
+            outside[leave + 1:back] = True
+            door_events += [("문닫힘", leave), ("문열림", min(back, minutes - 1))]
+        for _ in range(spurious_doors_per_day):
+            toggle = d * 1440 + int(rng.integers(8 * 60, 20 * 60))
+            door_events += [("문닫힘", toggle), ("문열림", toggle + int(rng.integers(1, 3)))]
+
+    restless = rng.random(minutes) < noise
+    heart = np.where(asleep & ~restless, rng.integers(50, 75, minutes), 0)
+    breath = np.where(asleep & ~restless, rng.integers(12, 20, minutes), 0)
+    radar = np.where(asleep & ~restless, rng.integers(1, 5, minutes), rng.integers(0, 12, minutes))
+    pir = np.where(asleep, (rng.random(minutes) < noise).astype(int), rng.integers(0, 10, minutes))
+    lux = np.where(asleep, rng.integers(0, 3, minutes), rng.integers(50, 400, minutes))
+    awake_vitals = ~asleep & (rng.random(minutes) < 0.3)
+    heart = np.where(awake_vitals, rng.integers(60, 90, minutes), heart)
+    breath = np.where(awake_vitals, rng.integers(12, 20, minutes), breath)
+    for channel in (heart, breath, radar, pir):
+        channel[outside] = 0
+
+    start = start.replace(second=0, microsecond=0)
+    payload = []
+    for minute in range(minutes):
+        timestamp = _timestamp(start, minute)
+        if (minute + 1) % vital_batch == 0:
+            batch = slice(minute + 1 - vital_batch, minute + 1)
+            payload.append({"sensor_type_name": "심박", "measurement_time": timestamp,
+                            "measurement_values": heart[batch].astype(float).tolist()})
+            payload.append({"sensor_type_name": "호흡", "measurement_time": timestamp,
+                            "measurement_values": breath[batch].astype(float).tolist()})
+        payload.append({"sensor_type_name": "레이더활동", "measurement_time": timestamp,
+                        "measurement_values": [float(radar[minute])]})
+        payload.append({"sensor_type_name": "PIR활동", "measurement_time": timestamp,
+                        "measurement_values": [float(pir[minute])]})
+        if minute % illuminance_every == 0:
+            payload.append({"sensor_type_name": "조도", "measurement_time": timestamp,
+                            "measurement_values": [float(lux[minute])]})
+    for sensor, minute in door_events:
+        payload.append({"sensor_type_name": sensor, "measurement_time": _timestamp(start, minute),
+                        "measurement_values": [1.0]})
+    payload.sort(key=lambda record: record["measurement_time"])
+    return payload
+
+
+def generate_facility_payloads(residents=10, days=7, seed=0, **kwargs):
+    """{user_name: payload} (거주자마다 seed를 달리함)"""
+    return {
+        f"resident-{i:04d}": generate_resident_payload(days=days, seed=seed + i, **kwargs)
+        for i in range(residents)
+    }
+
+
+def to_sensor_json_data(payload):
+    """SensorDataDTO 형식 목록을 분석기 입력 형식(sensor, time, values)으로 변환"""
+    return [
+        {"sensor": r["sensor_type_name"], "time": r["measurement_time"], "values": r["measurement_values"]}
+        for r in payload
+    ]
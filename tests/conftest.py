@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main import 전에 설정: 임계값/특성/결과 캐시를 파일에 남기지 않고, InfluxDB에 접속하지 않음
+os.environ.update({
+    "THRESHOLD_STORE_PATH": "",
+    "FEATURE_STORE_PATH": "",
+    "RESULT_CACHE_MAX_BYTES": "0",
+    "INFLUX_URL": "",
+    "EVENT_SINK": "0",
+    "WARM_UP": "0",
+})
+
+from synthetic_data import generate_resident_payload  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def payload():
+    """3일치 /analyze-sensor 요청 본문"""
+    return generate_resident_payload(days=3, seed=1)
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+class InfluxStub:
+    """InfluxDB HTTP API 대역 (/api/v2/query는 query_csv를 응답, /api/v2/write는 본문을 기록)"""
+
+    def __init__(self):
+        self.query_csv = ""
+        self.queries = []
+        self.writes = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path.startswith("/api/v2/write"):
+                    stub.writes.append((self.path, body.decode()))
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                stub.queries.append(json.loads(body)["query"])
+                data = stub.query_csv.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    @property
+    def written_lines(self):
+        return [line for _, body in self.writes for line in body.splitlines()]
+
+
+@pytest.fixture
+def influx_stub():
+    stub = InfluxStub()
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import main
+
+TODAY = datetime.now(timezone.utc).date()
+YESTERDAY = TODAY - timedelta(days=1)
+
+CSV_HEADER = """#datatype,string,long,dateTime:RFC3339,double,string,string
+#group,false,false,false,false,true,true
+#default,_result,,,,,
+,result,table,_time,_value,_measurement,user_name
+"""
+
+
+@pytest.fixture
+def activity_client(influx_stub, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("INFLUX_URL", influx_stub.url)
+    monkeypatch.setenv("INFLUX_ORG", "care")
+    monkeypatch.setattr(main, "activity_cache", None)
+    influx_stub.query_csv = CSV_HEADER + (
+        f",,0,{YESTERDAY}T00:00:00Z,12,PIR활동,A\n"
+        f",,0,{TODAY}T00:00:00Z,3,PIR활동,A\n"
+        f",,1,{YESTERDAY}T00:00:00Z,7.5,레이더활동,A\n"
+    )
+    # activity_cache가 남아 있는 동안 종료해야 lifespan이 비동기 클라이언트를 닫음
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_flux_query_and_parsing(activity_client, influx_stub):
+    response = activity_client.get("/activity-summary", params={"user_name": "A", "days": 3})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"date": YESTERDAY.isoformat(), "pirTotal": 12.0, "radarTotal": 7.5},
+        {"date": TODAY.isoformat(), "pirTotal": 3.0, "radarTotal": 0.0},
+    ]
+
+    query, = influx_stub.queries
+    start = TODAY - timedelta(days=2)
+    assert f"range(start: {start}T00:00:00Z, stop: {TODAY + timedelta(days=1)}T00:00:00Z)" in query
+    assert 'r["user_name"] == "A"' in query
+    assert 'r["_measurement"] == "PIR활동" or r["_measurement"] == "레이더활동"' in query
+    assert "aggregateWindow(every: 1d, fn: sum" in query
+
+
+def test_closed_days_are_cached(activity_client, influx_stub):
+    params = {"user_name": "A", "start_date": str(YESTERDAY - timedelta(days=1)), "end_date": str(YESTERDAY)}
+    first = activity_client.get("/activity-summary", params=params).json()
+    assert activity_client.get("/activity-summary", params=params).json() == first
+    assert len(influx_stub.queries) == 1
+
+    # 오늘은 매번 다시 조회
+    activity_client.get("/activity-summary", params={"user_name": "A", "days": 1})
+    activity_client.get("/activity-summary", params={"user_name": "A", "days": 1})
+    assert len(influx_stub.queries) == 3
+
+    assert activity_client.delete("/activity-summary/cache", params={"user_name": "A"}).json() == {"invalidated": 2}
+    activity_client.get("/activity-summary", params=params)
+    assert len(influx_stub.queries) == 4
+
+
+def test_user_name_is_escaped(activity_client, influx_stub):
+    activity_client.get("/activity-summary", params={"user_name": 'x" or true or "', "days": 1})
+    assert 'r["user_name"] == "x\\" or true or \\""' in influx_stub.queries[0]
+
+
+def test_invalid_range(activity_client):
+    response = activity_client.get("/activity-summary", params={"start_date": "2025-05-03", "end_date": "2025-05-01"})
+    assert response.status_code == 400
+
+
+def test_without_influx(client, monkeypatch):
+    monkeypatch.setattr(main, "activity_cache", None)
+    assert client.get("/activity-summary").status_code == 503
+
+
+def test_async_clients_are_closed_on_shutdown(influx_stub, monkeypatch):
+    from fastapi.testclient import TestClient
+    import influx_reader
+
+    monkeypatch.setenv("INFLUX_URL", influx_stub.url)
+    monkeypatch.setattr(main, "activity_cache", None)
+    influx_stub.query_csv = CSV_HEADER
+    with TestClient(main.app) as test_client:
+        assert test_client.get("/activity-summary", params={"user_name": "A", "days": 1}).json() == []
+        assert len(influx_reader._async_clients) == 1
+    assert influx_reader._async_clients == {}
+
+
+def test_activity_analyzer(influx_stub):
+    import asyncio
+
+    from activity_analyzer import ActivityAnalyzer
+    from influx_reader import close_async_clients, close_clients
+
+    influx_stub.query_csv = CSV_HEADER + (
+        ",,0,2025-05-01T00:00:00Z,12,PIR활동,A\n"
+        ",,1,2025-05-01T00:00:00Z,7.5,레이더활동,A\n"
+        ",,2,2025-05-02T00:00:00Z,4,레이더활동,B\n"
+    )
+    args = ("2025-05-01", "2025-05-03", "", "care", influx_stub.url)
+    analyzer = ActivityAnalyzer("A", *args)
+
+    async def analyze():
+        try:
+            await analyzer.analyze_async()
+        finally:
+            await close_async_clients()
+
+    try:
+        asyncio.run(analyze())
+        assert analyzer.get_results().to_dict("records") == [{"날짜": "2025-05-01", "PIR 총합": 12.0, "레이더 총합": 7.5}]
+
+        summaries = ActivityAnalyzer.analyze_many(["A", "B"], *args)
+        assert summaries["B"].to_dict("records") == [{"날짜": "2025-05-02", "PIR 총합": 0, "레이더 총합": 4.0}]
+        assert len(influx_stub.queries) == 2 and 'r["user_name"] == "A" or r["user_name"] == "B"' in influx_stub.queries[1]
+    finally:
+        close_clients()
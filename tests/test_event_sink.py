@@ -0,0 +1,136 @@
+import pytest
+
+import main
+from event_sink import EventSink, activity_lines, daily_lines, event_lines, influx_writer
+
+
+class Recorder:
+    """write 함수 대역: 처음 fail번은 실패하고 이후 배치를 기록"""
+
+    def __init__(self, fail=0):
+        self.fail = fail
+        self.batches = []
+
+    def __call__(self, lines):
+        if self.fail:
+            self.fail -= 1
+            raise OSError("influx unavailable")
+        self.batches.append(list(lines))
+
+
+def test_batches_by_size_and_flushes_rest():
+    write = Recorder()
+    sink = EventSink(write, batch_size=3, flush_interval=0.05)
+    assert sink.submit(["a", "b"]) and sink.submit(["c", "d", "e"])
+    sink.start()
+    assert sink.flush(5)
+    assert write.batches == [["a", "b", "c"], ["d", "e"]]
+    sink.close()
+
+
+def test_retries_then_drops_failed_batch():
+    write = Recorder(fail=2)
+    sink = EventSink(write, batch_size=10, flush_interval=0.01, max_retries=2, retry_delay=0.01).start()
+    sink.submit(["a"])
+    assert sink.flush(5)
+    assert write.batches == [["a"]]
+
+    write.fail = 3
+    sink.submit(["b"])
+    assert sink.flush(5) and sink.pending == 0
+    assert write.batches == [["a"]]
+    sink.close()
+
+
+def test_backpressure_when_queue_is_full():
+    write = Recorder()
+    sink = EventSink(write, batch_size=2, flush_interval=0.01, max_queue=3)
+    assert sink.submit(["a", "b"])
+    # 부분 추가 없이 통째로 거절
+    assert sink.submit(["c", "d"]) is False
+    assert sink.submit(["c"])
+    assert sink.submit(["d"], block=True, timeout=0.05) is False
+    assert sink.pending == 3
+
+    # 기록 스레드가 대기열을 비우면 기다리던 submit이 추가됨
+    sink.start()
+    assert sink.submit(["d", "e", "f"], block=True, timeout=5)
+    sink.close()
+    assert sink.pending == 0
+    assert [line for batch in write.batches for line in batch] == ["a", "b", "c", "d", "e", "f"]
+    assert sink.submit(["g"]) is False
+
+
+def test_line_protocol():
+    lines = event_lines("홍 길,동", [
+        {"sleepStartTime": "2025-05-01T23:00:00", "sleepEndTime": "2025-05-02T07:00:00", "sleepDurationMinutes": 480}
+    ])
+    assert lines == ['sleep_event,user_name=홍\\ 길\\,동 end_time="2025-05-02T07:00:00",duration_minutes=480i '
+                     '1746140400000000000']
+    assert daily_lines("A", {"2025-05-02": {"outings": 1.0, "pir_total": 3.0}}) == [
+        "outing_daily,user_name=A outings=1.0 1746144000000000000",
+        "activity_daily,user_name=A pir_total=3.0 1746144000000000000",
+    ]
+
+
+@pytest.fixture
+def sink(client, influx_stub, monkeypatch):
+    sink = EventSink(influx_writer(influx_stub.url, "token", "care", bucket="analysis_events"),
+                     flush_interval=0.01).start()
+    monkeypatch.setattr(main, "event_sink", sink)
+    yield sink
+    sink.close()
+    from influx_reader import close_clients
+    close_clients()
+
+
+def test_analyze_sensor_writes_events_and_complete_days(client, sink, influx_stub, payload):
+    body = client.post("/analyze-sensor", params={"user_name": "sink"}, json=payload).json()
+    assert sink.flush(10)
+    assert all(path.startswith("/api/v2/write?org=care&bucket=analysis_events&precision=ns")
+               for path, _ in influx_stub.writes)
+
+    lines = influx_stub.written_lines
+    assert lines[:len(body["sleepEvents"]) + len(body["outingEvents"])] == event_lines(
+        "sink", body["sleepEvents"], body["outingEvents"])
+    daily = [line for line in lines if "_daily," in line]
+    measurements = sorted((line.split(",")[0], int(line.rsplit(" ", 1)[1])) for line in daily)
+    days = [1746057600000000000, 1746144000000000000, 1746230400000000000]
+    # 첫날은 전날 밤 데이터가 없고, 마지막 날은 수면을 0시까지만 분석하므로 수면 합계를 쓰지 않음
+    assert measurements == sorted([("activity_daily", day) for day in days] + [("outing_daily", day) for day in days]
+                                  + [("sleep_daily", days[1])])
+    sleep_daily, = [line for line in daily if line.startswith("sleep_daily")]
+    night, = [event for event in body["sleepEvents"] if event["sleepEndTime"].startswith("2025-05-02")]
+    assert sleep_daily == (f"sleep_daily,user_name=sink total_sleep_minutes={float(night['sleepDurationMinutes'])},"
+                           f"nights=1.0,awakenings=5.0 {days[1]}")
+
+    # 하루 중 한 시간만 들어온 요청은 날짜별 합계를 쓰지 않음
+    written = len(lines)
+    partial = [record for record in payload if "2025-05-02T12:00" <= record["measurement_time"] < "2025-05-02T13:00"]
+    client.post("/analyze-sensor", params={"user_name": "sink"}, json=partial)
+    assert sink.flush(10)
+    assert not [line for line in influx_stub.written_lines[written:] if "_daily," in line]
+
+
+def test_activity_summary_writes_closed_days(sink, influx_stub, monkeypatch):
+    import pandas as pd
+
+    from activity_cache import ActivitySummaryCache
+
+    class Reader:
+        def daily_totals(self, user_names, start, end):
+            return {"A": pd.DataFrame({"날짜": ["2025-05-01", "2025-05-02"], "PIR 총합": [12, 3], "레이더 총합": [7.5, 0]})}
+
+    cache = ActivitySummaryCache(Reader(), callbacks=[main.write_activity])
+    # 5/2는 아직 닫히지 않은 날로 보고 기록하지 않음
+    monkeypatch.setattr(cache, "today", lambda: pd.Timestamp("2025-05-02").date())
+    summary = cache.summary("A", pd.Timestamp("2025-05-01").date(), pd.Timestamp("2025-05-02").date())
+    assert len(summary) == 2
+    assert sink.flush(10)
+    assert influx_stub.written_lines == activity_lines("A", Reader().daily_totals(["A"], None, None)["A"][:1]) == [
+        "activity_daily,user_name=A pir_total=12.0,radar_total=7.5 1746057600000000000"
+    ]
+
+    # 캐시된 지난 날짜는 다시 기록하지 않음
+    cache.summary("A", pd.Timestamp("2025-05-01").date(), pd.Timestamp("2025-05-01").date())
+    assert sink.flush(10) and len(influx_stub.written_lines) == 1
@@ -0,0 +1,91 @@
+import pytest
+
+import main
+from feature_store import FeatureStore
+
+
+def window(payload, start, end):
+    """measurement_time이 [start, end)인 레코드 (ISO 문자열 비교)"""
+    return [record for record in payload if start <= record["measurement_time"] < end]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FeatureStore()
+    monkeypatch.setattr(main, "feature_store", store)
+    return store
+
+
+def post(client, records, user_name="features"):
+    response = client.post("/analyze-sensor", params={"user_name": user_name}, json=records)
+    assert response.status_code == 200
+
+
+def weekly(client, user_name="features"):
+    return client.get("/weekly-features", params={"user_name": user_name}).json()
+
+
+def test_partial_and_overlapping_windows_keep_stored_days(client, store, payload):
+    post(client, payload)
+    full = weekly(client)
+    assert full[0]["avg_sleep_time"] > 0 and full[0]["total_outings"] > 0 and full[0]["days"] == 3
+
+    # 하루 중 한 시간만 들어온 요청은 날짜별 특성을 바꾸지 않음
+    post(client, window(payload, "2025-05-02T12:00", "2025-05-02T13:00"))
+    assert weekly(client) == full
+
+    # 앞 요청과 겹치는 이틀치 요청: 5/2 수면은 전날 밤 데이터가 없으므로 기존 값 유지
+    post(client, window(payload, "2025-05-02", "2025-05-04"))
+    assert weekly(client) == full
+
+    # 전날 정오 이후 데이터가 없는 날의 수면도 0으로 덮어쓰지 않음
+    post(client, window(payload, "2025-05-02T06:00", "2025-05-04"))
+    assert weekly(client) == full
+
+
+def test_daily_features_only_for_covered_days(client, store, payload):
+    from analysis_pipeline import analyze_resident
+    from synthetic_data import to_sensor_json_data
+
+    records = to_sensor_json_data(payload)
+    daily = analyze_resident("features", records)["dailyFeatures"]
+    assert sorted(daily) == ["2025-05-01", "2025-05-02", "2025-05-03"]
+    # 첫날은 전날 밤 데이터가 없고, 마지막 날은 수면을 0시까지만 분석하므로 수면 컬럼이 없음
+    assert "sleep_minutes" not in daily["2025-05-01"]
+    assert "sleep_minutes" not in daily["2025-05-03"]
+    assert daily["2025-05-02"]["nights"] == 1.0
+
+    partial = to_sensor_json_data(window(payload, "2025-05-01T12:00", "2025-05-02T23:00"))
+    assert analyze_resident("features", partial)["dailyFeatures"] == {}
+
+
+def test_missing_columns_keep_stored_values():
+    store = FeatureStore()
+    store.update("A", {"2025-05-05": {"outings": 1.0, "outing_minutes": 60.0, "sleep_minutes": 420.0, "nights": 1.0,
+                                      "awakenings": 2.0, "pir_total": 100.0, "radar_total": 200.0}})
+    store.update("A", {"2025-05-05": {"outings": 2.0, "outing_minutes": 90.0, "pir_total": 50.0}})
+    row = store.weekly(user_name="A").iloc[0]
+    assert row["total_outings"] == 2.0 and row["avg_outing_time"] == 45.0
+    assert row["avg_sleep_time"] == 420.0 and row["avg_intermediate_awakenings"] == 2.0
+    assert row["avg_pir"] == 50.0 and row["avg_radar"] == 200.0
+
+
+def test_last_day_of_overlapping_request_keeps_sleep(client, store):
+    from synthetic_data import generate_resident_payload
+
+    payload = generate_resident_payload(days=5, seed=1)
+    post(client, payload, "features-full")
+    expected = weekly(client, "features-full")
+
+    # 5/4 수면은 5/2~5/5 요청에서 저장되고, 5/4 0시까지만 분석하는 5/1~5/4 요청이 덮어쓰지 않음
+    post(client, window(payload, "2025-05-02", "2025-05-06"))
+    post(client, window(payload, "2025-05-01", "2025-05-05"))
+    daily = store._conn.execute(
+        "SELECT date, sleep_minutes, nights FROM daily_features WHERE user_name = 'features' ORDER BY date"
+    ).fetchall()
+    full = store._conn.execute(
+        "SELECT date, sleep_minutes, nights FROM daily_features WHERE user_name = 'features-full' ORDER BY date"
+    ).fetchall()
+    assert daily == full
+    assert dict((day, nights) for day, _, nights in daily)["2025-05-04"] == 1.0
+    assert [{**week, "user_name": "features-full"} for week in weekly(client)] == expected
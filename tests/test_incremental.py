@@ -0,0 +1,43 @@
+import contextlib
+import io
+
+from analysis_pipeline import analyze_resident
+from incremental_analyzer import IncrementalAnalyzer
+from synthetic_data import generate_resident_payload, to_sensor_json_data
+
+
+def replay(analyzer, user_name, records, hours=3):
+    """records를 hours시간 단위로 나눠 update()에 넣고 마지막으로 받은 이벤트를 모음"""
+    sleep, outing = {}, {}
+    blocks = sorted({record["time"][:13] for record in records})
+    for i in range(0, len(blocks), hours):
+        window = set(blocks[i:i + hours])
+        with contextlib.redirect_stdout(io.StringIO()):
+            sleep_events, outing_events = analyzer.update(user_name, [r for r in records if r["time"][:13] in window])
+        sleep.update({start.isoformat(): end.isoformat() for start, end in sleep_events})
+        outing.update({start.isoformat(): end.isoformat() for start, end in outing_events})
+    return sleep, outing
+
+
+def test_windowed_replay_matches_full_analysis():
+    records = to_sensor_json_data(generate_resident_payload(days=4, seed=5))
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = analyze_resident("replay", records)
+
+    sleep, outing = replay(IncrementalAnalyzer(), "replay", records)
+
+    # 전체 분석은 마지막 날 0시까지만 수면을 보므로 그 전에 끝난 수면끼리 비교
+    last_day = max(record["time"][:10] for record in records)
+    assert {start: end for start, end in sleep.items() if end < last_day} == {
+        event["sleepStartTime"]: event["sleepEndTime"] for event in full["sleepEvents"]
+    }
+    assert outing == {event["outingStartTime"]: event["outingEndTime"] for event in full["outingEvents"]}
+    assert len(full["sleepEvents"]) == 2 and len(full["outingEvents"]) == 4
+
+
+def test_states_are_bounded():
+    analyzer = IncrementalAnalyzer(max_residents=2)
+    records = to_sensor_json_data(generate_resident_payload(days=1, seed=1))[:50]
+    for user_name in ["a", "b", "a", "c"]:
+        analyzer.update(user_name, records)
+    assert list(analyzer.states) == ["a", "c"]
@@ -0,0 +1,143 @@
+import math
+
+import pytest
+
+import main
+from json_response import dumps
+
+
+def post_both(client, monkeypatch, path, body, params=None):
+    """FAST_RESPONSE를 켜고/끄고 같은 요청을 보내 (orjson 응답, response_model 응답) 반환"""
+    responses = []
+    for fast in (True, False):
+        monkeypatch.setattr(main, "FAST_RESPONSE", fast)
+        responses.append(client.post(path, params=params, json=body))
+    return responses
+
+
+def assert_same(fast, model):
+    assert fast.status_code == model.status_code
+    assert fast.headers["content-type"] == model.headers["content-type"]
+    assert fast.content == model.content
+
+
+def test_analyze_sensor_matches_response_model(client, monkeypatch, payload):
+    fast, model = post_both(client, monkeypatch, "/analyze-sensor", payload, {"user_name": "json-normal"})
+    assert_same(fast, model)
+    body = fast.json()
+    assert body["sleepEvents"] and body["outingEvents"]
+    assert all(isinstance(event["sleepDurationMinutes"], int) for event in body["sleepEvents"])
+
+
+def test_empty_periods(client, monkeypatch, payload):
+    # 문 이벤트/야간 데이터가 없으면 수면·외출 모두 빈 목록
+    daytime = [record for record in payload
+               if "T12:00" <= record["measurement_time"][10:16] < "T13:00"
+               and record["measurement_time"].startswith("2025-05-01")
+               and record["sensor_type_name"] not in ("문열림", "문닫힘")]
+    fast, model = post_both(client, monkeypatch, "/analyze-sensor", daytime, {"user_name": "json-empty"})
+    assert_same(fast, model)
+    assert fast.json() == {"sleepEvents": [], "outingEvents": []}
+
+    fast, model = post_both(client, monkeypatch, "/analyze-sensor/stream", None, {"user_name": "json-empty"})
+    assert_same(fast, model)
+
+
+def test_nan_values_and_fractional_timestamps(client, monkeypatch, payload):
+    # 센서 값의 NaN, 마이크로초가 붙은 측정 시각도 같은 문자열·정수로 직렬화
+    records = []
+    for i, record in enumerate(payload):
+        record = dict(record)
+        if record["sensor_type_name"] in ("문열림", "문닫힘"):
+            record["measurement_time"] = record["measurement_time"][:-1] + ".250000Z"
+        elif i % 7 == 0:
+            record["measurement_values"] = [math.nan] * len(record["measurement_values"])
+        records.append(record)
+    body = "[" + ",".join(
+        '{"sensor_type_name":%s,"measurement_time":"%s","measurement_values":[%s]}' % (
+            dumps(r["sensor_type_name"]).decode(), r["measurement_time"],
+            ",".join("NaN" if math.isnan(v) else repr(v) for v in r["measurement_values"]))
+        for r in records
+    ) + "]"
+
+    responses = []
+    for fast in (True, False):
+        monkeypatch.setattr(main, "FAST_RESPONSE", fast)
+        responses.append(client.post("/analyze-sensor", params={"user_name": "json-nan"}, content=body,
+                                     headers={"content-type": "application/json"}))
+    fast, model = responses
+    assert_same(fast, model)
+    outing_starts = [event["outingStartTime"] for event in fast.json()["outingEvents"]]
+    assert outing_starts and all(start.endswith(".250000") for start in outing_starts)
+
+
+def test_batch_with_error_matches_response_model(client, monkeypatch, payload):
+    map_results = main.batch_executor.map
+
+    async def failing_map(fn, args_list):
+        # 두 번째 거주자의 분석만 실패
+        outcomes = await map_results(fn, args_list[:1])
+        return outcomes + [ValueError("분석 실패")]
+
+    monkeypatch.setattr(main.batch_executor, "map", failing_map)
+    residents = [{"user_name": "json-batch", "data": payload}, {"user_name": "json-batch-failed", "data": payload}]
+    fast, model = post_both(client, monkeypatch, "/analyze-sensor/batch", residents)
+    assert_same(fast, model)
+    ok, failed = fast.json()
+    assert ok["error"] is None and ok["result"]["sleepEvents"]
+    assert failed == {"user_name": "json-batch-failed", "result": None, "error": "ValueError('분석 실패')"}
+
+
+@pytest.mark.parametrize("data", [[], [{"sensor_type_name": "심박", "measurement_time": "not-a-time",
+                                        "measurement_values": [70.0]}]], ids=["empty", "unparseable"])
+def test_no_valid_readings_returns_empty_events(client, monkeypatch, data):
+    fast, model = post_both(client, monkeypatch, "/analyze-sensor", data, {"user_name": "json-no-data"})
+    assert_same(fast, model)
+    assert fast.json() == {"sleepEvents": [], "outingEvents": []}
+
+    fast, model = post_both(client, monkeypatch, "/analyze-sensor/batch", [{"user_name": "json-no-data", "data": data}])
+    assert_same(fast, model)
+    assert fast.json() == [{"user_name": "json-no-data", "result": {"sleepEvents": [], "outingEvents": []}, "error": None}]
+
+
+@pytest.mark.parametrize("path", ["/analyze-sensor", "/analyze-sensor/incremental", "/analyze-sensor/batch"])
+def test_validation_errors(client, monkeypatch, path):
+    fast, model = post_both(client, monkeypatch, path, [{"sensor_type_name": "심박"}])
+    assert fast.status_code == 422
+    assert_same(fast, model)
+
+
+def test_saturated_executor(client, monkeypatch, payload):
+    from analysis_executor import ExecutorSaturated
+
+    async def saturated(*args):
+        raise ExecutorSaturated(retry_after=3)
+
+    monkeypatch.setattr(main.analysis_executor, "run", saturated)
+    fast, model = post_both(client, monkeypatch, "/analyze-sensor", payload, {"user_name": "json-busy"})
+    assert fast.status_code == 503 and fast.headers["retry-after"] == "3"
+    assert_same(fast, model)
+
+
+@pytest.mark.parametrize("body, line", [
+    (b'{"sensor": \n', 1),
+    (b'{"sensor": "door"}\n5\n', 2),
+    (b'[{}]\n\n["door"]', 3),
+], ids=["malformed", "number", "array_of_strings"])
+def test_ndjson_error(client, monkeypatch, body, line):
+    responses = []
+    for fast in (True, False):
+        monkeypatch.setattr(main, "FAST_RESPONSE", fast)
+        responses.append(client.post("/analyze-sensor/stream", content=body))
+    fast, model = responses
+    assert fast.status_code == 400
+    assert_same(fast, model)
+    assert f"({line}번째 줄)" in fast.json()["detail"]
+
+
+def test_benchmark_conformance_check(client, payload):
+    from benchmark import check_response_conformance
+
+    # 호출마다 새 거주자 이름을 쓰므로 이전 호출에서 학습된 임계값과 무관
+    assert check_response_conformance(client, payload)
+    assert check_response_conformance(client, payload)
@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+import main
+import result_cache
+from result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResultCache(max_bytes=2**20, ttl=60)
+    monkeypatch.setattr(main, "result_cache", cache)
+    return cache
+
+
+def test_repeated_request_is_served_from_cache(client, cache, payload):
+    first = client.post("/analyze-sensor", params={"user_name": "cached"}, json=payload)
+    second = client.post("/analyze-sensor", params={"user_name": "cached"}, json=payload)
+    assert first.content == second.content
+    assert 'analysis_requests_total{endpoint="/analyze-sensor",outcome="cached"}' in client.get("/metrics").text
+
+    changed = [dict(record) for record in payload]
+    changed[0]["measurement_values"] = [99.0]
+    before = cache.nbytes
+    client.post("/analyze-sensor", params={"user_name": "cached"}, json=changed)
+    assert cache.nbytes > before
+
+
+def test_digest_is_computed_off_the_event_loop(client, cache, payload, monkeypatch):
+    threads = []
+
+    def recording_digest(user_name, sensor_json_data):
+        threads.append(threading.current_thread().name)
+        return result_cache.payload_digest(user_name, sensor_json_data)
+
+    monkeypatch.setattr(main, "payload_digest", recording_digest)
+    client.post("/analyze-sensor", params={"user_name": "digest"}, json=payload)
+    assert len(threads) == 1 and threads[0].startswith("analysis")
+
+
+def test_key_includes_max_gap_and_version(client, cache, payload, monkeypatch):
+    import analysis_pipeline
+    from result_cache import cache_key
+
+    params = {"threshold_heart_breath": 10, "alpha": 0.005}
+    keys = {cache_key("d", params), cache_key("d", params, max_gap=30), cache_key("d", params, version=1)}
+    assert len(keys) == 3
+
+    client.post("/analyze-sensor", params={"user_name": "versioned"}, json=payload)
+    entries = len(cache._entries)
+    # 분석 코드가 바뀌면 이전 결과를 쓰지 않고 다시 분석
+    monkeypatch.setattr(analysis_pipeline, "ANALYSIS_VERSION", analysis_pipeline.ANALYSIS_VERSION + 1)
+    client.post("/analyze-sensor", params={"user_name": "versioned"}, json=payload)
+    assert len(cache._entries) > entries
@@ -0,0 +1,94 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from sleep_analyzer import SleepAnalyzer
+from sleep_engine import clear_zero_sensor_runs, sleep_state
+from synthetic_data import generate_resident_payload, to_sensor_json_data
+
+
+def row_wise_sleep_state(minutes, awake, intervals, awake_threshold=60):
+    """기존 apply_sleep_state의 행 단위 처리를 그대로 옮긴 기준 구현"""
+    state = [0] * len(minutes)
+    for start, end in intervals:
+        rows = [i for i, minute in enumerate(minutes) if start <= minute < end]
+        for i in rows:
+            state[i] = 1
+        run = []
+        for i in rows + [None]:
+            if run and (i is None or awake[i] != awake[run[-1]] or minutes[i] - minutes[run[-1]] != 1):
+                if awake[run[0]] and minutes[run[-1]] - minutes[run[0]] >= awake_threshold:
+                    for j in run:
+                        state[j] = 0
+                run = []
+            if i is not None:
+                run.append(i)
+    return state
+
+
+def test_overlapping_intervals_and_restless_zeros():
+    minutes = np.arange(30)
+    awake = np.zeros(30, dtype=bool)
+    awake[[4, 5, 6, 7, 11, 12, 16, 17, 18, 19, 20, 24]] = True
+    state = sleep_state(minutes, awake, np.array([2, 15]), np.array([20, 28]), awake_threshold=3)
+
+    # 겹치는 부분은 나중 구간 기준: 16~20 깸은 두 번째 구간 안에서 길이 4로 제거, 짧은 깸(11~12, 24)은 수면 유지
+    assert state.tolist() == [0, 0, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1,
+                              0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 0, 0]
+    assert state.tolist() == row_wise_sleep_state(minutes, awake, [(2, 20), (15, 28)], awake_threshold=3)
+
+
+def test_clear_zero_sensor_runs_groups_by_minute_continuity():
+    minutes = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 12, 13, 14, 15])
+    dark = np.array([1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1], dtype=bool)
+    zero_sensor = np.array([1, 1, 1, 1, 0, 0, 1, 1, 1, 0, 1, 1, 1, 1], dtype=bool)
+    state = clear_zero_sensor_runs(minutes, dark, zero_sensor, np.ones(14, dtype=np.int64), ratio=0.8)
+    assert state.tolist() == [0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_sleep_state_matches_row_wise(seed):
+    rng = np.random.default_rng(seed)
+    minutes = np.cumsum(rng.choice([1, 1, 1, 1, 2, 5], size=300))
+    awake = rng.random(300) < rng.uniform(0.1, 0.9)
+    starts = np.sort(rng.choice(minutes, size=4, replace=False))
+    ends = np.maximum.accumulate(starts + rng.integers(10, 200, size=4))
+    expected = row_wise_sleep_state(minutes.tolist(), awake.tolist(), list(zip(starts, ends)), awake_threshold=8)
+    assert sleep_state(minutes, awake, starts, ends, awake_threshold=8).tolist() == expected
+
+
+def living_room(payload, seed):
+    # 밤에는 생체 신호 없이 PIR만 잡히는 거실 취침
+    rng = np.random.default_rng(seed)
+    result = []
+    for record in payload:
+        record = dict(record)
+        hour = int(record["measurement_time"][11:13])
+        night = hour >= 23 or hour < 6
+        if night and record["sensor_type_name"] in ("심박", "호흡", "레이더활동"):
+            record["measurement_values"] = [0.0] * len(record["measurement_values"])
+        if night and record["sensor_type_name"] == "PIR활동":
+            record["measurement_values"] = [float(rng.integers(4, 9)) if rng.random() > 0.1 else 0.0]
+        result.append(record)
+    return result
+
+
+# 기존 행 단위 SleepAnalyzer로 구한 결과
+@pytest.mark.parametrize("payload, expected", [
+    (generate_resident_payload(days=3, seed=2, noise=0.2), ("bedroom", [
+        ("2025-05-01 22:14:00", "2025-05-02 07:51:00"),
+        ("2025-05-02 22:19:00", "2025-05-03 07:34:00"),
+    ])),
+    (living_room(generate_resident_payload(days=3, seed=3), seed=0), ("living_room", [
+        ("2025-05-01 23:29:00", "2025-05-02 14:00:00"),
+        ("2025-05-02 23:21:00", "2025-05-03 12:19:00"),
+    ])),
+], ids=["bedroom_restless", "living_room"])
+def test_analyzer_matches_row_wise_results(payload, expected):
+    analyzer = SleepAnalyzer("pinned", to_sensor_json_data(payload), "2025-05-01", "2025-05-03 23:59")
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.analyze()
+    room_type, periods, _ = analyzer.get_results()
+    assert (room_type, [(str(start), str(end)) for start, end in zip(periods["sleep_start"], periods["wake_time"])]) == expected
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from analysis_pipeline import analyze_resident
+from sleep_engine import split_at_gaps
+from synthetic_data import to_sensor_json_data
+
+
+@pytest.fixture(scope="module")
+def records(payload):
+    return to_sensor_json_data(payload)
+
+
+def without(records, start, end):
+    return [record for record in records if not (start <= record["time"] < end)]
+
+
+def test_split_at_gaps():
+    minutes = np.array([0, 1, 2, 3, 10, 11, 12, 20, 21, 22])
+    starts, ends, end_minutes, after_gap = split_at_gaps(minutes, np.array([1, 8]), np.array([6, 9]))
+    assert starts.tolist() == [1, 4, 8]
+    assert ends.tolist() == [4, 6, 9]
+    assert end_minutes.tolist() == [4, 12, 22]
+    assert after_gap.tolist() == [False, True, False]
+
+    # 끊긴 곳이 구간 끝 바로 앞이면 구간은 마지막 행 다음 분에 끝남
+    starts, ends, end_minutes, after_gap = split_at_gaps(minutes, np.array([1]), np.array([4]))
+    assert (starts.tolist(), ends.tolist(), end_minutes.tolist(), after_gap.tolist()) == ([1], [4], [4], [False])
+
+
+def test_offline_gap_inside_sleep_is_not_counted(records):
+    online = analyze_resident("gap", records, max_gap=30)
+    night, = [event for event in online["sleepEvents"] if event["sleepEndTime"].startswith("2025-05-02")]
+
+    # 02:00~03:00 측정 값 없음: 마지막 값 이후 30분(02:30)까지만 이어 쓰고 나머지는 오프라인
+    result = analyze_resident("gap", without(records, "2025-05-02T02:00", "2025-05-02T03:00"), max_gap=30)
+    assert result["metrics"]["sizes"]["offline_minutes"] == 30
+    split = [event for event in result["sleepEvents"] if event["sleepEndTime"].startswith("2025-05-02")]
+    assert [(event["sleepStartTime"], event["sleepEndTime"]) for event in split] == [
+        (night["sleepStartTime"], "2025-05-02T02:30:00"),
+        ("2025-05-02T03:00:00", night["sleepEndTime"]),
+    ]
+    assert sum(event["sleepDurationMinutes"] for event in split) == night["sleepDurationMinutes"] - 30
+
+    # 날짜별 특성도 오프라인 시간을 빼고, 나뉜 수면은 한 밤으로 셈
+    day = result["dailyFeatures"]["2025-05-02"]
+    assert day["sleep_minutes"] == night["sleepDurationMinutes"] - 30
+    assert day["nights"] == 1.0
+
+
+def test_without_max_gap_sleep_bridges_missing_values(records):
+    full = analyze_resident("gap", records)
+    result = analyze_resident("gap", without(records, "2025-05-02T02:00", "2025-05-02T03:00"))
+    assert result["metrics"]["sizes"]["offline_minutes"] == 0
+    assert result["sleepEvents"] == full["sleepEvents"]
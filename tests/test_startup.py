@@ -0,0 +1,48 @@
+import logging
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# conftest가 테스트용으로 바꾼 환경 변수 (서비스 기본값으로 import하도록 제거)
+STARTUP_VARIABLES = ["THRESHOLD_STORE_PATH", "FEATURE_STORE_PATH", "RESULT_CACHE_MAX_BYTES", "INFLUX_URL",
+                     "EVENT_SINK", "WARM_UP"]
+
+
+def test_lifespan_runs_warm_up_and_shutdown(monkeypatch):
+    monkeypatch.setattr(main, "WARM_UP", True)
+    shut_down = []
+    monkeypatch.setattr(main.batch_executor, "shutdown", lambda: shut_down.append(True))
+    with TestClient(main.app) as client:
+        assert main.warm_up_done.wait(30)
+        assert client.get("/health").json()["warmedUp"] is True
+        assert not shut_down
+    assert shut_down == [True]
+
+
+def import_main(tmp_path, code):
+    """빈 디렉터리에서 기본 환경 변수로 main을 import하고 code 실행 결과(stdout) 반환"""
+    environment = {key: value for key, value in os.environ.items()
+                   if key not in STARTUP_VARIABLES}
+    environment["PYTHONPATH"] = ROOT
+    completed = subprocess.run([sys.executable, "-c", f"import main\n{code}"], cwd=tmp_path, env=environment,
+                               capture_output=True, text=True, check=True)
+    return completed.stdout
+
+
+def test_import_does_not_configure_logging(tmp_path):
+    output = import_main(tmp_path, "import logging\nroot = logging.getLogger()\nprint(len(root.handlers), root.level)")
+    assert output.split() == ["0", str(logging.WARNING)]
+
+
+def test_import_does_not_create_files(tmp_path):
+    import_main(tmp_path, "")
+    assert os.listdir(tmp_path) == []
+
+    # 임계값 DB는 처음 사용할 때 기본 경로에 만듦
+    import_main(tmp_path, "main.get_threshold_store()")
+    assert os.listdir(tmp_path) == ["outing_thresholds.db"]
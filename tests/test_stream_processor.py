@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import stream_processor
+from outing_analyzer import OutingAnalyzer
+from sensor_ingest import parse_sensor_data
+from stream_processor import StreamProcessor
+from synthetic_data import generate_resident_payload, to_sensor_json_data
+
+START = datetime(2025, 5, 1)
+
+
+def at(minute):
+    return (START + timedelta(minutes=minute)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def resident(minutes, close=None, open_=None, vitals=70.0, motion=5.0, away=(), home_again=None):
+    """분마다 심박/PIR 레코드와 문 이벤트
+
+    away 분에는 생체 신호와 움직임이 없고, home_again 분부터 다시 움직임이 있다.
+    """
+    records = []
+    for minute in range(minutes):
+        outside = minute in away and (home_again is None or minute < home_again)
+        records.append({"sensor": "심박", "time": at(minute), "values": [0.0 if minute in away else vitals]})
+        records.append({"sensor": "PIR활동", "time": at(minute), "values": [0.0 if outside else motion]})
+    if close is not None:
+        records.append({"sensor": "문닫힘", "time": at(close), "values": [1.0]})
+    if open_ is not None:
+        records.append({"sensor": "문열림", "time": at(open_), "values": [1.0]})
+    return records
+
+
+def batches(records, size, delay_doors=0):
+    """size분 단위 묶음 (각 묶음 안은 역순), 문 이벤트는 delay_doors 묶음 늦게 전달"""
+    count = 240 // size + 2
+    result = [[] for _ in range(count + delay_doors)]
+    for record in records:
+        minute = int((datetime.strptime(record["time"], "%Y-%m-%dT%H:%M:%SZ") - START).total_seconds() // 60)
+        is_door = record["sensor"] in ("문열림", "문닫힘")
+        result[minute // size + (delay_doors if is_door else 0)].append(record)
+    return [list(reversed(batch)) for batch in result]
+
+
+def feed(processor, chunks):
+    alerts = []
+    for chunk in chunks:
+        alerts += processor.ingest("stream", chunk)
+    return [(alert["type"], alert["time"], alert["detected_at"]) for alert in alerts]
+
+
+OUTING = resident(200, close=60, open_=170, away=range(60, 200), home_again=140)
+OUTING_ALERTS = [
+    ("door_closed_no_vitals", "2025-05-01T01:00:00", "2025-05-01T01:30:00"),
+    ("outing", "2025-05-01T01:00:00", "2025-05-01T02:00:00"),
+    # 문이 열리기 전 120~150분 구간 움직임이 threshold_home_activity 이상이므로 그 구간 끝에 귀가
+    ("returned", "2025-05-01T02:30:00", "2025-05-01T02:50:00"),
+]
+
+
+@pytest.mark.parametrize("chunks, returned_at", [
+    ([OUTING], "2025-05-01T02:50:00"),
+    (batches(OUTING, 10), "2025-05-01T02:50:00"),
+    # 문 이벤트가 5분 늦게 오면 귀가도 그만큼 늦게 알지만 판단 결과는 같음
+    (batches(OUTING, 5, delay_doors=1), "2025-05-01T02:55:00"),
+], ids=["single", "reversed_batches", "late_doors"])
+def test_outing_alerts_in_order(chunks, returned_at):
+    expected = OUTING_ALERTS[:-1] + [OUTING_ALERTS[-1][:2] + (returned_at,)]
+    assert feed(StreamProcessor(inactivity_minutes=1000), chunks) == expected
+
+
+def test_home_activity_threshold_sets_return_time():
+    alerts = StreamProcessor(inactivity_minutes=1000, threshold_home_activity=1000).ingest("stream", OUTING)
+    returned, = [alert for alert in alerts if alert["type"] == "returned"]
+    assert returned["time"] == returned["door_open"] == "2025-05-01T02:50:00"
+    assert returned["outing_start"] == "2025-05-01T01:00:00"
+
+
+def test_late_vitals_before_decision_are_counted():
+    records = resident(200, close=60, away=range(60, 200))
+    early = [record for record in records if record["time"] <= at(80)]
+    late = [record for record in records if record["time"] > at(80)]
+    # 70분 생체 신호가 판단 시점(90분) 전에 늦게 도착
+    late.append({"sensor": "심박", "time": at(70), "values": [100.0]})
+    assert feed(StreamProcessor(inactivity_minutes=1000), [early, late]) == []
+
+
+def test_inactivity_alert_once():
+    records = resident(200, motion=0.0)
+    records += [{"sensor": "PIR활동", "time": at(minute), "values": [3.0]} for minute in range(30)]
+    expected = [("inactivity", "2025-05-01T00:29:00", "2025-05-01T01:29:00")]
+    assert feed(StreamProcessor(inactivity_minutes=60), [records]) == expected
+    assert feed(StreamProcessor(inactivity_minutes=60), batches(records, 10)) == expected
+
+
+def test_matches_outing_analyzer():
+    records = to_sensor_json_data(generate_resident_payload(days=3, seed=2))
+    analyzer = OutingAnalyzer(parse_sensor_data(records), alpha=0.0)
+    analyzer.analyze()
+    expected = [(status["time"].isoformat(), status["status"]) for status in analyzer.external_status]
+
+    processor = StreamProcessor(inactivity_minutes=10**6, buffer_minutes=24 * 60)
+    alerts = []
+    for hour in sorted({record["time"][:13] for record in records}):
+        alerts += processor.ingest("stream", [record for record in records if record["time"][:13] == hour])
+    assert [(alert["time"], int(alert["type"] == "outing")) for alert in alerts
+            if alert["type"] in ("outing", "returned")] == expected
+
+
+def test_idle_residents_are_evicted(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(stream_processor.time, "monotonic", lambda: now[0])
+    processor = StreamProcessor(idle_minutes=60)
+    processor.get_state("a")
+    now[0] = 1800
+    processor.get_state("b")
+    now[0] = 3700
+    processor.get_state("c")
+    assert list(processor.states) == ["b", "c"]
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+def on_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("path", ["/analyze-sensor", "/analyze-sensor/batch"])
+def test_store_io_runs_off_the_event_loop(client, monkeypatch, payload, path):
+    calls = []
+    store = main.get_threshold_store()
+    load, save_analysis = store.load, main.save_analysis
+
+    def recording_load(user_name):
+        calls.append(("load", on_event_loop()))
+        return load(user_name)
+
+    def recording_save(user_name, result):
+        calls.append(("save", on_event_loop()))
+        return save_analysis(user_name, result)
+
+    monkeypatch.setattr(store, "load", recording_load)
+    monkeypatch.setattr(main, "save_analysis", recording_save)
+    if path == "/analyze-sensor":
+        response = client.post(path, params={"user_name": "store-io"}, json=payload)
+    else:
+        response = client.post(path, json=[{"user_name": "store-io-a", "data": payload},
+                                           {"user_name": "store-io-b", "data": payload}])
+    assert response.status_code == 200
+    assert sorted(kind for kind, _ in calls) == sorted(["load", "save"] * (1 if path == "/analyze-sensor" else 2))
+    assert not any(loop for _, loop in calls)
@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+THRESHOLD_KEYS = ["threshold_heart_breath", "threshold_radar_pir", "threshold_home_activity"]
+
+
+class ThresholdStore:
+    """거주자별 OutingAnalyzer 적응형 임계값 저장소
+
+    최근 사용한 capacity명은 메모리(LRU)에 두고, path가 주어지면 저장할 때마다
+    SQLite에도 기록해 프로세스가 재시작되어도 학습된 값을 이어서 사용한다.
+    """
+
+    def __init__(self, path=None, capacity=1024):
+        self.path = path
+        self.capacity = capacity
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outing_thresholds ("
+                "user_name TEXT PRIMARY KEY, "
+                "threshold_heart_breath REAL, threshold_radar_pir REAL, threshold_home_activity REAL, "
+                "updated_at REAL)"
+            )
+            self._conn.commit()
+
+    def _remember(self, user_name, thresholds):
+        self._cache[user_name] = thresholds
+        self._cache.move_to_end(user_name)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def load(self, user_name):
+        """저장된 임계값 dict, 없으면 None"""
+        with self._lock:
+            if user_name in self._cache:
+                self._cache.move_to_end(user_name)
+                return dict(self._cache[user_name])
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                f"SELECT {', '.join(THRESHOLD_KEYS)} FROM outing_thresholds WHERE user_name = ?",
+                (user_name,)
+            ).fetchone()
+            if row is None:
+                return None
+            thresholds = dict(zip(THRESHOLD_KEYS, row))
+            self._remember(user_name, thresholds)
+            return dict(thresholds)
+
+    def save(self, user_name, thresholds):
+        thresholds = {key: float(thresholds[key]) for key in THRESHOLD_KEYS}
+        with self._lock:
+            self._remember(user_name, thresholds)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO outing_thresholds VALUES (?, ?, ?, ?, ?)",
+                    (user_name, *(thresholds[key] for key in THRESHOLD_KEYS), time.time())
+                )
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None